@@ -1,25 +1,57 @@
 import time
 import socket
 import sys
+import argparse
 import threading
-import math
 import os
 import os.path
 import traceback
 
-# Timeout Interval for the packet to get acknowledged
+from checksum import CHECKSUM_FUNCTIONS, get_checksum_function
+from congestion_control import CongestionControl
+from packet_format import ACK_PACKET_FIELD, HEADER, MAX_MSS, NAK_PACKET_FIELD, SACK_PACKET_FIELD, parse_nak, parse_sack
+from pacing import SPIN_THRESHOLD, Pacer, parse_rate
+from packet_source import MappedPacketStream, PacketStream
+from path_mtu import discover_mss
+from rto_estimator import RTOEstimator
+from striping import announce_stripe, send_striped
+from timer_wheel import TimerWheel
+from udp_offload import SegmentSender
+from window_tuner import WindowTuner
+
+# Initial Timeout Interval for the packet to get acknowledged, adapted to the measured RTT unless --fixed-rto is given
 TIMEOUT_VALUE = 0.5
 
-# Field Value for the Data Packet and the Acknowledged Packet
-DATA_PACKET_FIELD = int('0101010101010101',2)
-ACK_PACKET_FIELD = int('1010101010101010',2)
+# Number of packets packetized ahead of the window in streaming mode
+STREAM_LOOKAHEAD = 32
 
-# List to hold the data packets
+# Bytes of the buffer the acknowledgements are received into, larger than the largest SACK or NAK
+ACK_BUFFER_SIZE = 2048
+
+# Packets of the file (PacketStream), indexed by sequence number
 packets = []
 
 # Dictionary to keep track of the packets time value
 packets_time = {}
 
+# Retransmission timeout estimated from the RTT of the acknowledged packets
+rto_estimator = RTOEstimator(TIMEOUT_VALUE)
+
+# Retransmission timer of every unacknowledged packet in the window
+packets_timer = TimerWheel()
+
+# Congestion window limiting the window N, unless congestion control is off
+congestion_control = CongestionControl(1,False)
+
+# Window sized from the measured bandwidth-delay product, unless it is the fixed window N
+window_tuner = WindowTuner(1,False)
+
+# Token bucket spacing the packets at the pacing rate, unless pacing is off
+pacer = Pacer(1)
+
+# Sender of the packets, in runs of segments (GSO) or batches (sendmmsg) of a single system call
+segment_sender = SegmentSender(None,None)
+
 # Total number of packets to be send (Initaily initializing with 1)
 number_of_packets = 1
 
@@ -29,11 +61,20 @@ packets_acknowledged = 0
 # Expected ACK value
 ack_expected = 0
 
-# List to store all the acknowledged data packets sequence numbers
-acknowled_packets_seq_nos = []
+# Set to store all the acknowledged data packets sequence numbers above the expected ACK
+acknowled_packets_seq_nos = set()
+
+# Sequence numbers reported missing by negative acknowledgements of the Server, retransmitted by the sending thread
+nak_requested = set()
 
 lock = threading.Lock()
 
+# Condition on the lock, notified by get_acknowledgement whenever an acknowledgement is processed
+window_moved = threading.Condition(lock)
+
+# Checksum function for the data, selected with --checksum (must match the server)
+get_checksum = get_checksum_function('internet')
+
 def N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
 	"""
 	To check weather N packets in the window are sent to the Server
@@ -47,79 +88,117 @@ def N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
 	# is becoming equal to greater to window size
 	return seq_no_to_send - ack_expected >= N
 
-def N_GREATER_THAN_TOTAL_PACKETS(seq_no_to_send,ack_expected,N,number_of_packets):
+def START_TIMER(sequence_number,packets_time,packets_timer):
 	"""
-	To check weather window size(N) is greater than total number of packets
+	Record the time the packet is sent and start its retransmission timer
 	Arguments:
-		seq_no_to_send 		: Current Sequence Number To Send
-		ack_expected		: Expected Value of the Acknowledgement
-		N 					: Window Size
-		number_of_packets 	: Total Number of Packets
+		sequence_number		: Sequence Number of the packet sent
+		packets_time 		: Packets initial time value
+		packets_timer 		: Retransmission timers of the packets
 	"""
-	# Returns True if the total number of packts are less than the window size 
-	# and if the sequence number expected is less than the sequence number to send else false
-	return number_of_packets <= N and ack_expected < seq_no_to_send
+	packets_time[sequence_number] = time.time()
+	packets_timer.arm(sequence_number,packets_time[sequence_number] + rto_estimator.rto)
 
-def TIMEOUT(packets_time,ack_expected):
+def RETRANSMIT(sequence_numbers,packets,client_socket,server_host_name,server_port):
 	"""
-	To check if the packet has timed out
+	Retransmit the packets, in as few system calls as possible
 	Arguments:
-		packets_time 		: Packets initial time value
-		ack_expected		: Expected Value of the Acknowledgement
+		sequence_numbers	: Sequence Numbers of the packets that timed out or are missing
+		packets 			: List ontaining all the packets
+		client_socket		: Client Socket
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
 	"""
-	# Returns true if the packet has timed out else False
-	return time.time() - packets_time[ack_expected] >= TIMEOUT_VALUE
+	for sequence_number in sequence_numbers:
+		rto_estimator.on_retransmit(sequence_number) #No RTT sample from the retransmitted packet (Karn's rule)
+		START_TIMER(sequence_number,packets_time,packets_timer) #Reseting the timer of retransmitted packet
+		pacer.consume() #Taking the pacing tokens of the retransmission
+	segment_sender.send_run([packets[sequence_number] for sequence_number in sequence_numbers]) #Retransmitting the packets
 
-def RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port):
+def TIME_TO_TIMEOUT(packets_timer):
 	"""
-	Retransmit the packet
+	Seconds left before the first packet times out
+	Arguments:
+		packets_timer 		: Retransmission timers of the packets
+	"""
+	# Returns the time left till the earliest timeout, a full timeout if no packet is being timed
+	deadline = packets_timer.next_deadline()
+	if deadline is None:
+		return rto_estimator.rto
+	return max(0,deadline - time.time())
+
+def TIMEOUT_RETRANSMIT(packets,client_socket,server_host_name,server_port,packets_timer,seq_no_to_send):
+	"""
+	To retransmit every packet in the current window that timed out
 	Arguments:
-		seq_no_to_send 		: Current Sequence Number To Send
-		ack_expected		: Expected Value of the Acknowledgement
 		packets 			: List ontaining all the packets
 		client_socket		: Client Socket
 		server_host_name	: Host Name of the Server
 		server_port			: Post # of the Server
+		packets_timer 		: Retransmission timers of the packets
+		seq_no_to_send 		: Current Sequence Number To Send
 	"""
-	# for sequence_number in range(ack_expected,seq_no_to_send):
-	packets_time[ack_expected] = time.time() #Reseting the timer of retransmitted packet
-	client_socket.sendto(packets[ack_expected].encode('UTF-8','ignore'), (server_host_name,server_port)) #Retransmitting the packet
-	print('Timeout, Sequence Number = ' + str(ack_expected))
-
-def TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time):
+	# All the packets that timed out are retransmitted together, not one timeout at a time
+	timed_out = packets_timer.expire(time.time())
+	if timed_out:
+		rto_estimator.backoff() #Doubling the timeout once for the timeout event
+		congestion_control.on_timeout(min(timed_out),seq_no_to_send) #Back to slow start
+	for sequence_number in timed_out:
+		print('Timeout, Sequence Number = ' + str(sequence_number))
+	RETRANSMIT(timed_out,packets,client_socket,server_host_name,server_port)
+
+def NAK_RETRANSMIT(packets,client_socket,server_host_name,server_port,seq_no_to_send):
 	"""
-	To retransmit the packets in the current window if the packet is timed out
+	To retransmit the packets reported missing by the Server, without waiting for their timeout
 	Arguments:
-		seq_no_to_send 		: Current Sequence Number To Send
-		ack_expected		: Expected Value of the Acknowledgement
 		packets 			: List ontaining all the packets
 		client_socket		: Client Socket
 		server_host_name	: Host Name of the Server
 		server_port			: Post # of the Server
-		packets_time    	: Packets initial time value
+		seq_no_to_send 		: Current Sequence Number To Send
 	"""
-	try:
-		# If the packet timeout, then retransmit
-		if TIMEOUT(packets_time,ack_expected):
-			RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
-	except KeyError:
-		pass
-
-def get_checksum(data):
+	now = time.time()
+	missing = []
+	for sequence_number in sorted(nak_requested):
+		# Only packets sent and not yet acknowledged, and not retransmitted less than a round trip ago as the Server repeats the NAK until the gap is filled
+		if sequence_number in packets_time and now - packets_time[sequence_number] >= (rto_estimator.srtt or 0):
+			print('NAK, Sequence Number = ' + str(sequence_number))
+			congestion_control.on_loss(sequence_number,seq_no_to_send) #Halving the congestion window, once per window
+			missing.append(sequence_number)
+	nak_requested.clear()
+	RETRANSMIT(missing,packets,client_socket,server_host_name,server_port)
+
+def ACKNOWLEDGE(sequence_numbers,ack_time):
 	"""
-	Calculate the Checksum of the data
+	Acknowledge the given packets and move the expected ACK past all the acknowledged ones, to be called with the lock held
 	Arguments:
-		data : Data Value in String for which the checksum is to be calculated
+		sequence_numbers	: Sequence Numbers acknowledged by the Server
+		ack_time 			: Time the acknowledgement was received
 	"""
-	sm = 0
-	size = len(data) - len(data) % 2 # Storing the length if data, if data is odd, then data length else data length -1
-	
-	# Running loop fo each 2 byte data in the data
-	for i in range(0, size, 2): 
-		shift = ord(data[i]) + (ord(data[i+1]) << 8) #Adding data and its 8bit left shifted part
-		chk = sm + shift #Concating the shift to the total data
-		sm = (chk & 0xffff) + (chk >> 16) #Carry Around add
-	return ~sm & 0xffff #Returning the checksum
+	global packets_acknowledged
+	global ack_expected
+
+	acknowledged = []
+	for sequence_number in sequence_numbers:
+		# Skipping the packets already acknowledged
+		if sequence_number < ack_expected or sequence_number >= number_of_packets or sequence_number in acknowled_packets_seq_nos:
+			continue
+		acknowled_packets_seq_nos.add(sequence_number) #Adding the acknowledged sequence number to the set
+		packets_timer.cancel(sequence_number) #Stopping the retransmission timer of the packet
+		acknowledged.append((sequence_number,packets_time.pop(sequence_number,None))) #Deleting the acknowledged packet from the time list
+
+	if not acknowledged:
+		return
+	rtt = rto_estimator.on_acks(acknowledged,ack_time) #Measuring the RTT
+	congestion_control.on_ack(len(acknowledged)) #Growing the congestion window
+	window_tuner.on_ack(len(acknowledged),rtt,rto_estimator.srtt) #Measuring the delivery rate
+
+	# Loop to increment the expected acknowledgement and number of packets acknowledged that were received when the packet loss occured
+	while ack_expected in acknowled_packets_seq_nos:
+		acknowled_packets_seq_nos.discard(ack_expected) #Only sequence numbers above the expected ACK are kept
+		packets_acknowledged += 1 #Incrementing the Total Number of packets acknowledged
+		ack_expected += 1 #Incrementing the Expected ACK value
+	packets.release(ack_expected) #Releasing the cumulatively acknowledged packets
 
 def check_arguments(file_name,N,MSS):
 	"""
@@ -144,6 +223,11 @@ def check_arguments(file_name,N,MSS):
 		print("MSS Error: Invalid maximum segment size (MSS)")
 		quit()
 
+	# Checking that a packet of MSS bytes fits in one UDP datagram
+	if(MSS>MAX_MSS):
+		print("MSS Error: MSS is larger than " + str(MAX_MSS) + ", the largest UDP datagram")
+		quit()
+
 def send_packet(client_socket,server_host_name,server_port,N):
 	"""
 	Send the Packet to the specified Server
@@ -165,35 +249,46 @@ def send_packet(client_socket,server_host_name,server_port,N):
 	# Initialising the Sequence number with 0
 	seq_no_to_send = 0
 
-	# While there are packets left to be acknowledged i.e. not all packets are recieved by the server
-	while packets_acknowledged <  number_of_packets:
-
-		# Case when all packets in the window are transmitted
-		while N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
-			lock.acquire()
-			if ack_expected < seq_no_to_send and ack_expected in packets_time:
-				TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-			lock.release()
-
-		# Case when window size(N) is greater than total number of packets
-		lock.acquire()
-		if N_GREATER_THAN_TOTAL_PACKETS(seq_no_to_send,ack_expected,N,number_of_packets) and ack_expected in packets_time:
-			TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-		lock.release()
-
-		# Case when any packet is not yet recieved by the Server
-		lock.acquire()
-		if ack_expected < seq_no_to_send and ack_expected in packets_time:
-			TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-		lock.release()
-
-		# Sending the Packet to the Server
-		lock.acquire()
-		if seq_no_to_send < number_of_packets:
-			packets_time[seq_no_to_send] = time.time()
-			client_socket.sendto(packets[seq_no_to_send].encode('UTF-8','ignore'), (server_host_name,server_port))
-			seq_no_to_send += 1
-		lock.release()
+	with window_moved:
+
+		# While there are packets left to be acknowledged i.e. not all packets are recieved by the server
+		while packets_acknowledged <  number_of_packets:
+
+			# Case when the Server reported packets as missing
+			if nak_requested:
+				NAK_RETRANSMIT(packets,client_socket,server_host_name,server_port,seq_no_to_send)
+
+			# Case when any packets are not yet recieved by the Server and they timed out
+			TIMEOUT_RETRANSMIT(packets,client_socket,server_host_name,server_port,packets_timer,seq_no_to_send)
+
+			# Sending the Packet to the Server if the window (limited by the congestion window) is not full
+			window = min(window_tuner.window(),congestion_control.window())
+			if not N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,window) and seq_no_to_send < number_of_packets:
+
+				# Waiting for the pacing tokens: a long wait sleeps on the condition so acknowledgements are still processed,
+				# the last SPIN_THRESHOLD seconds are spun as a sleep is not precise enough
+				if pacer.enabled:
+					pacer.set_window(window,rto_estimator.srtt)
+					pacing_delay = pacer.delay()
+					if pacing_delay > SPIN_THRESHOLD:
+						pacer.on_sleep()
+						window_moved.wait(pacing_delay - SPIN_THRESHOLD)
+						continue
+					pacer.spin(pacing_delay)
+					pacer.consume()
+
+				# With GSO or sendmmsg the rest of the window is sent at once, in as few system calls as possible (not when pacing)
+				send_end = seq_no_to_send + 1
+				if segment_sender.batches() and not pacer.enabled:
+					send_end = min(number_of_packets,ack_expected + window)
+				for sequence_number in range(seq_no_to_send,send_end):
+					START_TIMER(sequence_number,packets_time,packets_timer)
+				segment_sender.send_run([packets[sequence_number] for sequence_number in range(seq_no_to_send,send_end)])
+				seq_no_to_send = send_end
+
+			# Case when all packets in the window are transmitted, sleeping until an acknowledgement arrives or the first packet times out
+			else:
+				window_moved.wait(TIME_TO_TIMEOUT(packets_timer))
 
 
 def get_acknowledgement(client_socket):
@@ -210,32 +305,45 @@ def get_acknowledgement(client_socket):
 	global number_of_packets
 	global acknowled_packets_seq_nos
 
+	# Buffer the acknowledgements are received into, none is allocated for each one
+	ack_buffer = memoryview(bytearray(ACK_BUFFER_SIZE))
+
 	try:
 		# While there are packets left to be acknowledged
 		while packets_acknowledged <  number_of_packets:
-			acknowledgement, serverAddress = client_socket.recvfrom(2048) #Recieviing data from the Server
-			acknowledgement = acknowledgement.decode('UTF-8','ignore') #Decoding the acknowledgement
-			ack_seq_nr = int(acknowledgement[0:8],16) #acknowledgement sequence number
-			ack_packet_field = int(acknowledgement[12:],16) #Acknowledged Packet Field Value
+			acknowledgement_size, serverAddress = client_socket.recvfrom_into(ack_buffer) #Recieviing data from the Server into the preallocated buffer
+			acknowledgement = ack_buffer[:acknowledgement_size] #Parsed in place, each acknowledgement is processed before the next one is received
+			ack_seq_nr, _, ack_packet_field = HEADER.unpack_from(acknowledgement,0) #acknowledgement sequence number and Acknowledged Packet Field Value
 
-			# If the acknowledgement recieved was for the expected packet
-			if ack_seq_nr == ack_expected and ack_packet_field == ACK_PACKET_FIELD:
+			# If the acknowledgement recieved was for the expected packet or for the other packet sent after the expected packet
+			if ack_packet_field == ACK_PACKET_FIELD:
 				lock.acquire()
-				acknowled_packets_seq_nos.append(ack_seq_nr) #Adding the acknowledged sequence number to the dictionary
-				
-				# Loop to increment the expected acknowledgement and number of packets acknowledged that were received when the packet loss occured
-				while ack_expected in acknowled_packets_seq_nos:
-					packets_acknowledged += 1 #Incrementing the Total Number of packets acknowledged
-					ack_expected += 1 #Incrementing the Expected ACK value
-				
-				del packets_time[ack_seq_nr] #Deleting the acknowledged packet from the time list
+				ACKNOWLEDGE((ack_seq_nr,),time.time())
+				window_moved.notify() #Waking up the sending thread
 				lock.release()
-			
-			# Else If the acknowledgement recieved was for the other packet sent after the expected packet
-			elif ack_seq_nr > ack_expected and ack_packet_field == ACK_PACKET_FIELD:
+
+			# Else if it is a selective acknowledgement, all the packets below the cumulative ACK and in the ranges are acknowledged
+			elif ack_packet_field == SACK_PACKET_FIELD:
+				cumulative_ack, ranges = parse_sack(acknowledgement)
+				lock.acquire()
+				sequence_numbers = list(range(ack_expected,cumulative_ack))
+				for start,end in ranges:
+					sequence_numbers.extend(range(max(start,ack_expected),min(end,number_of_packets)))
+				ACKNOWLEDGE(sequence_numbers,time.time())
+				window_moved.notify() #Waking up the sending thread
+				lock.release()
+
+			# Else if the Server reports missing packets, they are retransmitted at once.
+			# The packets between the missing ranges and at the end of each range are received, so they are acknowledged
+			elif ack_packet_field == NAK_PACKET_FIELD:
+				cumulative_ack, missing_ranges = parse_nak(acknowledgement)
 				lock.acquire()
-				acknowled_packets_seq_nos.append(ack_seq_nr) #Adding the acknowledged sequence number to the dictionary
-				del packets_time[ack_seq_nr] #Deleting the acknowledged packet from the time list
+				sequence_numbers = list(range(ack_expected,cumulative_ack))
+				for (start,end),(next_start,_) in zip(missing_ranges,missing_ranges[1:] + [(None,None)]):
+					sequence_numbers.extend(range(end,next_start) if next_start is not None else (end,))
+					nak_requested.update(range(max(start,ack_expected),min(end,number_of_packets)))
+				ACKNOWLEDGE(sequence_numbers,time.time())
+				window_moved.notify() #Waking up the sending thread
 				lock.release()
 
 	except:
@@ -244,7 +352,7 @@ def get_acknowledgement(client_socket):
 		client_socket.close()
 
 
-def rdt_send(server_host_name,server_port,file_name,N,MSS):
+def rdt_send(server_host_name,server_port,file_name,N,MSS,stream=False,use_mmap=False,adaptive_rto=True,congestion=False,rate=None,pacing=False,auto_window=False,gso=False,batch=True,offset=0,length=None,stripe=None):
 	"""
 	Function to read data from a specified file and transfer the data to the Simple-FTP Server
 	Arguments:
@@ -253,6 +361,18 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 		file_name 			: Input File Path
 		N 					: Window Size
 		MSS 				: Maximum Segment Size
+		stream 				: Packetize the file while sending instead of before
+		use_mmap 			: Send the data as zero-copy views of the memory-mapped file
+		adaptive_rto 		: Adapt the timeout to the measured RTT instead of using TIMEOUT_VALUE
+		congestion 			: Limit the window with the AIMD congestion window, N is then the maximum window
+		rate 				: Bandwidth cap in bytes per second, the packets are paced at this rate (None for no cap)
+		pacing 				: Pace the packets at the window per smoothed RTT (limited by rate)
+		auto_window 		: Size the window from the measured bandwidth-delay product, starting from N
+		gso 				: Send runs of packets in single system calls with UDP segmentation offload (Linux)
+		batch 				: Send the window and the retransmissions in batches with sendmmsg (Linux, FreeBSD)
+		offset 				: Byte offset of the data to send in the file
+		length 				: Number of bytes to send (None for up to the end of the file)
+		stripe 				: (token, stripe index, number of stripes) when the data is one stripe of a striped transfer
 	"""
 
 	# Storing the Startig Time of the Process
@@ -269,48 +389,52 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 	print("File Name: " + file_name)
 	print("Window Size (N): " + str(N))
 	print("Maximum Segment Size (MSS): " + str(MSS))
+	if stripe is not None:
+		print("Stripe: {} of {}, {} bytes at offset {}".format(stripe[1],stripe[2],length,offset))
 
 	print()
 
 	global packets
 	global number_of_packets
+	global rto_estimator
+	global window_tuner
+	global congestion_control
+	global pacer
+	global segment_sender
+
+	# Retransmission timeout starting from TIMEOUT_VALUE
+	rto_estimator = RTOEstimator(TIMEOUT_VALUE,adaptive_rto)
+
+	# Window of N packets, or sized from the bandwidth-delay product up to MAX_WINDOW
+	window_tuner = WindowTuner(N,auto_window)
+
+	# Congestion window growing from INITIAL_WINDOW up to the window
+	congestion_control = CongestionControl(window_tuner.max_window,congestion)
+
+	# Packets spaced by a token bucket at the pacing rate
+	pacer = Pacer(MSS + HEADER.size,rate,pacing)
 
 	# Creating UDP Socket
 	client_port = 7735
 	client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-	# Opening the file and getting the total count of packets
-	data_file = open(file_name,'rb')
-	file_size = os.path.getsize(file_name)
-	number_of_partitions = math.ceil(file_size/MSS)
-
-	# Reading the first MSS data and initializing the sequence number with 0
-	data_of_MSS_size = data_file.read(MSS)
-	sequence_number = 0
-
-	# Looping while there is no more MSS size of data left
-	while(data_of_MSS_size):
-
-		data = str(data_of_MSS_size,'UTF-8',errors='replace') #Encoding the data from bytes to string
-		data_to_send = data
-		checksum = get_checksum(data) #Computing the Checksum
-		checksum = '{:04x}'.format(checksum) #Convertring the Checksum to 16-bit or 4 byte HEXADECIMAL VALUE
-		seq_nr = '{:08x}'.format(sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-		data_packet_field = '{:04x}'.format(DATA_PACKET_FIELD) #Convertring the Data Field Value to to 16-bit or 4 byte HEXADECIMAL VALUE
-		packet = seq_nr + checksum + data_packet_field + data_to_send #Creating the complete packet by adding the header and the Data
-		packets.append(str(packet)) #Storing the packet in packets list
-		data_of_MSS_size = data_file.read(MSS) #Reading next MSS length of data
-		sequence_number += 1 #Incrementing the Sequence Number
-
-	# Sending the last packet as END_OF_FILE to identify all the data has been sent
-	end_of_file = "END_OF_FILE"
-	data_to_send = end_of_file
-	checksum = get_checksum(end_of_file) #Computing the Checksum
-	checksum = '{:04x}'.format(checksum) #Convertring the Checksum to 16-bit or 4 byte HEXADECIMAL VALUE
-	seq_nr = '{:08x}'.format(sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-	data_packet_field = '{:04x}'.format(DATA_PACKET_FIELD) #Convertring the Data Field Value to to 16-bit or 4 byte HEXADECIMAL VALUE
-	packet = seq_nr + checksum + data_packet_field + data_to_send #Creating the complete packet by adding the header and the Data
-	packets.append(str(packet)) #Storing the packet in packets list
+	# Packets sent one by one, or in runs with GSO or batches with sendmmsg if the platform supports them
+	segment_sender = SegmentSender(client_socket,(server_host_name,server_port),gso,batch)
+	if gso and not segment_sender.gso:
+		print("GSO Warning: UDP segmentation offload is not supported, sending one packet at a time")
+
+	# A stripe is announced to the Server before its data, which is then sent from the same socket
+	if stripe is not None:
+		announce_stripe(client_socket,(server_host_name,server_port),stripe,offset)
+
+	# Packetizing the file, in streaming mode only STREAM_LOOKAHEAD packets ahead of the window are held in memory.
+	# The buffer holds the largest window the tuner can reach, a packet of the window is never waited for with the lock held
+	buffer_size = window_tuner.max_window + STREAM_LOOKAHEAD if stream else None
+	if use_mmap:
+		packets = MappedPacketStream(file_name,MSS,get_checksum,buffer_size,offset,length)
+	else:
+		packets = PacketStream(file_name,MSS,get_checksum,buffer_size,offset,length)
+	packets.start()
 
 	# Calculating teh total number of packets to be sent
 	number_of_packets = len(packets)
@@ -333,6 +457,23 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 	# Closing the Socket
 	client_socket.close()
 
+	# Printing the final retransmission timeout and RTT estimate
+	rto_stats = rto_estimator.stats()
+	print()
+	print("RTO: {} s, SRTT: {} s, RTTVAR: {} s, RTT Samples: {}, Timeouts: {}".format(rto_stats['rto'],rto_stats['srtt'],rto_stats['rttvar'],rto_stats['samples'],rto_stats['timeouts']))
+	if auto_window:
+		window_stats = window_tuner.stats()
+		print("Auto Window: {} packets, Bandwidth: {:.0f} packets/s, Min RTT: {} s, BDP: {:.1f} packets".format(window_stats['window'],window_stats['bandwidth'] or 0,window_stats['min_rtt'],window_stats['bdp'] or 0))
+	if pacer.enabled:
+		pacer_stats = pacer.stats()
+		print("Pacing Rate: {:.0f} bytes/s, Average Rate: {:.0f} bytes/s, Sleeps: {}, Spins: {}".format(pacer_stats['rate'] or 0,pacer_stats['bytes_sent']/(finish_time - begin_time),pacer_stats['sleeps'],pacer_stats['spins']))
+	if segment_sender.batches():
+		sender_stats = segment_sender.stats()
+		print("Datagrams Sent: {} in {} send calls, {:.1f} per call".format(sender_stats['datagrams'],sender_stats['send_calls'],sender_stats['datagrams_per_call']))
+	if congestion:
+		cwnd_stats = congestion_control.stats()
+		print("CWND: {:.1f} packets, SSTHRESH: {:.1f} packets, Max CWND: {:.1f} packets, Losses: {}, Timeouts: {}".format(cwnd_stats['cwnd'],cwnd_stats['ssthresh'],cwnd_stats['max_cwnd'],cwnd_stats['losses'],cwnd_stats['timeouts']))
+
 	# Returning the Delay(Time tacken by the process)
 	return finish_time - begin_time
 
@@ -343,16 +484,55 @@ if __name__ == '__main__':
 	time.sleep(0.5)
 	
 	# Reading Arguments
-	server_host_name = sys.argv[1]
-	server_port = int(sys.argv[2])
-	file_name = sys.argv[3]
-	N = int(sys.argv[4])
-	MSS = int(sys.argv[5])
+	parser = argparse.ArgumentParser(description="Simple-FTP Client (Selective Repeat ARQ)")
+	parser.add_argument('server_host_name',help="Host Name of the Server")
+	parser.add_argument('server_port',type=int,help="Port # of the Server")
+	parser.add_argument('file_name',help="Input File Path")
+	parser.add_argument('N',type=int,help="Window Size")
+	parser.add_argument('MSS',type=int,help="Maximum Segment Size")
+	parser.add_argument('--checksum',default='internet',choices=sorted(CHECKSUM_FUNCTIONS),help="Checksum implementation, must match the server")
+	parser.add_argument('--stream',action='store_true',help="Packetize the file while sending, holding only the window in memory")
+	parser.add_argument('--mmap',action='store_true',help="Memory-map the file and send the data without copying it")
+	parser.add_argument('--fixed-rto',action='store_true',help="Always use TIMEOUT_VALUE instead of adapting the timeout to the measured RTT")
+	parser.add_argument('--congestion-control',action='store_true',help="Limit the window with an AIMD congestion window (slow start), N is then the maximum window")
+	parser.add_argument('--cwnd-log',help="Write the congestion window trajectory to this CSV file (one file for each stripe with --stripes, named <file>.stripe<index>)")
+	parser.add_argument('--rate',type=parse_rate,help="Bandwidth cap in bits per second (K, M or G suffix, e.g. 200M), the packets are paced at this rate")
+	parser.add_argument('--pacing',action='store_true',help="Pace the packets at the window per smoothed RTT instead of sending each window as a burst")
+	parser.add_argument('--auto-window',action='store_true',help="Size the window from the measured bandwidth-delay product, N is then the initial window")
+	parser.add_argument('--stripes',type=int,default=1,help="Split the file into byte ranges sent over this many sockets by as many processes")
+	parser.add_argument('--gso',action='store_true',help="Send runs of packets in single system calls with UDP segmentation offload (Linux 4.18)")
+	parser.add_argument('--no-batch',action='store_true',help="Send one datagram per system call instead of batches with sendmmsg")
+	parser.add_argument('--discover-mss',action='store_true',help="Use the largest MSS that is not fragmented on the path to the Server (path MTU discovery) instead of MSS")
+	args = parser.parse_args()
+
+	server_host_name = args.server_host_name
+	server_port = args.server_port
+	file_name = args.file_name
+	N = args.N
+	MSS = args.MSS
+	get_checksum = get_checksum_function(args.checksum)
 	
 	os.system("clear")
 
-	# Calling the funtion to start the transfer
-	delay = rdt_send(server_host_name, server_port, file_name, N, MSS)
+	# Replacing the MSS with the largest one the path carries without IP fragmentation
+	if args.discover_mss:
+		path = discover_mss(server_host_name,server_port)
+		if path is None:
+			print("MTU Warning: Path MTU discovery is not supported on this platform, using MSS " + str(MSS))
+		else:
+			print("Path MTU: {}, MSS: {} (pass it as the MSS argument to skip the discovery)".format(*path))
+			MSS = path[1]
+
+	# Calling the funtion to start the transfer, from a process for each stripe when the file is striped
+	if args.stripes > 1:
+		check_arguments(file_name,N,MSS)
+		delay = send_striped('Selective_Repeat_Simple_ftp_client',args.checksum,server_host_name,server_port,file_name,N,MSS,args.stripes,(args.stream,args.mmap,not args.fixed_rto,args.congestion_control,args.rate and args.rate/args.stripes,args.pacing,args.auto_window,args.gso,not args.no_batch),args.cwnd_log)
+	else:
+		delay = rdt_send(server_host_name, server_port, file_name, N, MSS, args.stream, args.mmap, not args.fixed_rto, args.congestion_control, args.rate, args.pacing, args.auto_window, args.gso, not args.no_batch)
+
+		# Saving the congestion window trajectory for analysis
+		if args.cwnd_log:
+			congestion_control.write_trajectory(args.cwnd_log)
 
 	# Giving the Delay(Time tacken by the process)
 	print()
@@ -1,99 +1,279 @@
 import socket
 import sys
+import argparse
 import os
-import random
+import time
 
-# Field Value for the Data Packet and the Acknowledged Packet
-DATA_PACKET_FIELD = int('0101010101010101',2)
-ACK_PACKET_FIELD = int('1010101010101010',2)
+from ack_policy import DEFAULT_ACK_DELAY, AckPolicy
+from checksum import CHECKSUM_FUNCTIONS, get_checksum_function
+from file_writer import DEFAULT_BUFFER_SIZE, FSYNC_POLICIES, FileWriter
+from loss_service import discard_packet
+from packet_format import DATA_PACKET_FIELD, END_OF_FILE, HEADER_SIZE, MAX_MSS, STRIPE_PACKET_FIELD, STRIPE_REJECTED, MAX_SACK_RANGES, make_ack, make_nak, make_sack, make_stripe, parse_packet, parse_stripe
+from reassembly import Reassembler
+from receive_pipeline import SWITCH_INTERVAL, ReceivePipeline
+from striping import StripeGroup
+from udp_offload import DatagramReceiver
+from worker_pool import reuse_port_supported, supervise
 
-# Dictionary to store all the acknowledged data packets and its data
-packets_acknowledged = {}
+# Checksum function for the data, selected with --checksum (must match the client)
+get_checksum = get_checksum_function('internet')
 
-# Sequence number of the last packet
-last_seq_no = float('inf')
+# Seconds between negative acknowledgements while packets are missing, in NAK mode
+NAK_INTERVAL = 0.05
 
-# field that is all zeroes
-ZERO = 0
+# Seconds without packets from a client after which its session is closed
+SESSION_TIMEOUT = 60
 
-def get_checksum(data):
+def check_checksum(data,checksum):
+	"""
+	Check if the checksum of the received data is correct
+	data 		: data received
+	checksum 	: Checksum received
+	"""
+	check = get_checksum(data) #Calculate the checksum of the data received
+	# Returns true if the checksum matches
+	return check == checksum
+
+def verify_packet(packet):
 	"""
-	Calculate the Checksum of the data
+	Verification stage of the pipelined receiver: check the checksum of a data packet
 	Arguments:
-		data : Data Value in String for which the checksum is to be calculated
+		packet : Datagram as received
+	Returns:
+		True if the checksum of the data packet matches, None for any other datagram
+	"""
+	if len(packet) < HEADER_SIZE:
+		return None
+	_, checksum, data_packet_field, data = parse_packet(packet)
+	if data_packet_field != DATA_PACKET_FIELD:
+		return None
+	return check_checksum(data,checksum)
+
+class Session:
+	"""
+	State of the transfer from one client: the reassembly of its output file and the acknowledgements.
+	The Server keeps one Session per client address, so several clients can upload on the same port at the same time
 	"""
-	sm = 0
-	size = len(data) - len(data) % 2 # Storing the length if data, if data is odd, then data length else data length -1
-	
-	# Running loop fo each 2 byte data in the data
-	for i in range(0, size, 2): 
-		shift = ord(data[i]) + (ord(data[i+1]) << 8) #Adding data and its 8bit left shifted part
-		chk = sm + shift #Concating the shift to the total data
-		sm = (chk & 0xffff) + (chk >> 16) #Carry Around add
-	return ~sm & 0xffff #Returning the checksum
 
-def discard_packet(p):
+	def __init__(self,clientAddress,transfer_id,file_name,buffer_size,fsync_policy,fsync_interval,ack_every,ack_delay,base_offset=None,write_stage=None):
+		"""
+		Arguments:
+			clientAddress 	: (Host, Port #) of the Client
+			transfer_id 	: Number of the transfer on the Server (0 for the first one)
+			file_name 		: Output File Path of the transfer
+			buffer_size 	: Bytes of in order data coalesced before writing to the output file
+			fsync_policy 	: When the output file is forced to disk (none, end or periodic)
+			fsync_interval 	: Seconds between fsyncs for the periodic policy
+			ack_every 		: Packets received in order covered by one acknowledgement
+			ack_delay 		: Seconds an acknowledgement may wait for more packets
+			base_offset 	: File offset where the data is written, for a stripe of a striped transfer (None to add it after the content of the file)
+			write_stage 	: WriteStage doing the file operations of the pipelined receiver (None to write in the Server's loop)
+		"""
+		self.clientAddress = clientAddress
+		self.transfer_id = transfer_id
+		self.file_name = file_name
+
+		# Each accepted packet is written at its offset in the output file, reassembler.base is the lowest sequence number not received yet.
+		# The other stripes of a striped transfer write in the same file, so no space is preallocated
+		self.reassembler = Reassembler(FileWriter(file_name,buffer_size,fsync_policy,fsync_interval,use_pwrite=True,base_offset=base_offset,write_stage=write_stage),preallocation=base_offset is None)
+
+		# Acknowledgements coalesced over ack_every packets or ack_delay seconds
+		self.ack_policy = AckPolicy(ack_every,ack_delay)
+		self.last_nak_time = 0
+
+		# Time of the last packet from the Client for the idle expiry, and whether all the packets were received
+		self.last_packet_time = time.time()
+		self.finished = False
+
+		# StripeGroup and index of the stripe when the session is one stripe of a striped transfer
+		self.stripe_group = None
+		self.stripe_index = None
+
+	def next_deadline(self,nak,nak_interval,session_timeout):
+		"""
+		time.time() value when the Server has to act on the session: delayed acknowledgement, NAK or expiry
+		Arguments:
+			nak 			: NAK mode
+			nak_interval 	: Seconds between negative acknowledgements of the same gap
+			session_timeout : Seconds without packets after which the session is closed
+		"""
+		deadline = self.last_packet_time + session_timeout
+		if self.ack_policy.unacknowledged:
+			deadline = min(deadline,self.ack_policy.first_unacknowledged_time + self.ack_policy.ack_delay)
+		if nak and self.reassembler.bitmap and not self.finished:
+			deadline = min(deadline,self.last_nak_time + nak_interval)
+		return deadline
+
+def send_acknowledgement(server_socket,session):
 	"""
-	probabilistic loss service to discard packet
-	p 	: probability of packet failure
+	Send the selective acknowledgement of everything received so far
+	Arguments:
+		server_socket 	: Server Socket
+		session 		: Session of the Client
 	"""
-	r = round(random.random(),2) #Getting a random value r
-	# If random value is 0, re calculate the random value
-	while r == 0.0:
-		r = round(random.random(),2)
+	server_socket.sendto(make_sack(session.reassembler.base,session.reassembler.sack_ranges(MAX_SACK_RANGES)), session.clientAddress)
+	session.ack_policy.on_ack_sent()
 
-	# Returns True if the random value is less or equal to p
-	return r<=p
+def send_nak(server_socket,session):
+	"""
+	Send the negative acknowledgement of the packets missing between the base and the highest received packet
+	Arguments:
+		server_socket 	: Server Socket
+		session 		: Session of the Client
+	"""
+	server_socket.sendto(make_nak(session.reassembler.base,session.reassembler.missing_ranges(MAX_SACK_RANGES)), session.clientAddress)
+	session.ack_policy.on_ack_sent()
+	session.last_nak_time = time.time()
 
-def check_checksum(data,checksum):
+def service_session(server_socket,session,nak,nak_interval):
 	"""
-	Check if the checksum of the received data is correct
-	data 		: data received
-	checksum 	: Checksum received
+	Send the acknowledgements of the session that are due without a new packet
+	Arguments:
+		server_socket 	: Server Socket
+		session 		: Session of the Client
+		nak 			: NAK mode
+		nak_interval 	: Seconds between negative acknowledgements of the same gap
 	"""
-	check = get_checksum(data) #Calculate the checksum of the data received
-	# Returns true if the checksum matches
-	return check == checksum
+	# Sending the delayed acknowledgement of the packets received in order
+	if session.ack_policy.due(time.time()):
+		send_acknowledgement(server_socket,session)
+
+	# Repeating the NAK while the gap persists, in case it or the retransmission was lost
+	if nak and session.reassembler.bitmap and not session.finished and time.time() - session.last_nak_time >= nak_interval:
+		send_nak(server_socket,session)
 
-def check_arguments(file_name,p):
+def receive_packet(server_socket,session,client_sequence_number,checksum,data,p,sack,nak,verified=None):
+	"""
+	Handle a data packet of the session
+	Arguments:
+		server_socket 			: Server Socket
+		session 				: Session of the Client
+		client_sequence_number 	: Sequence Number of the packet
+		checksum 				: Checksum of the packet
+		data 					: Data of the packet
+		p 						: Probability of packet loss
+		sack 					: Send selective acknowledgements
+		nak 					: NAK mode
+		verified 				: Result of the checksum from the verify stage of the pipelined receiver (None to check it here)
+	"""
+	reassembler = session.reassembler
+	ack_policy = session.ack_policy
+	session.last_packet_time = time.time()
+
+	# If the Packet is already received discard and continue, with selective acknowledgements the client is told again in case the ACK was lost
+	# (and always once the transfer is finished, as the Client waits for the ACK of its last packets)
+	if(reassembler.is_received(client_sequence_number)):
+		if sack:
+			send_acknowledgement(server_socket,session)
+		elif session.finished:
+			server_socket.sendto(make_ack(client_sequence_number), session.clientAddress)
+			ack_policy.on_ack_sent()
+
+	# If the Packet is discared by the probabilistic loss service
+	elif(discard_packet(p)):
+		print('Packet loss, sequence number = '+ str(client_sequence_number))
+
+	# Else if the Checksum matches, for the expected sequence number or greater
+	# i.e. also for the case when the expected sequence number packet is dropped but the next packet is received
+	elif(check_checksum(data,checksum) if verified is None else verified):
+
+		# A packet above the highest received one opens a new gap
+		new_gap = client_sequence_number > reassembler.highest_received() + 1
+
+		# A packet out of order (opening or filling a gap) is acknowledged at once
+		out_of_order = client_sequence_number != reassembler.base or reassembler.bitmap != 0
+
+		# if the data received is the END OF FILE i.e the last data packet
+		if data == END_OF_FILE:
+			reassembler.end_of_file(client_sequence_number)
+
+		# Else write the recieved data at its offset in the output file
+		else:
+			reassembler.add(client_sequence_number,data)
+
+		# Acknowledging every ack_every packets in order, the others wait for the delayed acknowledgement.
+		# The END_OF_FILE packet and the packets out of order are acknowledged at once
+		if ack_policy.on_packet(time.time()) or out_of_order or data == END_OF_FILE:
+			# Creating the 8 byte binary acknowledgement header, or the selective acknowledgement of everything received so far
+			if sack:
+				send_acknowledgement(server_socket,session)
+			else:
+				server_socket.sendto(make_ack(client_sequence_number), session.clientAddress) #Send acknowledgement to the Client
+				ack_policy.on_ack_sent()
+
+		# Telling the Client at once which packets are missing
+		if nak and new_gap:
+			send_nak(server_socket,session)
+
+		# Complete data is received from the client, close the output file
+		if reassembler.complete():
+			reassembler.close() #Write the remaining data to the output file
+			session.finished = True
+
+def check_arguments(file_name,p,transfers=1):
 	"""
 	Check if the provided arguments are within the specified range or not
 	Arguments:
 		file_name 	: Output File Path
 		p 			: Probability
+		transfers 	: Number of transfers to receive (0 for no limit)
 	"""
+	# An output file name with {host}, {port} or {transfer} is created for each transfer, only its directory has to exist
+	if file_name_template(file_name):
+		if(not os.path.isdir(os.path.dirname(os.path.abspath(file_name)))):
+			print("FileError: The directory of the output files doesn't exist")
+			quit()
+
 	# Checking if the given outpu file exists on the system or not
-	if(not os.path.exists(file_name)):
+	elif(not os.path.exists(file_name)):
 		print("FileError: The defined file doesn't exist, Please check the name of the file")
 		quit()
-		
+
+	# Several transfers can not be written to the same file
+	elif transfers != 1:
+		print("FileError: Use {host}, {port} or {transfer} in the file name to receive several transfers")
+		quit()
+
 	# Checking for valid probabilistic loss service (p)
 	if(p<=0 or p>=1):
 		print("Probability Error: Invalid probability value")
 		quit()
 
-def write_to_file(packets_acknowledged,file_name,last_seq_no):
+def file_name_template(file_name):
 	"""
-	Write the received packets in the given file
+	Check if the output file name has a {host}, {port} or {transfer} field for each transfer
 	Arguments:
-		packets_acknowledged	: Dictionary containing data for each sequence number
-		file_name 				: Output File Path
-		last_seq_no 			: Last Sequence Number till which the data exists
+		file_name 	: Output File Path
 	"""
-	for packet in range(0,last_seq_no):
-		open(file_name, 'ab').write(str.encode(packets_acknowledged[packet]))
+	return file_name.format(host='',port='',transfer='') != file_name
 
-def rdt_receive(server_port,file_name,p):
+def rdt_receive(server_port,file_name,p,buffer_size=DEFAULT_BUFFER_SIZE,fsync_policy='none',fsync_interval=1.0,sack=False,nak=False,nak_interval=NAK_INTERVAL,ack_every=1,ack_delay=DEFAULT_ACK_DELAY,transfers=1,session_timeout=SESSION_TIMEOUT,max_mss=MAX_MSS,gro=False,batch=True,pipeline=False,worker=None):
 	"""
-	Function to receive data from a client and send acknowledgement via Simple-FTP Server
+	Function to receive data from clients and send acknowledgement via Simple-FTP Server
 	Arguments:
-		server_port	: Post # of the Server
-		file_name 	: Output File Path
-		p			: Proibability
+		server_port		: Post # of the Server
+		file_name 		: Output File Path, formatted with {host}, {port} and {transfer} (0, 1, ...) for each transfer
+		p				: Proibability
+		buffer_size 	: Bytes of in order data coalesced before writing to the output file
+		fsync_policy 	: When the output file is forced to disk (none, end or periodic)
+		fsync_interval 	: Seconds between fsyncs for the periodic policy
+		sack 			: Send selective acknowledgements (cumulative ACK and received ranges)
+		nak 			: Send negative acknowledgements of the missing ranges when a gap is detected and every nak_interval seconds while it persists
+		nak_interval 	: Seconds between negative acknowledgements of the same gap
+		ack_every 		: Packets received in order covered by one acknowledgement (selective, as a plain ACK only covers one packet)
+		ack_delay 		: Seconds an acknowledgement may wait for more packets
+		transfers 		: Number of transfers to receive before closing the Server (0 for no limit)
+		session_timeout : Seconds without packets after which a session is closed
+		max_mss 		: Largest MSS accepted, the receive buffer holds one packet of this size
+		gro 			: Receive coalesced datagrams with UDP generic receive offload (Linux)
+		batch 			: Receive the waiting datagrams in batches with recvmmsg (Linux, FreeBSD)
+		pipeline 		: Receive, verify and write on separate threads connected by bounded queues
+		worker 			: WorkerContext when the Server runs as one of several worker processes on the port (SO_REUSEPORT),
+						  the worker receives transfers until the supervisor stops it
 	"""
 
 	# Checking for invalid input values
-	check_arguments(file_name,p)
+	check_arguments(file_name,p,transfers)
 
 	# Printing the Arguments for the transfer process
 	print()
@@ -108,109 +288,209 @@ def rdt_receive(server_port,file_name,p):
 	server_host_name = socket.gethostname()
 	print("Server's Host Name: " + str(server_host_name))
 	print()
-	server_socket.bind(('', server_port))
+	if worker is None:
+		server_socket.bind(('', server_port))
+	else:
+		worker.bind(server_socket,server_port)
 
-	# Initializing the sequence number with 0
-	server_sequence_number = 0
+	# A plain ACK can not cover several packets, coalesced acknowledgements are selective
+	sack = sack or ack_every > 1
 
-	global packets_acknowledged
-	global last_seq_no
+	# Session of each client address, and the number of transfers started and received
+	sessions = {}
+	transfers_started = 0
+	transfers_received = 0
 
-	# Receiving data
-	while 1:
+	# Striped transfers being received, by (Client Host, token)
+	stripe_groups = {}
 
-		# Complete data is received from the client, write data to the specified file
-		if(len(packets_acknowledged) == last_seq_no):
-			write_to_file(packets_acknowledged,file_name,last_seq_no) #Write data to the specified file
-			server_socket.close() # Close the Server Socket
-			
+	# Receive buffer of one packet of the largest MSS and one more byte, so a larger datagram is seen as truncated instead of failing its checksum
+	receive_size = HEADER_SIZE + max_mss + 1
+	truncated_datagrams = 0
+
+	# Datagrams received one by one, or split from the coalesced buffers of GRO or drained in batches with recvmmsg if the platform supports them
+	# With the pipeline they are read by its drain thread and checked by its verify thread while this loop runs the protocol
+	receive_pipeline = ReceivePipeline(server_socket,receive_size,verify_packet,gro,batch) if pipeline else None
+	receiver = DatagramReceiver(server_socket,receive_size,gro,batch) if receive_pipeline is None else receive_pipeline.receiver
+	write_stage = None if receive_pipeline is None else receive_pipeline.write_stage
+	if gro and not receiver.gro:
+		print("GRO Warning: UDP generic receive offload is not supported, receiving one datagram at a time")
+
+	# The socket waits at most until an acknowledgement, a NAK or a session expiry is due
+	socket_timeout = None
+
+	# Receiving data
+	while worker is not None or transfers == 0 or transfers_received < transfers:
+
+		deadline = None
+		for clientAddress, session in list(sessions.items()):
+			service_session(server_socket,session,nak,nak_interval)
+
+			# Closing the sessions without packets for session_timeout seconds, finished ones are kept until then to acknowledge retransmissions
+			if time.time() - session.last_packet_time >= session_timeout:
+				if not session.finished:
+					session.reassembler.close()
+					print("Session Expired: {} (transfer {}), Please check {}".format(clientAddress,session.transfer_id,session.file_name))
+					if session.reassembler.discarded_bytes:
+						print("Segment Discarded: {} bytes received before the MSS was known".format(session.reassembler.discarded_bytes))
+					if session.stripe_group is not None:
+						stripe_groups.pop(session.stripe_group.key,None)
+				del sessions[clientAddress]
+				continue
+
+			session_deadline = session.next_deadline(nak,nak_interval,session_timeout)
+			deadline = session_deadline if deadline is None else min(deadline,session_deadline)
+
+		timeout = None if deadline is None else max(0,deadline - time.time())
+		if receive_pipeline is None and timeout != socket_timeout:
+			server_socket.settimeout(timeout)
+			socket_timeout = timeout
+
+		try:
+			if receive_pipeline is None:
+				packet, clientAddress = receiver.receive() #Receiving data from the server
+				verified = None
+			else:
+				packet, clientAddress, verified = receive_pipeline.receive(timeout)
+		except socket.timeout:
+			continue
+
+		# Discarding a datagram larger than the largest MSS, it was truncated
+		if len(packet) >= receive_size:
+			truncated_datagrams += 1
+			if truncated_datagrams == 1:
+				print("MSS Error: Datagram from {} is larger than the MSS limit {}, raise --max-mss".format(clientAddress,max_mss))
+			continue
+		client_sequence_number, checksum, data_packet_field, data = parse_packet(packet) #Sequence number, Checksum, Data Packet Field Value and Data (memoryview, no copy) as received from the client
+
+		# A stripe of a striped transfer, its session writes the byte range of the stripe in the output file of the transfer.
+		# The stripes of a transfer may reach different worker processes, so the workers reject them and the Client stops
+		if data_packet_field == STRIPE_PACKET_FIELD:
+			token, stripe_index, stripes, offset = parse_stripe(packet)
+			if worker is not None:
+				server_socket.sendto(make_stripe(token,stripe_index,STRIPE_REJECTED,offset), clientAddress)
+				continue
+			session = sessions.get(clientAddress)
+			if session is None or (session.finished and session.stripe_group is None):
+				group = stripe_groups.get((clientAddress[0],token))
+				if group is None:
+					group_file_name = file_name.format(host=clientAddress[0],port=clientAddress[1],transfer=transfers_started)
+					if file_name_template(file_name):
+						open(group_file_name,'ab').close()
+					group = StripeGroup((clientAddress[0],token),transfers_started,group_file_name,stripes,os.path.getsize(group_file_name))
+					stripe_groups[group.key] = group
+					transfers_started += 1
+				session = Session(clientAddress,group.transfer_id,group.file_name,buffer_size,fsync_policy,fsync_interval,ack_every,ack_delay,group.base_offset + offset,write_stage)
+				session.stripe_group = group
+				session.stripe_index = stripe_index
+				sessions[clientAddress] = session
+
+			# Echoing the stripe packet, the Client then sends the data of the stripe
+			server_socket.sendto(packet, clientAddress)
+			continue
+
+		# If the DATA PACKET FIELD does not match, discard the packet
+		if data_packet_field != DATA_PACKET_FIELD:
+			continue
+
+		# A new transfer: the first packet from the address, or sequence number 0 after the previous transfer from the address finished
+		session = sessions.get(clientAddress)
+		if session is None or (session.finished and client_sequence_number == 0):
+			# The workers take the transfer numbers from a shared counter
+			transfer_id = transfers_started if worker is None else worker.next_transfer_id()
+			session_file_name = file_name.format(host=clientAddress[0],port=clientAddress[1],transfer=transfer_id)
+			if file_name_template(file_name):
+				open(session_file_name,'ab').close()
+			session = Session(clientAddress,transfer_id,session_file_name,buffer_size,fsync_policy,fsync_interval,ack_every,ack_delay,write_stage=write_stage)
+			sessions[clientAddress] = session
+			transfers_started += 1
+
+		was_finished = session.finished
+		receive_packet(server_socket,session,client_sequence_number,checksum,data,p,sack,nak,verified)
+
+		# Complete data is received from the client
+		if session.finished and not was_finished:
+			group = session.stripe_group
+			ack_policy = session.ack_policy
 			print()
-			print("Server Closed")
-			print("Data Recieved")
-			print("Please check {}".format(file_name))
-			break;
-
-		packet, clientAddress = server_socket.recvfrom(2048) #Receiving data from the server
-		packet = packet.decode('UTF-8','ignore') #Decoding the data received
-		client_sequence_number = int(packet[0:8],16) #Data packet sequence number as received frm client
-		checksum = int(packet[8:12],16) #Checksum as received from the client
-		data_packet_field = int(packet[12:16],16) # Data Packet Field Value
-		data = packet[16:]	# Data from the Client
-
-		# Incrementing the Sequence Number for all the data packets which were received when server_sequence_number < client_sequence_number
-		while(server_sequence_number < client_sequence_number and server_sequence_number in packets_acknowledged):
-			server_sequence_number += 1 #Incrementing the Sequence Number
-
-		# If the sequence number and the DATA PACKET FIELD matches
-		if server_sequence_number == client_sequence_number and data_packet_field == DATA_PACKET_FIELD:
-			
-			# If the Packet is already received discard and continue
-			if(server_sequence_number in packets_acknowledged):
-				pass
-
-			# If the Packet is discared by the probabilistic loss service
-			elif(discard_packet(p)):
-				print('Packet loss, sequence number = '+ str(client_sequence_number))
-
-			# Else if the Checksum matches
-			elif(check_checksum(data,checksum)):
-				seq_nr = '{:08x}'.format(client_sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-				all_zeroes = '{:04x}'.format(ZERO) #Convertring the Zero to 16-bit or 4 byte HEXADECIMAL VALUE
-				ack_packet_field = '{:04x}'.format(ACK_PACKET_FIELD) #Convertring the Acknowledgement Field Value to 16-bit or 4 byte HEXADECIMAL VALUE
-				acknowledgement = seq_nr + all_zeroes + ack_packet_field # #Creating the complete acknowledgement by adding the header and the Data
-				server_socket.sendto(acknowledgement.encode('UTF-8','ignore'), clientAddress) #Send acknowledgement to the Client
-				# print(acknowledgement)
-
-				# if the data received is the END OF FILE i.e the last data packet
-				if data == "END_OF_FILE":
-					last_seq_no = client_sequence_number
-
-				# Else write the recieved data in the output file
-				else:
-					packets_acknowledged[client_sequence_number] = data
-
-				server_sequence_number += 1 #Incrementing the Sequence Number
-
-		# If the DATA PACKET FIELD matches but the sequence number is of packet with sequence number greater than the expected sequence number
-		# i.e. for the case when the expected sequence number packet is dropped but the next packet is received
-		elif server_sequence_number < client_sequence_number and data_packet_field == DATA_PACKET_FIELD:
-			
-			# If the Packet is already received discard and continue
-			if(server_sequence_number in packets_acknowledged):
-				pass
-
-			# If the Packet is discared by the probabilistic loss service
-			elif(discard_packet(p)):
-				print('Packet loss, sequence number = '+ str(client_sequence_number))
-
-			# Else if the Checksum matches
-			elif(check_checksum(data,checksum)):
-				seq_nr = '{:08x}'.format(client_sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-				all_zeroes = '{:04x}'.format(ZERO) #Convertring the Zero to 16-bit or 4 byte HEXADECIMAL VALUE
-				ack_packet_field = '{:04x}'.format(ACK_PACKET_FIELD) #Convertring the Acknowledgement Field Value to 16-bit or 4 byte HEXADECIMAL VALUE
-				acknowledgement = seq_nr + all_zeroes + ack_packet_field # #Creating the complete acknowledgement by adding the header and the Data
-				server_socket.sendto(acknowledgement.encode('UTF-8','ignore'), clientAddress) #Send acknowledgement to the Client
-				# print(acknowledgement)
-
-				# if the data received is the END OF FILE i.e the last data packet
-				if data == "END_OF_FILE":
-					last_seq_no = client_sequence_number
-
-				# Else write the recieved data in the output file
-				else:
-					packets_acknowledged[client_sequence_number] = data
+			if group is None:
+				print("Data Recieved from {} (transfer {})".format(clientAddress,session.transfer_id))
+			else:
+				print("Stripe {} of {} Recieved from {} (transfer {})".format(session.stripe_index,group.stripes,clientAddress,session.transfer_id))
+			print("ACKs Sent: {} for {} data packets, ratio {:.3f}".format(ack_policy.acks_sent,ack_policy.data_packets,ack_policy.ratio()))
+
+			# A striped transfer is received with its last stripe
+			if group is None or group.on_stripe_received():
+				if group is not None:
+					del stripe_groups[group.key]
+					print("Data Recieved: {} stripes (transfer {})".format(group.stripes,group.transfer_id))
+				transfers_received += 1
+				print("Please check {}".format(session.file_name))
+			if worker is not None:
+				worker.report(session.transfer_id,clientAddress,session.file_name,session.reassembler.writer.bytes_written,ack_policy.data_packets,ack_policy.acks_sent)
+
+	# Writing the data of the unfinished sessions and closing the Server Socket
+	for session in sessions.values():
+		if not session.finished:
+			session.reassembler.close()
+	if receive_pipeline is not None:
+		receive_pipeline.stop()
+	server_socket.close()
+	receiver_stats = receiver.stats()
+	if gro or batch:
+		print("Datagrams Received: {} in {} receive calls, {:.1f} per call".format(receiver_stats['datagrams'],receiver_stats['receive_calls'],receiver_stats['datagrams_per_call']))
+	print("Receive Ring: {} KB of address space, backed by memory as datagrams are written to it".format(receiver_stats['ring_size']//1024))
+	if receive_pipeline is not None:
+		for queue_stats in receive_pipeline.stats()['queues']:
+			print("Pipeline Queue {name}: {items} items, at most {max_depth} of {capacity} queued, full {full} times".format(**queue_stats))
+	print()
+	print("Server Closed")
 
 if __name__ == '__main__':
 
 	#Reading Arguments
-	server_port = int(sys.argv[1])
-	file_name = sys.argv[2]
-	p = float(sys.argv[3])
+	parser = argparse.ArgumentParser(description="Simple-FTP Server (Selective Repeat ARQ)")
+	parser.add_argument('server_port',type=int,help="Port # of the Server")
+	parser.add_argument('file_name',help="Output File Path, may contain {host}, {port} and {transfer} to write each transfer to its own file")
+	parser.add_argument('p',type=float,help="Probability of packet loss")
+	parser.add_argument('--checksum',default='internet',choices=sorted(CHECKSUM_FUNCTIONS),help="Checksum implementation, must match the client")
+	parser.add_argument('--write-buffer',type=int,default=DEFAULT_BUFFER_SIZE,help="Bytes of in order data coalesced before writing to the output file")
+	parser.add_argument('--fsync',default='none',choices=FSYNC_POLICIES,help="When the output file is forced to disk")
+	parser.add_argument('--fsync-interval',type=float,default=1.0,help="Seconds between fsyncs for --fsync periodic")
+	parser.add_argument('--sack',action='store_true',help="Send selective acknowledgements (cumulative ACK and received ranges)")
+	parser.add_argument('--nak',action='store_true',help="Send negative acknowledgements of the missing packets as soon as a gap is detected")
+	parser.add_argument('--nak-interval',type=float,default=NAK_INTERVAL,help="Seconds between negative acknowledgements while packets are missing")
+	parser.add_argument('--ack-every',type=int,default=1,help="Packets received in order covered by one acknowledgement")
+	parser.add_argument('--ack-delay',type=float,default=DEFAULT_ACK_DELAY*1e6,help="Microseconds an acknowledgement may wait for more packets")
+	parser.add_argument('--transfers',type=int,default=1,help="Number of transfers to receive before closing the Server (0 for no limit)")
+	parser.add_argument('--session-timeout',type=float,default=SESSION_TIMEOUT,help="Seconds without packets after which a session is closed")
+	parser.add_argument('--max-mss',type=int,default=MAX_MSS,help="Largest MSS accepted, the receive buffers are sized for it (the MSS is not negotiated, set it to the MSS the Clients use)")
+	parser.add_argument('--gro',action='store_true',help="Receive coalesced datagrams with UDP generic receive offload (Linux 5.0)")
+	parser.add_argument('--no-batch',action='store_true',help="Receive one datagram per system call instead of batches with recvmmsg")
+	parser.add_argument('--pipeline',action='store_true',help="Receive, verify and write on separate threads connected by bounded queues")
+	parser.add_argument('--workers',type=int,default=1,help="Worker processes receiving on the port with SO_REUSEPORT, restarted by a supervisor")
+	args = parser.parse_args()
+
+	server_port = args.server_port
+	file_name = args.file_name
+	p = args.p
+	get_checksum = get_checksum_function(args.checksum)
 
 	os.system("clear")
 
-	# Calling the funtion to start the transfer
-	rdt_receive(server_port,file_name,p)
+	# The pipeline threads switch more often, for the whole Server process (the workers are forked from it)
+	if args.pipeline:
+		sys.setswitchinterval(SWITCH_INTERVAL)
+
+	# Calling the funtion to start the transfer, in each worker process when there are several
+	if args.workers > 1:
+		if not reuse_port_supported():
+			print("Worker Error: SO_REUSEPORT is not supported on this platform")
+			quit()
+		check_arguments(file_name,p,args.transfers)
+		supervise(rdt_receive,(server_port,file_name,p,args.write_buffer,args.fsync,args.fsync_interval,args.sack,args.nak,args.nak_interval,args.ack_every,args.ack_delay/1e6,args.transfers,args.session_timeout,args.max_mss,args.gro,not args.no_batch,args.pipeline),args.workers,args.transfers)
+	else:
+		rdt_receive(server_port,file_name,p,args.write_buffer,args.fsync,args.fsync_interval,args.sack,args.nak,args.nak_interval,args.ack_every,args.ack_delay/1e6,args.transfers,args.session_timeout,args.max_mss,args.gro,not args.no_batch,args.pipeline)
 
 	# close_server = input("Close Server? y/n : ")
 	# if close_server.lower() == "y":
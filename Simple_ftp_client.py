@@ -1,25 +1,53 @@
 import time
 import socket
 import sys
+import argparse
 import threading
-import math
 import os
 import os.path
 import traceback
 
-# Timeout Interval for the packet to get acknowledged
+from checksum import CHECKSUM_FUNCTIONS, get_checksum_function
+from congestion_control import CongestionControl
+from packet_format import ACK_PACKET_FIELD, HEADER, MAX_MSS, NAK_PACKET_FIELD, SACK_PACKET_FIELD, parse_nak, parse_sack
+from pacing import SPIN_THRESHOLD, Pacer, parse_rate
+from packet_source import MappedPacketStream, PacketStream
+from path_mtu import discover_mss
+from rto_estimator import RTOEstimator
+from striping import announce_stripe, send_striped
+from udp_offload import SegmentSender
+from window_tuner import WindowTuner
+
+# Initial Timeout Interval for the packet to get acknowledged, adapted to the measured RTT unless --fixed-rto is given
 TIMEOUT_VALUE = 1
 
-# Field Value for the Data Packet and the Acknowledged Packet
-DATA_PACKET_FIELD = int('0101010101010101',2)
-ACK_PACKET_FIELD = int('1010101010101010',2)
+# Number of packets packetized ahead of the window in streaming mode
+STREAM_LOOKAHEAD = 32
 
-# List to hold the data packets
+# Bytes of the buffer the acknowledgements are received into, larger than the largest SACK or NAK
+ACK_BUFFER_SIZE = 2048
+
+# Packets of the file (PacketStream), indexed by sequence number
 packets = []
 
 # Dictionary to keep track of the packets time value
 packets_time = {}
 
+# Retransmission timeout estimated from the RTT of the acknowledged packets
+rto_estimator = RTOEstimator(TIMEOUT_VALUE)
+
+# Congestion window limiting the window N, unless congestion control is off
+congestion_control = CongestionControl(1,False)
+
+# Window sized from the measured bandwidth-delay product, unless it is the fixed window N
+window_tuner = WindowTuner(1,False)
+
+# Token bucket spacing the packets at the pacing rate, unless pacing is off
+pacer = Pacer(1)
+
+# Sender of the packets, in runs of segments (GSO) or batches (sendmmsg) of a single system call
+segment_sender = SegmentSender(None,None)
+
 # Total number of packets to be send (Initaily initializing with 1)
 number_of_packets = 1
 
@@ -29,8 +57,26 @@ packets_acknowledged = 0
 # Expected ACK value
 ack_expected = 0
 
+# Number of duplicate acknowledgements that trigger a fast retransmit (0 disables fast retransmit)
+DUP_ACK_THRESHOLD = 3
+
+# Duplicate acknowledgements received for the expected ACK, the expected ACK that was last fast retransmitted,
+# and whether the sending thread has to fast retransmit
+duplicate_acks = 0
+fast_retransmitted = -1
+fast_retransmit_pending = False
+
+# Whether the sending thread has to go back to the expected packet after a negative acknowledgement from the Server
+nak_retransmit_pending = False
+
 lock = threading.Lock()
 
+# Condition on the lock, notified by get_acknowledgement whenever an acknowledgement is processed
+window_moved = threading.Condition(lock)
+
+# Checksum function for the data, selected with --checksum (must match the server)
+get_checksum = get_checksum_function('internet')
+
 def N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
 	"""
 	To check weather N packets in the window are sent to the Server
@@ -44,19 +90,6 @@ def N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
 	# is becoming equal to greater to window size
 	return seq_no_to_send - ack_expected >= N
 
-def N_GREATER_THAN_TOTAL_PACKETS(seq_no_to_send,ack_expected,N,number_of_packets):
-	"""
-	To check weather window size(N) is greater than total number of packets
-	Arguments:
-		seq_no_to_send 		: Current Sequence Number To Send
-		ack_expected		: Expected Value of the Acknowledgement
-		N 					: Window Size
-		number_of_packets 	: Total Number of Packets
-	"""
-	# Returns True if the total number of packts are less than the window size 
-	# and if the sequence number expected is less than the sequence number to send else false
-	return number_of_packets <= N and ack_expected < seq_no_to_send
-
 def TIMEOUT(packets_time,ack_expected):
 	"""
 	To check if the packet has timed out
@@ -65,11 +98,11 @@ def TIMEOUT(packets_time,ack_expected):
 		ack_expected		: Expected Value of the Acknowledgement
 	"""
 	# Returns true if the packet has timed out else False
-	return time.time() - packets_time[ack_expected] >= TIMEOUT_VALUE 
+	return time.time() - packets_time[ack_expected] >= rto_estimator.rto 
 
 def RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port):
 	"""
-	To retransmit the packets in the current window
+	To retransmit the packets in the current window, up to the congestion window
 	Arguments:
 		seq_no_to_send 		: Current Sequence Number To Send
 		ack_expected		: Expected Value of the Acknowledgement
@@ -77,13 +110,38 @@ def RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_nam
 		client_socket		: Client Socket
 		server_host_name	: Host Name of the Server
 		server_port			: Post # of the Server
+	Returns:
+		Sequence Number to send again next, the packets from it up to seq_no_to_send are sent again as the congestion window opens
+		(or at the pacing rate), seq_no_to_send does not move back as they may still be acknowledged
 	"""
-	print('Timeout, Sequence Number = ' + str(ack_expected)) #Printing the packet that is timed out
+	retransmit_end = min(seq_no_to_send,ack_expected + min(window_tuner.window(),congestion_control.window()))
+
+	# With pacing only the lost packet is sent at once, the others follow at the pacing rate
+	if pacer.enabled:
+		retransmit_end = min(retransmit_end,ack_expected + 1)
 
 	# Running the loop from the packet with sequence number lost to the last sequence number send
 	for sequence_number in range(ack_expected,seq_no_to_send):
-		packets_time[sequence_number] = time.time() #Reseting the timer of retransmitted packet
-		client_socket.sendto(packets[sequence_number].encode('UTF-8','ignore'), (server_host_name,server_port)) #Retransmitting the packet
+		rto_estimator.on_retransmit(sequence_number) #No RTT sample from the retransmitted packet (Karn's rule)
+		if sequence_number < retransmit_end:
+			packets_time[sequence_number] = time.time() #Reseting the timer of retransmitted packet
+			pacer.consume() #Taking the pacing tokens of the retransmission
+
+	# Retransmitting the packets, as runs of segments with GSO or a batch with sendmmsg
+	segment_sender.send_run([packets[sequence_number] for sequence_number in range(ack_expected,retransmit_end)])
+	return retransmit_end
+
+def TIME_TO_TIMEOUT(packets_time,ack_expected):
+	"""
+	Seconds left before the packet times out
+	Arguments:
+		packets_time 		: Packets initial time value
+		ack_expected		: Expected Value of the Acknowledgement
+	"""
+	# Returns the time left till the timeout, a full timeout if the packet is not being timed
+	if ack_expected not in packets_time:
+		return rto_estimator.rto
+	return max(0,packets_time[ack_expected] + rto_estimator.rto - time.time())
 
 def TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time):
 	"""
@@ -96,29 +154,114 @@ def TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_
 		server_host_name	: Host Name of the Server
 		server_port			: Post # of the Server
 		packets_time    	: Packets initial time value
+	Returns:
+		Sequence Number to send again next, None if the packet has not timed out
 	"""
 	try:
 		# If the packet timeout, then retransmit
 		if TIMEOUT(packets_time,ack_expected):
-			RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
+			print('Timeout, Sequence Number = ' + str(ack_expected)) #Printing the packet that is timed out
+			rto_estimator.backoff() #Doubling the timeout for the timeout event
+			congestion_control.on_timeout(ack_expected,seq_no_to_send) #Back to slow start
+			return RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
 	except KeyError:
 		pass
+	return None
 
-def get_checksum(data):
+def FAST_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port):
 	"""
-	Calculate the Checksum of the data
+	To retransmit the packets in the current window after duplicate acknowledgements, without waiting for the timeout
 	Arguments:
-		data : Data Value in String for which the checksum is to be calculated
+		seq_no_to_send 		: Current Sequence Number To Send
+		ack_expected		: Expected Value of the Acknowledgement
+		packets 			: List ontaining all the packets
+		client_socket		: Client Socket
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
+	Returns:
+		Sequence Number to send again next
 	"""
-	sm = 0
-	size = len(data) - len(data) % 2 # Storing the length if data, if data is odd, then data length else data length -1
-	
-	# Running loop fo each 2 byte data in the data
-	for i in range(0, size, 2): 
-		shift = ord(data[i]) + (ord(data[i+1]) << 8) #Adding data and its 8bit left shifted part
-		chk = sm + shift #Concating the shift to the total data
-		sm = (chk & 0xffff) + (chk >> 16) #Carry Around add
-	return ~sm & 0xffff #Returning the checksum
+	print('Fast Retransmit, Sequence Number = ' + str(ack_expected)) #Printing the packet that is lost
+	congestion_control.on_loss(ack_expected,seq_no_to_send) #Halving the congestion window
+	return RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
+
+def NAK_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port):
+	"""
+	To retransmit the packets in the current window after a negative acknowledgement, without waiting for the timeout
+	Arguments:
+		seq_no_to_send 		: Current Sequence Number To Send
+		ack_expected		: Expected Value of the Acknowledgement
+		packets 			: List ontaining all the packets
+		client_socket		: Client Socket
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
+	Returns:
+		Sequence Number to send again next
+	"""
+	print('NAK, Sequence Number = ' + str(ack_expected)) #Printing the packet that is missing
+	congestion_control.on_loss(ack_expected,seq_no_to_send) #Halving the congestion window
+	return RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
+
+def NEGATIVE_ACK(cumulative_ack,ack_time):
+	"""
+	Acknowledge the packets below the cumulative acknowledgement of a negative acknowledgement and ask the sending thread
+	to go back to the first missing packet, to be called with the lock held
+	Arguments:
+		cumulative_ack	: Lowest Sequence Number not received by the Server, the start of the missing range
+		ack_time 		: Time the acknowledgement was received
+	"""
+	global nak_retransmit_pending
+
+	# The NAK is not a duplicate ACK, only new packets are acknowledged
+	if cumulative_ack > ack_expected:
+		ACKNOWLEDGE_UPTO(cumulative_ack,ack_time)
+
+	# The Server repeats the NAK until the gap is filled, a packet retransmitted less than a round trip ago is still on its way
+	if cumulative_ack == ack_expected and ack_time - packets_time.get(ack_expected,0) >= (rto_estimator.srtt or 0):
+		nak_retransmit_pending = True
+
+def DUPLICATE_ACK():
+	"""
+	Count a duplicate acknowledgement and ask the sending thread for a fast retransmit after DUP_ACK_THRESHOLD of them, to be called with the lock held
+	"""
+	global duplicate_acks
+	global fast_retransmitted
+	global fast_retransmit_pending
+
+	duplicate_acks += 1
+
+	# Only one fast retransmit for each lost packet, the duplicate ACKs of the rest of the window are ignored
+	if DUP_ACK_THRESHOLD and duplicate_acks >= DUP_ACK_THRESHOLD and fast_retransmitted != ack_expected:
+		fast_retransmitted = ack_expected
+		fast_retransmit_pending = True
+
+def ACKNOWLEDGE_UPTO(cumulative_ack,ack_time):
+	"""
+	Acknowledge all the packets below the cumulative acknowledgement, to be called with the lock held
+	Arguments:
+		cumulative_ack	: Lowest Sequence Number not received by the Server
+		ack_time 		: Time the acknowledgement was received
+	"""
+	global packets_acknowledged
+	global ack_expected
+	global duplicate_acks
+
+	# An acknowledgement of the last in order packet again is a duplicate ACK, an older one is ignored
+	if cumulative_ack == ack_expected:
+		DUPLICATE_ACK()
+	if cumulative_ack <= ack_expected:
+		return
+	duplicate_acks = 0
+
+	# All the packets from the expected ACK are acknowledged, also the ones whose acknowledgement was lost
+	acknowledged = [(sequence_number,packets_time.pop(sequence_number,None)) for sequence_number in range(ack_expected,cumulative_ack)]
+	rtt = rto_estimator.on_acks(acknowledged,ack_time) #Measuring the RTT
+	congestion_control.on_ack(len(acknowledged)) #Growing the congestion window
+	window_tuner.on_ack(len(acknowledged),rtt,rto_estimator.srtt) #Measuring the delivery rate
+
+	packets_acknowledged += cumulative_ack - ack_expected #Incrementing the Total Number of packets acknowledged
+	ack_expected = cumulative_ack #Moving the Expected ACK value
+	packets.release(ack_expected) #Releasing the cumulatively acknowledged packets
 
 def check_arguments(file_name,N,MSS):
 	"""
@@ -143,6 +286,11 @@ def check_arguments(file_name,N,MSS):
 		print("MSS Error: Invalid maximum segment size (MSS)")
 		quit()
 
+	# Checking that a packet of MSS bytes fits in one UDP datagram
+	if(MSS>MAX_MSS):
+		print("MSS Error: MSS is larger than " + str(MAX_MSS) + ", the largest UDP datagram")
+		quit()
+
 def send_packet(client_socket,server_host_name,server_port,N):
 	"""
 	Send the Packet to the specified Server
@@ -159,39 +307,73 @@ def send_packet(client_socket,server_host_name,server_port,N):
 	global ack_expected
 	global number_of_packets
 	global packets
+	global fast_retransmit_pending
+	global nak_retransmit_pending
 
-	# Initialising the Sequence number with 0
+	# Initialising the Sequence number with 0, the next packet never sent
 	seq_no_to_send = 0
 
-	# While there are packets left to be acknowledged i.e. not all packets are recieved by the server
-	while packets_acknowledged <  number_of_packets:
+	# Next packet to send again after a retransmission: the packets from it up to seq_no_to_send are sent again
+	# as the window opens (or at the pacing rate), equal to seq_no_to_send when there are none
+	resend_next = 0
+
+	with window_moved:
+
+		# While there are packets left to be acknowledged i.e. not all packets are recieved by the server
+		while packets_acknowledged <  number_of_packets:
+
+			# Case when duplicate acknowledgements show the expected packet is lost
+			if fast_retransmit_pending:
+				fast_retransmit_pending = False
+				resend_next = FAST_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
+
+			# Case when the Server reported the expected packet as missing
+			if nak_retransmit_pending:
+				nak_retransmit_pending = False
+				if ack_expected < seq_no_to_send:
+					resend_next = NAK_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port)
 
-		# Case when all packets in the window are transmitted
-		while N_PACKETS_TRANSMITTED(seq_no_to_send,ack_expected,N):
-			lock.acquire()
+			# Case when any packet is not yet recieved by the Server and it timed out
 			if ack_expected < seq_no_to_send and ack_expected in packets_time:
-				TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-			lock.release()
-
-		# Case when window size(N) is greater than total number of packets
-		lock.acquire()
-		if N_GREATER_THAN_TOTAL_PACKETS(seq_no_to_send,ack_expected,N,number_of_packets) and ack_expected in packets_time:
-			TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-		lock.release()
-
-		# Case when any packet is not yet recieved by the Server
-		lock.acquire()
-		if ack_expected < seq_no_to_send and ack_expected in packets_time:
-			TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
-		lock.release()
-
-		# Sending the Packet to the Server
-		lock.acquire()
-		if seq_no_to_send < number_of_packets:
-			packets_time[seq_no_to_send] = time.time()
-			client_socket.sendto(packets[seq_no_to_send].encode('UTF-8','ignore'), (server_host_name,server_port))
-			seq_no_to_send += 1
-		lock.release()
+				resend_end = TIMEOUT_RETRANSMIT(seq_no_to_send,ack_expected,packets,client_socket,server_host_name,server_port,packets_time)
+				if resend_end is not None:
+					resend_next = resend_end
+
+			# The packets waiting to be sent again may be acknowledged by the acknowledgements of their first transmission,
+			# the acknowledged packets are released and not sent again
+			resend_next = max(resend_next,ack_expected)
+
+			# Sending the Packet to the Server if the window (limited by the congestion window) is not full,
+			# the packets waiting to be sent again first
+			window = min(window_tuner.window(),congestion_control.window())
+			if not N_PACKETS_TRANSMITTED(resend_next,ack_expected,window) and resend_next < number_of_packets:
+
+				# Waiting for the pacing tokens: a long wait sleeps on the condition so acknowledgements are still processed,
+				# the last SPIN_THRESHOLD seconds are spun as a sleep is not precise enough
+				if pacer.enabled:
+					pacer.set_window(window,rto_estimator.srtt)
+					pacing_delay = pacer.delay()
+					if pacing_delay > SPIN_THRESHOLD:
+						pacer.on_sleep()
+						window_moved.wait(pacing_delay - SPIN_THRESHOLD)
+						continue
+					pacer.spin(pacing_delay)
+					pacer.consume()
+
+				# With GSO or sendmmsg the rest of the window is sent at once, in as few system calls as possible (not when pacing)
+				send_end = resend_next + 1
+				if segment_sender.batches() and not pacer.enabled:
+					send_end = min(number_of_packets,ack_expected + window)
+				send_time = time.time()
+				for sequence_number in range(resend_next,send_end):
+					packets_time[sequence_number] = send_time
+				segment_sender.send_run([packets[sequence_number] for sequence_number in range(resend_next,send_end)])
+				resend_next = send_end
+				seq_no_to_send = max(seq_no_to_send,send_end)
+
+			# Case when all packets in the window are transmitted, sleeping until an acknowledgement arrives or the oldest packet times out
+			else:
+				window_moved.wait(TIME_TO_TIMEOUT(packets_time,ack_expected))
 
 
 def get_acknowledgement(client_socket):
@@ -207,20 +389,38 @@ def get_acknowledgement(client_socket):
 	global ack_expected
 	global number_of_packets
 
+	# Buffer the acknowledgements are received into, none is allocated for each one
+	ack_buffer = memoryview(bytearray(ACK_BUFFER_SIZE))
+
 	try:
 		# While there are packets left to be acknowledged
 		while packets_acknowledged <  number_of_packets:
-			acknowledgement, serverAddress = client_socket.recvfrom(2048) #Recieviing data from the Server
-			acknowledgement = acknowledgement.decode('UTF-8','ignore') #Decoding the acknowledgement
-			ack_seq_nr = int(acknowledgement[0:8],16) #acknowledgement sequence number
-			ack_packet_field = int(acknowledgement[12:],16) #Acknowledged Packet Field Value
+			acknowledgement_size, serverAddress = client_socket.recvfrom_into(ack_buffer) #Recieviing data from the Server into the preallocated buffer
+			acknowledgement = ack_buffer[:acknowledgement_size] #Parsed in place, each acknowledgement is processed before the next one is received
+			ack_seq_nr, _, ack_packet_field = HEADER.unpack_from(acknowledgement,0) #acknowledgement sequence number and Acknowledged Packet Field Value
 
-			# If the acknowledgement recieved was for the expected packet
+			# If the acknowledgement recieved was for the expected packet, the Server acknowledges in order so all the packets up to it are acknowledged
+			# (an acknowledgement of the packet before the expected one is a duplicate ACK)
 			if ack_packet_field == ACK_PACKET_FIELD:
 				lock.acquire()
-				packets_acknowledged += 1 #Incrementing the Total Number of packets acknowledged
-				ack_expected += 1 #Incrementing the Expected ACK value
-				del packets_time[ack_seq_nr] #Deleting the acknowledged packet from the time list
+				ACKNOWLEDGE_UPTO(ack_seq_nr + 1,time.time())
+				window_moved.notify() #Waking up the sending thread
+				lock.release()
+
+			# Else if the acknowledgement is cumulative, all the packets below it are acknowledged
+			elif ack_packet_field == SACK_PACKET_FIELD:
+				cumulative_ack, _ = parse_sack(acknowledgement) #Go-back-N Server receives in order, there are no ranges
+				lock.acquire()
+				ACKNOWLEDGE_UPTO(cumulative_ack,time.time())
+				window_moved.notify() #Waking up the sending thread
+				lock.release()
+
+			# Else if the Server reports missing packets, going back to the first one
+			elif ack_packet_field == NAK_PACKET_FIELD:
+				cumulative_ack, _ = parse_nak(acknowledgement) #Go-back-N Server discards everything from the first missing packet
+				lock.acquire()
+				NEGATIVE_ACK(cumulative_ack,time.time())
+				window_moved.notify() #Waking up the sending thread
 				lock.release()
 	except:
 		traceback.print_exc()
@@ -228,7 +428,7 @@ def get_acknowledgement(client_socket):
 		client_socket.close()
 
 
-def rdt_send(server_host_name,server_port,file_name,N,MSS):
+def rdt_send(server_host_name,server_port,file_name,N,MSS,stream=False,use_mmap=False,adaptive_rto=True,dup_ack_threshold=DUP_ACK_THRESHOLD,congestion=False,rate=None,pacing=False,auto_window=False,gso=False,batch=True,offset=0,length=None,stripe=None):
 	"""
 	Function to read data from a specified file and transfer the data to the Simple-FTP Server
 	Arguments:
@@ -237,6 +437,19 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 		file_name 			: Input File Path
 		N 					: Window Size
 		MSS 				: Maximum Segment Size
+		stream 				: Packetize the file while sending instead of before
+		use_mmap 			: Send the data as zero-copy views of the memory-mapped file
+		adaptive_rto 		: Adapt the timeout to the measured RTT instead of using TIMEOUT_VALUE
+		dup_ack_threshold 	: Duplicate acknowledgements that trigger a fast retransmit (0 disables it)
+		congestion 			: Limit the window with the AIMD congestion window, N is then the maximum window
+		rate 				: Bandwidth cap in bytes per second, the packets are paced at this rate (None for no cap)
+		pacing 				: Pace the packets at the window per smoothed RTT (limited by rate)
+		auto_window 		: Size the window from the measured bandwidth-delay product, starting from N
+		gso 				: Send runs of packets in single system calls with UDP segmentation offload (Linux)
+		batch 				: Send the window and the retransmissions in batches with sendmmsg (Linux, FreeBSD)
+		offset 				: Byte offset of the data to send in the file
+		length 				: Number of bytes to send (None for up to the end of the file)
+		stripe 				: (token, stripe index, number of stripes) when the data is one stripe of a striped transfer
 	"""
 
 	# Storing the Startig Time of the Process
@@ -253,48 +466,54 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 	print("File Name: " + file_name)
 	print("Window Size (N): " + str(N))
 	print("Maximum Segment Size (MSS): " + str(MSS))
+	if stripe is not None:
+		print("Stripe: {} of {}, {} bytes at offset {}".format(stripe[1],stripe[2],length,offset))
 
 	print()
 
 	global packets
 	global number_of_packets
+	global rto_estimator
+	global window_tuner
+	global congestion_control
+	global pacer
+	global segment_sender
+	global DUP_ACK_THRESHOLD
+
+	# Retransmission timeout starting from TIMEOUT_VALUE
+	rto_estimator = RTOEstimator(TIMEOUT_VALUE,adaptive_rto)
+	DUP_ACK_THRESHOLD = dup_ack_threshold
+
+	# Window of N packets, or sized from the bandwidth-delay product up to MAX_WINDOW
+	window_tuner = WindowTuner(N,auto_window)
+
+	# Congestion window growing from INITIAL_WINDOW up to the window
+	congestion_control = CongestionControl(window_tuner.max_window,congestion)
+
+	# Packets spaced by a token bucket at the pacing rate
+	pacer = Pacer(MSS + HEADER.size,rate,pacing)
 
 	# Creating UDP Socket
 	client_port = 7735
 	client_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-	# Opening the file and getting the total count of packets
-	data_file = open(file_name,'rb')
-	file_size = os.path.getsize(file_name)
-	number_of_partitions = math.ceil(file_size/MSS)
-
-	# Reading the first MSS data and initializing the sequence number with 0
-	data_of_MSS_size = data_file.read(MSS)
-	sequence_number = 0
-
-	# Looping while there is no more MSS size of data left
-	while(data_of_MSS_size):
-
-		data = str(data_of_MSS_size,'UTF-8',errors='replace') #Encoding the data from bytes to string
-		data_to_send = data
-		checksum = get_checksum(data) #Computing the Checksum
-		checksum = '{:04x}'.format(checksum) #Convertring the Checksum to 16-bit or 4 byte HEXADECIMAL VALUE
-		seq_nr = '{:08x}'.format(sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-		data_packet_field = '{:04x}'.format(DATA_PACKET_FIELD) #Convertring the Data Field Value to to 16-bit or 4 byte HEXADECIMAL VALUE
-		packet = seq_nr + checksum + data_packet_field + data_to_send #Creating the complete packet by adding the header and the Data
-		packets.append(str(packet)) #Storing the packet in packets list
-		data_of_MSS_size = data_file.read(MSS) #Reading next MSS length of data
-		sequence_number += 1 #Incrementing the Sequence Number
-
-	# Sending the last packet as END_OF_FILE to identify all the data has been sent
-	end_of_file = "END_OF_FILE"
-	data_to_send = end_of_file
-	checksum = get_checksum(end_of_file) #Computing the Checksum
-	checksum = '{:04x}'.format(checksum) #Convertring the Checksum to 16-bit or 4 byte HEXADECIMAL VALUE
-	seq_nr = '{:08x}'.format(sequence_number) #Convertring the Sequence Number to 32-bit or 8 byte HEXADECIMAL VALUE
-	data_packet_field = '{:04x}'.format(DATA_PACKET_FIELD) #Convertring the Data Field Value to to 16-bit or 4 byte HEXADECIMAL VALUE
-	packet = seq_nr + checksum + data_packet_field + data_to_send #Creating the complete packet by adding the header and the Data
-	packets.append(str(packet)) #Storing the packet in packets list
+	# Packets sent one by one, or in runs with GSO or batches with sendmmsg if the platform supports them
+	segment_sender = SegmentSender(client_socket,(server_host_name,server_port),gso,batch)
+	if gso and not segment_sender.gso:
+		print("GSO Warning: UDP segmentation offload is not supported, sending one packet at a time")
+
+	# A stripe is announced to the Server before its data, which is then sent from the same socket
+	if stripe is not None:
+		announce_stripe(client_socket,(server_host_name,server_port),stripe,offset)
+
+	# Packetizing the file, in streaming mode only STREAM_LOOKAHEAD packets ahead of the window are held in memory.
+	# The buffer holds the largest window the tuner can reach, a packet of the window is never waited for with the lock held
+	buffer_size = window_tuner.max_window + STREAM_LOOKAHEAD if stream else None
+	if use_mmap:
+		packets = MappedPacketStream(file_name,MSS,get_checksum,buffer_size,offset,length)
+	else:
+		packets = PacketStream(file_name,MSS,get_checksum,buffer_size,offset,length)
+	packets.start()
 
 	# Calculating teh total number of packets to be sent
 	number_of_packets = len(packets)
@@ -317,6 +536,23 @@ def rdt_send(server_host_name,server_port,file_name,N,MSS):
 	# Closing the Socket
 	client_socket.close()
 
+	# Printing the final retransmission timeout and RTT estimate
+	rto_stats = rto_estimator.stats()
+	print()
+	print("RTO: {} s, SRTT: {} s, RTTVAR: {} s, RTT Samples: {}, Timeouts: {}".format(rto_stats['rto'],rto_stats['srtt'],rto_stats['rttvar'],rto_stats['samples'],rto_stats['timeouts']))
+	if auto_window:
+		window_stats = window_tuner.stats()
+		print("Auto Window: {} packets, Bandwidth: {:.0f} packets/s, Min RTT: {} s, BDP: {:.1f} packets".format(window_stats['window'],window_stats['bandwidth'] or 0,window_stats['min_rtt'],window_stats['bdp'] or 0))
+	if pacer.enabled:
+		pacer_stats = pacer.stats()
+		print("Pacing Rate: {:.0f} bytes/s, Average Rate: {:.0f} bytes/s, Sleeps: {}, Spins: {}".format(pacer_stats['rate'] or 0,pacer_stats['bytes_sent']/(finish_time - begin_time),pacer_stats['sleeps'],pacer_stats['spins']))
+	if segment_sender.batches():
+		sender_stats = segment_sender.stats()
+		print("Datagrams Sent: {} in {} send calls, {:.1f} per call".format(sender_stats['datagrams'],sender_stats['send_calls'],sender_stats['datagrams_per_call']))
+	if congestion:
+		cwnd_stats = congestion_control.stats()
+		print("CWND: {:.1f} packets, SSTHRESH: {:.1f} packets, Max CWND: {:.1f} packets, Losses: {}, Timeouts: {}".format(cwnd_stats['cwnd'],cwnd_stats['ssthresh'],cwnd_stats['max_cwnd'],cwnd_stats['losses'],cwnd_stats['timeouts']))
+
 	# Returning the Delay(Time tacken by the process)
 	return finish_time - begin_time
 
@@ -327,16 +563,56 @@ if __name__ == '__main__':
 	time.sleep(0.5)
 
 	# Reading Arguments
-	server_host_name = sys.argv[1]
-	server_port = int(sys.argv[2])
-	file_name = sys.argv[3]
-	N = int(sys.argv[4])
-	MSS = int(sys.argv[5])
+	parser = argparse.ArgumentParser(description="Simple-FTP Client (Go-back-N ARQ)")
+	parser.add_argument('server_host_name',help="Host Name of the Server")
+	parser.add_argument('server_port',type=int,help="Port # of the Server")
+	parser.add_argument('file_name',help="Input File Path")
+	parser.add_argument('N',type=int,help="Window Size")
+	parser.add_argument('MSS',type=int,help="Maximum Segment Size")
+	parser.add_argument('--checksum',default='internet',choices=sorted(CHECKSUM_FUNCTIONS),help="Checksum implementation, must match the server")
+	parser.add_argument('--stream',action='store_true',help="Packetize the file while sending, holding only the window in memory")
+	parser.add_argument('--mmap',action='store_true',help="Memory-map the file and send the data without copying it")
+	parser.add_argument('--fixed-rto',action='store_true',help="Always use TIMEOUT_VALUE instead of adapting the timeout to the measured RTT")
+	parser.add_argument('--dup-acks',type=int,default=DUP_ACK_THRESHOLD,help="Duplicate acknowledgements that trigger a fast retransmit (0 disables it)")
+	parser.add_argument('--congestion-control',action='store_true',help="Limit the window with an AIMD congestion window (slow start), N is then the maximum window")
+	parser.add_argument('--cwnd-log',help="Write the congestion window trajectory to this CSV file (one file for each stripe with --stripes, named <file>.stripe<index>)")
+	parser.add_argument('--rate',type=parse_rate,help="Bandwidth cap in bits per second (K, M or G suffix, e.g. 200M), the packets are paced at this rate")
+	parser.add_argument('--pacing',action='store_true',help="Pace the packets at the window per smoothed RTT instead of sending each window as a burst")
+	parser.add_argument('--auto-window',action='store_true',help="Size the window from the measured bandwidth-delay product, N is then the initial window")
+	parser.add_argument('--stripes',type=int,default=1,help="Split the file into byte ranges sent over this many sockets by as many processes")
+	parser.add_argument('--gso',action='store_true',help="Send runs of packets in single system calls with UDP segmentation offload (Linux 4.18)")
+	parser.add_argument('--no-batch',action='store_true',help="Send one datagram per system call instead of batches with sendmmsg")
+	parser.add_argument('--discover-mss',action='store_true',help="Use the largest MSS that is not fragmented on the path to the Server (path MTU discovery) instead of MSS")
+	args = parser.parse_args()
+
+	server_host_name = args.server_host_name
+	server_port = args.server_port
+	file_name = args.file_name
+	N = args.N
+	MSS = args.MSS
+	get_checksum = get_checksum_function(args.checksum)
 	
 	os.system("clear")
 
-	# Calling the funtion to start the transfer
-	delay = rdt_send(server_host_name, server_port, file_name, N, MSS)
+	# Replacing the MSS with the largest one the path carries without IP fragmentation
+	if args.discover_mss:
+		path = discover_mss(server_host_name,server_port)
+		if path is None:
+			print("MTU Warning: Path MTU discovery is not supported on this platform, using MSS " + str(MSS))
+		else:
+			print("Path MTU: {}, MSS: {} (pass it as the MSS argument to skip the discovery)".format(*path))
+			MSS = path[1]
+
+	# Calling the funtion to start the transfer, from a process for each stripe when the file is striped
+	if args.stripes > 1:
+		check_arguments(file_name,N,MSS)
+		delay = send_striped('Simple_ftp_client',args.checksum,server_host_name,server_port,file_name,N,MSS,args.stripes,(args.stream,args.mmap,not args.fixed_rto,args.dup_acks,args.congestion_control,args.rate and args.rate/args.stripes,args.pacing,args.auto_window,args.gso,not args.no_batch),args.cwnd_log)
+	else:
+		delay = rdt_send(server_host_name, server_port, file_name, N, MSS, args.stream, args.mmap, not args.fixed_rto, args.dup_acks, args.congestion_control, args.rate, args.pacing, args.auto_window, args.gso, not args.no_batch)
+
+		# Saving the congestion window trajectory for analysis
+		if args.cwnd_log:
+			congestion_control.write_trajectory(args.cwnd_log)
 
 	# Giving the Delay(Time tacken by the process)
 	print()
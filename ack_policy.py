@@ -0,0 +1,78 @@
+# Default seconds an acknowledgement may be delayed after the first unacknowledged packet (1 ms)
+DEFAULT_ACK_DELAY = 0.001
+
+class AckPolicy:
+	"""
+	Delayed and coalesced acknowledgements: the receiver sends one cumulative acknowledgement every
+	ack_every accepted packets, or ack_delay seconds after the first packet it has not acknowledged yet.
+	The servers still acknowledge at once the packets that reveal or fill a gap, and the END_OF_FILE packet.
+	Every acknowledgement sent is counted, so the ACK to data ratio can be tuned for the link.
+	"""
+
+	def __init__(self,ack_every=1,ack_delay=DEFAULT_ACK_DELAY):
+		"""
+		Arguments:
+			ack_every 	: Accepted packets covered by one acknowledgement (1 acknowledges every packet)
+			ack_delay 	: Seconds an acknowledgement may wait for more packets
+		"""
+		if ack_every < 1:
+			raise ValueError("ACK Error: Invalid number of packets per acknowledgement " + str(ack_every))
+
+		self.ack_every = ack_every
+		self.ack_delay = ack_delay
+
+		# Accepted packets not acknowledged yet, and the time the first of them was accepted
+		self.unacknowledged = 0
+		self.first_unacknowledged_time = None
+
+		# Counters of the accepted data packets and of the acknowledgements sent
+		self.data_packets = 0
+		self.acks_sent = 0
+
+	def on_packet(self,now):
+		"""
+		Count an accepted data packet
+		Arguments:
+			now : time.time() value when the packet was accepted
+		Returns:
+			True if the acknowledgement has to be sent now
+		"""
+		self.data_packets += 1
+		if not self.unacknowledged:
+			self.first_unacknowledged_time = now
+		self.unacknowledged += 1
+		return self.unacknowledged >= self.ack_every
+
+	def time_to_ack(self,now):
+		"""
+		Seconds left before the delayed acknowledgement is due, None if every packet is acknowledged
+		Arguments:
+			now : Current time.time() value
+		"""
+		if not self.unacknowledged:
+			return None
+		return max(0,self.first_unacknowledged_time + self.ack_delay - now)
+
+	def due(self,now):
+		"""
+		Check if the delayed acknowledgement has to be sent
+		Arguments:
+			now : Current time.time() value
+		"""
+		return self.unacknowledged > 0 and now - self.first_unacknowledged_time >= self.ack_delay
+
+	def on_ack_sent(self):
+		"""
+		Count an acknowledgement sent, it covers all the packets accepted so far
+		"""
+		self.acks_sent += 1
+		self.unacknowledged = 0
+		self.first_unacknowledged_time = None
+
+	def ratio(self):
+		"""
+		Acknowledgements sent for each accepted data packet
+		"""
+		if not self.data_packets:
+			return 0
+		return self.acks_sent/self.data_packets
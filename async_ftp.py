@@ -0,0 +1,715 @@
+import argparse
+import asyncio
+import os
+import time
+
+from checksum import CHECKSUM_FUNCTIONS, get_checksum_function
+from file_writer import DEFAULT_BUFFER_SIZE, FileWriter
+from loss_service import discard_packet
+from packet_format import ACK_PACKET_FIELD, DATA_PACKET_FIELD, END_OF_FILE, HEADER, MAX_SACK_RANGES, NAK_PACKET_FIELD, SACK_PACKET_FIELD, make_ack, make_sack, parse_nak, parse_packet, parse_sack
+from packet_source import MappedPacketStream, PacketStream
+from reassembly import Reassembler
+from rto_estimator import RTOEstimator
+
+# Initial Timeout Interval of the Go-back-N and Selective Repeat senders, as in the threaded clients
+GBN_TIMEOUT_VALUE = 1
+SR_TIMEOUT_VALUE = 0.5
+
+# Number of duplicate acknowledgements that trigger a Go-back-N fast retransmit (0 disables fast retransmit)
+DUP_ACK_THRESHOLD = 3
+
+# Seconds a finished session is kept to acknowledge the retransmissions of its last packets
+SESSION_LINGER = 2
+
+# Seconds without packets from a client after which its unfinished session is closed, as in the threaded Servers
+SESSION_TIMEOUT = 60
+
+class Sender:
+	"""
+	Common part of the asyncio senders: the packets of the file, the window and the retransmission timeout.
+	Everything runs in callbacks of the event loop (acknowledgements and loop.call_at timers), so unlike
+	the threaded clients there is no lock and no thread switch per packet.
+	"""
+
+	def __init__(self,loop,packets,N,rto_estimator):
+		"""
+		Arguments:
+			loop 			: Event loop running the transfer
+			packets 		: PacketStream of the file, already packetized
+			N 				: Window Size
+			rto_estimator 	: RTOEstimator of the transfer
+		"""
+		self.loop = loop
+		self.packets = packets
+		self.N = N
+		self.rto_estimator = rto_estimator
+		self.number_of_packets = len(packets)
+
+		# Expected ACK value and the next sequence number to send
+		self.ack_expected = 0
+		self.seq_no_to_send = 0
+
+		# loop.time() value when each unacknowledged packet was last sent
+		self.packets_time = {}
+
+		# Datagram transport connected to the Server, set by the SenderProtocol
+		self.transport = None
+
+		# Result of the transfer, set once every packet is acknowledged
+		self.done = loop.create_future()
+		self.retransmissions = 0
+
+	def send(self,sequence_number):
+		"""
+		Send the packet and record the time it was sent
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		packet = self.packets[sequence_number]
+		# The datagram transport sends one buffer, the (header, data) pairs of a memory-mapped file are joined
+		if isinstance(packet,tuple):
+			packet = b''.join(packet)
+		self.transport.sendto(packet)
+		self.packets_time[sequence_number] = self.loop.time()
+
+	def retransmit(self,sequence_number):
+		"""
+		Send the packet again, its acknowledgement can not give an RTT sample (Karn's rule)
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		self.rto_estimator.on_retransmit(sequence_number)
+		self.send(sequence_number)
+		self.retransmissions += 1
+
+	def fill_window(self):
+		"""
+		Send the packets that fit in the window
+		"""
+		while self.seq_no_to_send - self.ack_expected < self.N and self.seq_no_to_send < self.number_of_packets:
+			self.send(self.seq_no_to_send)
+			self.seq_no_to_send += 1
+			self.on_sent(self.seq_no_to_send - 1)
+
+	def on_sent(self,sequence_number):
+		"""
+		Called after a new packet is sent
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+
+	def start(self):
+		"""
+		Send the first window
+		"""
+		self.fill_window()
+
+	def finish(self):
+		"""
+		Complete the transfer once every packet is acknowledged
+		"""
+		if self.ack_expected >= self.number_of_packets and not self.done.done():
+			self.done.set_result(self.ack_expected)
+
+	def on_acknowledgement(self,acknowledgement):
+		"""
+		Process an acknowledgement received from the Server
+		Arguments:
+			acknowledgement : Acknowledgement packet
+		"""
+		if len(acknowledgement) < HEADER.size:
+			return
+		ack_seq_nr, _, ack_packet_field = HEADER.unpack_from(acknowledgement,0)
+		ack_time = self.loop.time()
+
+		if ack_packet_field == ACK_PACKET_FIELD:
+			self.on_ack(ack_seq_nr,ack_time)
+		elif ack_packet_field == SACK_PACKET_FIELD:
+			self.on_sack(*parse_sack(acknowledgement),ack_time)
+		elif ack_packet_field == NAK_PACKET_FIELD:
+			self.on_nak(*parse_nak(acknowledgement),ack_time)
+		else:
+			return
+
+		self.fill_window()
+		self.finish()
+
+	def recently_sent(self,sequence_number,now):
+		"""
+		Check if the packet was sent less than one smoothed RTT ago, a NAK repeated by the Server must not resend it
+		Arguments:
+			sequence_number : Sequence Number of the packet
+			now 			: Current loop.time() value
+		"""
+		return now - self.packets_time.get(sequence_number,0) < (self.rto_estimator.srtt or 0)
+
+class GoBackNSender(Sender):
+	"""
+	Go-back-N sender: cumulative acknowledgements, one timer for the oldest unacknowledged packet, and
+	fast retransmit after dup_ack_threshold duplicate acknowledgements
+	"""
+
+	def __init__(self,loop,packets,N,rto_estimator,dup_ack_threshold=DUP_ACK_THRESHOLD):
+		"""
+		Arguments:
+			loop 				: Event loop running the transfer
+			packets 			: PacketStream of the file, already packetized
+			N 					: Window Size
+			rto_estimator 		: RTOEstimator of the transfer
+			dup_ack_threshold 	: Duplicate acknowledgements that trigger a fast retransmit (0 disables it)
+		"""
+		Sender.__init__(self,loop,packets,N,rto_estimator)
+		self.dup_ack_threshold = dup_ack_threshold
+		self.duplicate_acks = 0
+		self.fast_retransmitted = -1
+
+		# Timer of the oldest unacknowledged packet
+		self.timer = None
+
+	def start_timer(self):
+		"""
+		Start the timer for the oldest unacknowledged packet if it is not running. A running timer is not moved
+		when the window moves, on_timeout checks the deadline of the current oldest packet instead, so an
+		acknowledgement does not cost a timer cancel and reschedule
+		"""
+		if self.timer is None and self.ack_expected < self.seq_no_to_send:
+			self.timer = self.loop.call_at(self.packets_time[self.ack_expected] + self.rto_estimator.rto,self.on_timeout)
+
+	def go_back(self):
+		"""
+		Retransmit the window from the oldest unacknowledged packet
+		"""
+		for sequence_number in range(self.ack_expected,self.seq_no_to_send):
+			self.retransmit(sequence_number)
+		self.start_timer()
+
+	def on_sent(self,sequence_number):
+		if sequence_number == self.ack_expected:
+			self.start_timer()
+
+	def on_timeout(self):
+		"""
+		Timer callback: the oldest unacknowledged packet may have timed out
+		"""
+		self.timer = None
+		if self.ack_expected >= self.seq_no_to_send:
+			return
+
+		# The window moved since the timer was started, waiting for the timeout of the current oldest packet
+		if self.loop.time() < self.packets_time[self.ack_expected] + self.rto_estimator.rto:
+			self.start_timer()
+			return
+
+		self.rto_estimator.backoff()
+		self.go_back()
+
+	def acknowledge_upto(self,cumulative_ack,ack_time):
+		"""
+		Acknowledge all the packets below the cumulative acknowledgement
+		Arguments:
+			cumulative_ack	: Lowest Sequence Number not received by the Server
+			ack_time 		: loop.time() value when the acknowledgement was received
+		"""
+		# An acknowledgement of the last in order packet again is a duplicate ACK, an older one is ignored
+		if cumulative_ack == self.ack_expected:
+			self.duplicate_acks += 1
+			# Only one fast retransmit for each lost packet
+			if self.dup_ack_threshold and self.duplicate_acks >= self.dup_ack_threshold and self.fast_retransmitted != self.ack_expected and self.ack_expected < self.seq_no_to_send:
+				self.fast_retransmitted = self.ack_expected
+				self.go_back()
+		if cumulative_ack <= self.ack_expected:
+			return
+		self.duplicate_acks = 0
+
+		cumulative_ack = min(cumulative_ack,self.seq_no_to_send)
+		acknowledged = [(sequence_number,self.packets_time.pop(sequence_number,None)) for sequence_number in range(self.ack_expected,cumulative_ack)]
+		self.rto_estimator.on_acks(acknowledged,ack_time)
+		self.ack_expected = cumulative_ack
+		self.packets.release(self.ack_expected)
+		self.start_timer()
+
+	def on_ack(self,ack_seq_nr,ack_time):
+		self.acknowledge_upto(ack_seq_nr + 1,ack_time)
+
+	def on_sack(self,cumulative_ack,ranges,ack_time):
+		self.acknowledge_upto(cumulative_ack,ack_time)
+
+	def on_nak(self,cumulative_ack,missing_ranges,ack_time):
+		# The NAK is not a duplicate ACK, only new packets are acknowledged, then the window goes back to the first missing packet
+		if cumulative_ack > self.ack_expected:
+			self.acknowledge_upto(cumulative_ack,ack_time)
+		if cumulative_ack == self.ack_expected < self.seq_no_to_send and not self.recently_sent(self.ack_expected,ack_time):
+			self.go_back()
+
+	def finish(self):
+		Sender.finish(self)
+		if self.done.done() and self.timer is not None:
+			self.timer.cancel()
+			self.timer = None
+
+class SelectiveRepeatSender(Sender):
+	"""
+	Selective Repeat sender: individual or selective acknowledgements and one loop.call_at timer per packet
+	"""
+
+	def __init__(self,loop,packets,N,rto_estimator):
+		"""
+		Arguments:
+			loop 			: Event loop running the transfer
+			packets 		: PacketStream of the file, already packetized
+			N 				: Window Size
+			rto_estimator 	: RTOEstimator of the transfer
+		"""
+		Sender.__init__(self,loop,packets,N,rto_estimator)
+
+		# Retransmission timer of every unacknowledged packet, and the acknowledged packets above the expected ACK
+		self.timers = {}
+		self.acknowledged = set()
+
+		# The timeout is doubled once for the packets timing out together, not once per packet
+		self.backoff_until = 0
+
+	def start_timer(self,sequence_number):
+		"""
+		Start (or restart) the timer of the packet
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		timer = self.timers.get(sequence_number)
+		if timer is not None:
+			timer.cancel()
+		self.timers[sequence_number] = self.loop.call_at(self.packets_time[sequence_number] + self.rto_estimator.rto,self.on_timeout,sequence_number)
+
+	def on_sent(self,sequence_number):
+		self.start_timer(sequence_number)
+
+	def on_timeout(self,sequence_number):
+		"""
+		Timer callback: the packet timed out
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		del self.timers[sequence_number]
+		now = self.loop.time()
+		if now >= self.backoff_until:
+			self.rto_estimator.backoff()
+			self.backoff_until = now + self.rto_estimator.rto
+		self.retransmit(sequence_number)
+		self.start_timer(sequence_number)
+
+	def acknowledge(self,sequence_numbers,ack_time):
+		"""
+		Acknowledge the given packets and move the expected ACK past all the acknowledged ones
+		Arguments:
+			sequence_numbers	: Sequence Numbers acknowledged by the Server
+			ack_time 			: loop.time() value when the acknowledgement was received
+		"""
+		acknowledged = []
+		for sequence_number in sequence_numbers:
+			# Skipping the packets already acknowledged or never sent
+			if sequence_number < self.ack_expected or sequence_number >= self.seq_no_to_send or sequence_number in self.acknowledged:
+				continue
+			self.acknowledged.add(sequence_number)
+			self.timers.pop(sequence_number).cancel()
+			acknowledged.append((sequence_number,self.packets_time.pop(sequence_number,None)))
+
+		if not acknowledged:
+			return
+		self.rto_estimator.on_acks(acknowledged,ack_time)
+
+		while self.ack_expected in self.acknowledged:
+			self.acknowledged.discard(self.ack_expected)
+			self.ack_expected += 1
+		self.packets.release(self.ack_expected)
+
+	def on_ack(self,ack_seq_nr,ack_time):
+		self.acknowledge((ack_seq_nr,),ack_time)
+
+	def on_sack(self,cumulative_ack,ranges,ack_time):
+		sequence_numbers = list(range(self.ack_expected,cumulative_ack))
+		for start,end in ranges:
+			sequence_numbers.extend(range(max(start,self.ack_expected),min(end,self.seq_no_to_send)))
+		self.acknowledge(sequence_numbers,ack_time)
+
+	def on_nak(self,cumulative_ack,missing_ranges,ack_time):
+		# The packets between the missing ranges and at the end of each range are received
+		sequence_numbers = list(range(self.ack_expected,cumulative_ack))
+		for (start,end),(next_start,_) in zip(missing_ranges,missing_ranges[1:] + [(None,None)]):
+			sequence_numbers.extend(range(end,next_start) if next_start is not None else (end,))
+		self.acknowledge(sequence_numbers,ack_time)
+
+		# Retransmitting exactly the missing packets that are not already on their way again
+		for start,end in missing_ranges:
+			for sequence_number in range(max(start,self.ack_expected),min(end,self.seq_no_to_send)):
+				if sequence_number in self.timers and not self.recently_sent(sequence_number,ack_time):
+					self.retransmit(sequence_number)
+					self.start_timer(sequence_number)
+
+	def finish(self):
+		Sender.finish(self)
+		if self.done.done():
+			for timer in self.timers.values():
+				timer.cancel()
+			self.timers.clear()
+
+class SenderProtocol(asyncio.DatagramProtocol):
+	"""
+	Datagram protocol of the Client, handing the acknowledgements to the sender
+	"""
+
+	def __init__(self,sender):
+		"""
+		Arguments:
+			sender : GoBackNSender or SelectiveRepeatSender of the transfer
+		"""
+		self.sender = sender
+
+	def connection_made(self,transport):
+		self.sender.transport = transport
+
+	def datagram_received(self,data,addr):
+		self.sender.on_acknowledgement(data)
+
+	def error_received(self,exc):
+		# An ICMP error (e.g. the Server is not started yet) only loses the packet, the timers retransmit it
+		pass
+
+	def connection_lost(self,exc):
+		if not self.sender.done.done():
+			self.sender.done.set_exception(exc or ConnectionError("Socket Closed"))
+
+async def send_file(server_host_name,server_port,file_name,N,MSS,variant='gbn',get_checksum=get_checksum_function('internet'),use_mmap=False,adaptive_rto=True,dup_ack_threshold=DUP_ACK_THRESHOLD):
+	"""
+	Transfer the file to the Simple-FTP Server from the running event loop
+	Arguments:
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
+		file_name 			: Input File Path
+		N 					: Window Size
+		MSS 				: Maximum Segment Size
+		variant 			: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+		get_checksum 		: Checksum function for the data (must match the Server)
+		use_mmap 			: Send the data from the memory-mapped file
+		adaptive_rto 		: Adapt the timeout to the measured RTT instead of using the initial timeout
+		dup_ack_threshold 	: Duplicate acknowledgements that trigger a Go-back-N fast retransmit (0 disables it)
+	Returns:
+		Delay (seconds taken by the transfer)
+	"""
+	if variant not in ('gbn','sr'):
+		raise ValueError("Variant Error: Unknown ARQ scheme " + str(variant))
+
+	loop = asyncio.get_running_loop()
+	begin_time = time.time()
+
+	# Packetizing the file outside of the event loop
+	if use_mmap:
+		packets = MappedPacketStream(file_name,MSS,get_checksum)
+	else:
+		packets = PacketStream(file_name,MSS,get_checksum)
+	await loop.run_in_executor(None,packets.start)
+
+	if variant == 'gbn':
+		sender = GoBackNSender(loop,packets,N,RTOEstimator(GBN_TIMEOUT_VALUE,adaptive_rto),dup_ack_threshold)
+	else:
+		sender = SelectiveRepeatSender(loop,packets,N,RTOEstimator(SR_TIMEOUT_VALUE,adaptive_rto))
+
+	transport, _ = await loop.create_datagram_endpoint(lambda: SenderProtocol(sender),remote_addr=(server_host_name,server_port))
+	try:
+		sender.start()
+		await sender.done
+	finally:
+		transport.close()
+
+	return time.time() - begin_time
+
+class GoBackNReceiver:
+	"""
+	Go-back-N session of the Server: only the expected packet is accepted and written after the previous ones
+	"""
+
+	def __init__(self,file_name,buffer_size,sack):
+		"""
+		Arguments:
+			file_name 	: Output File Path
+			buffer_size : Bytes of data coalesced before writing to the output file
+			sack 		: Send cumulative selective acknowledgements
+		"""
+		self.writer = FileWriter(file_name,buffer_size)
+		self.sack = sack
+		self.server_sequence_number = 0
+		self.finished = False
+
+	def acknowledgement(self):
+		"""
+		Cumulative acknowledgement of the packets received in order (None before the first one)
+		"""
+		if self.sack:
+			return make_sack(self.server_sequence_number,[])
+		if self.server_sequence_number > 0:
+			return make_ack(self.server_sequence_number - 1)
+		return None
+
+	def receive(self,client_sequence_number,data):
+		"""
+		Accept a data packet that passed the loss service and the checksum
+		Arguments:
+			client_sequence_number 	: Sequence Number of the packet
+			data 					: Data of the packet
+		Returns:
+			Acknowledgement to send, or None
+		"""
+		if client_sequence_number == self.server_sequence_number and not self.finished:
+			if data == END_OF_FILE:
+				self.writer.close()
+				self.finished = True
+			else:
+				self.writer.write(data)
+			self.server_sequence_number += 1
+
+		# A packet after a gap gets a duplicate ACK, an old one (e.g. the last packet again after a lost ACK) the current ACK
+		return self.acknowledgement()
+
+	def close(self):
+		"""
+		Write the data received in order and close the output file of an expired session
+		"""
+		self.writer.close()
+
+class SelectiveRepeatReceiver:
+	"""
+	Selective Repeat session of the Server: every packet is written at its offset by a Reassembler
+	"""
+
+	def __init__(self,file_name,buffer_size,sack):
+		"""
+		Arguments:
+			file_name 	: Output File Path
+			buffer_size : Bytes of in order data coalesced before writing to the output file
+			sack 		: Send selective acknowledgements
+		"""
+		self.reassembler = Reassembler(FileWriter(file_name,buffer_size,use_pwrite=True))
+		self.sack = sack
+		self.finished = False
+
+	def receive(self,client_sequence_number,data):
+		"""
+		Accept a data packet that passed the loss service and the checksum
+		Arguments:
+			client_sequence_number 	: Sequence Number of the packet
+			data 					: Data of the packet
+		Returns:
+			Acknowledgement to send
+		"""
+		# A packet already received is acknowledged again in case the ACK was lost
+		if not self.reassembler.is_received(client_sequence_number):
+			if data == END_OF_FILE:
+				self.reassembler.end_of_file(client_sequence_number)
+			else:
+				self.reassembler.add(client_sequence_number,data)
+			if self.reassembler.complete():
+				self.reassembler.close()
+				self.finished = True
+
+		if self.sack:
+			return make_sack(self.reassembler.base,self.reassembler.sack_ranges(MAX_SACK_RANGES))
+		return make_ack(client_sequence_number)
+
+	def close(self):
+		"""
+		Write the data received and close the output file of an expired session
+		"""
+		self.reassembler.close()
+
+class ServerProtocol(asyncio.DatagramProtocol):
+	"""
+	Datagram protocol of the Server: one receiver session per client address, all on the same socket
+	"""
+
+	def __init__(self,file_name,p,variant,sack,buffer_size,get_checksum,transfers,session_timeout=SESSION_TIMEOUT):
+		"""
+		Arguments:
+			file_name 		: Output File Path, formatted with {host}, {port} and {transfer} for each session
+			p 				: Probability of packet loss
+			variant 		: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+			sack 			: Send selective acknowledgements
+			buffer_size 	: Bytes of data coalesced before writing to the output file
+			get_checksum 	: Checksum function for the data (must match the Client)
+			transfers 		: Number of transfers to receive before the returned future completes (None for no limit)
+			session_timeout : Seconds without packets after which an unfinished session is closed
+		"""
+		self.file_name = file_name
+		self.p = p
+		self.receiver_class = GoBackNReceiver if variant == 'gbn' else SelectiveRepeatReceiver
+		self.sack = sack
+		self.buffer_size = buffer_size
+		self.get_checksum = get_checksum
+		self.transfers = transfers
+		self.session_timeout = session_timeout
+
+		self.transport = None
+		self.sessions = {}
+		self.number_of_sessions = 0
+
+		# Output files of the finished transfers, and the future set when the requested number is reached
+		self.finished = []
+		self.done = asyncio.get_running_loop().create_future()
+
+	def connection_made(self,transport):
+		self.transport = transport
+
+	def open_session(self,clientAddress):
+		"""
+		Create the receiver of a new client
+		Arguments:
+			clientAddress : (Host, Port #) of the Client
+		"""
+		file_name = self.file_name.format(host=clientAddress[0],port=clientAddress[1],transfer=self.number_of_sessions)
+		self.number_of_sessions += 1
+		# The receivers write after the existing content of the output file, which is created if needed
+		open(file_name,'ab').close()
+		receiver = self.receiver_class(file_name,self.buffer_size,self.sack)
+		receiver.file_name = file_name
+		receiver.last_packet_time = asyncio.get_running_loop().time()
+		self.sessions[clientAddress] = receiver
+		asyncio.get_running_loop().call_at(receiver.last_packet_time + self.session_timeout,self.expire_session,clientAddress,receiver)
+		return receiver
+
+	def expire_session(self,clientAddress,receiver):
+		"""
+		Close an unfinished session without packets for session_timeout seconds, or check again when it would be
+		Arguments:
+			clientAddress 	: (Host, Port #) of the Client
+			receiver 		: Receiver of the session
+		"""
+		if self.sessions.get(clientAddress) is not receiver or receiver.finished:
+			return
+		loop = asyncio.get_running_loop()
+		deadline = receiver.last_packet_time + self.session_timeout
+		if loop.time() < deadline:
+			loop.call_at(deadline,self.expire_session,clientAddress,receiver)
+			return
+		receiver.close()
+		del self.sessions[clientAddress]
+		print("Session Expired: {}, Please check {}".format(clientAddress,receiver.file_name))
+		if isinstance(receiver,SelectiveRepeatReceiver) and receiver.reassembler.discarded_bytes:
+			print("Segment Discarded: {} bytes received before the MSS was known".format(receiver.reassembler.discarded_bytes))
+
+	def close_session(self,clientAddress):
+		"""
+		Forget a finished session after SESSION_LINGER seconds
+		Arguments:
+			clientAddress : (Host, Port #) of the Client
+		"""
+		self.sessions.pop(clientAddress,None)
+
+	def datagram_received(self,packet,clientAddress):
+		if len(packet) < HEADER.size:
+			return
+		client_sequence_number, checksum, data_packet_field, data = parse_packet(packet)
+		if data_packet_field != DATA_PACKET_FIELD:
+			return
+
+		receiver = self.sessions.get(clientAddress)
+		if receiver is None:
+			receiver = self.open_session(clientAddress)
+		receiver.last_packet_time = asyncio.get_running_loop().time()
+		was_finished = receiver.finished
+
+		# Probabilistic loss service and checksum, as in the threaded Servers
+		if discard_packet(self.p) or self.get_checksum(data) != checksum:
+			return
+
+		acknowledgement = receiver.receive(client_sequence_number,data)
+		if acknowledgement is not None:
+			self.transport.sendto(acknowledgement,clientAddress)
+
+		if receiver.finished and not was_finished:
+			self.finished.append(receiver.file_name)
+			asyncio.get_running_loop().call_later(SESSION_LINGER,self.close_session,clientAddress)
+			if self.transfers is not None and len(self.finished) >= self.transfers and not self.done.done():
+				self.done.set_result(self.finished)
+
+async def serve(server_port,file_name,p,variant='gbn',sack=False,transfers=1,buffer_size=DEFAULT_BUFFER_SIZE,get_checksum=get_checksum_function('internet'),session_timeout=SESSION_TIMEOUT):
+	"""
+	Receive files from Simple-FTP Clients on the running event loop, any number of them at the same time
+	Arguments:
+		server_port		: Post # of the Server
+		file_name 		: Output File Path, formatted with {host}, {port} and {transfer} (0, 1, ...) for each transfer
+		p				: Probability of packet loss
+		variant 		: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+		sack 			: Send selective acknowledgements
+		transfers 		: Number of transfers to receive before returning (0 or None to serve forever, as in the threaded Servers)
+		buffer_size 	: Bytes of data coalesced before writing to the output file
+		get_checksum 	: Checksum function for the data (must match the Client)
+		session_timeout : Seconds without packets after which an unfinished session is closed
+	Returns:
+		List of the output files of the finished transfers
+	"""
+	if variant not in ('gbn','sr'):
+		raise ValueError("Variant Error: Unknown ARQ scheme " + str(variant))
+
+	loop = asyncio.get_running_loop()
+	transfers = transfers or None
+	transport, protocol = await loop.create_datagram_endpoint(lambda: ServerProtocol(file_name,p,variant,sack,buffer_size,get_checksum,transfers,session_timeout),local_addr=('0.0.0.0',server_port))
+	try:
+		return await protocol.done
+	finally:
+		transport.close()
+
+async def send_files(server_host_name,server_port,file_names,N,MSS,variant,get_checksum,use_mmap,adaptive_rto):
+	"""
+	Transfer several files at the same time from one event loop and print the delay of each
+	Arguments:
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
+		file_names 			: Input File Paths
+		N 					: Window Size
+		MSS 				: Maximum Segment Size
+		variant 			: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+		get_checksum 		: Checksum function for the data (must match the Server)
+		use_mmap 			: Send the data from the memory-mapped file
+		adaptive_rto 		: Adapt the timeout to the measured RTT
+	"""
+	delays = await asyncio.gather(*(send_file(server_host_name,server_port,file_name,N,MSS,variant,get_checksum,use_mmap,adaptive_rto) for file_name in file_names))
+	for file_name,delay in zip(file_names,delays):
+		print("{} Total Time Taken(Delay) : {}".format(file_name,delay))
+
+if __name__ == '__main__':
+
+	# Reading Arguments
+	parser = argparse.ArgumentParser(description="Simple-FTP on asyncio: one event loop for any number of transfers")
+	subparsers = parser.add_subparsers(dest='command',required=True)
+
+	serve_parser = subparsers.add_parser('serve',help="Run the Server")
+	serve_parser.add_argument('server_port',type=int,help="Port # of the Server")
+	serve_parser.add_argument('file_name',help="Output File Path, may contain {host}, {port} and {transfer}")
+	serve_parser.add_argument('p',type=float,help="Probability of packet loss")
+	serve_parser.add_argument('--transfers',type=int,default=1,help="Number of transfers to receive before exiting (0 for no limit)")
+	serve_parser.add_argument('--sack',action='store_true',help="Send selective acknowledgements")
+	serve_parser.add_argument('--session-timeout',type=float,default=SESSION_TIMEOUT,help="Seconds without packets after which a session is closed")
+
+	send_parser = subparsers.add_parser('send',help="Run the Client")
+	send_parser.add_argument('server_host_name',help="Host Name of the Server")
+	send_parser.add_argument('server_port',type=int,help="Port # of the Server")
+	send_parser.add_argument('N',type=int,help="Window Size")
+	send_parser.add_argument('MSS',type=int,help="Maximum Segment Size")
+	send_parser.add_argument('file_names',nargs='+',help="Input File Paths, sent at the same time")
+	send_parser.add_argument('--mmap',action='store_true',help="Memory-map the files and send the data from the mapping")
+	send_parser.add_argument('--fixed-rto',action='store_true',help="Always use the initial timeout instead of adapting it to the measured RTT")
+
+	for subparser in (serve_parser,send_parser):
+		subparser.add_argument('--variant',default='gbn',choices=['gbn','sr'],help="ARQ scheme")
+		subparser.add_argument('--checksum',default='internet',choices=sorted(CHECKSUM_FUNCTIONS),help="Checksum implementation, must match on both sides")
+	args = parser.parse_args()
+
+	if args.command == 'serve':
+		finished = asyncio.run(serve(args.server_port,args.file_name,args.p,args.variant,args.sack,args.transfers,get_checksum=get_checksum_function(args.checksum),session_timeout=args.session_timeout))
+		print("Data Recieved")
+		for file_name in finished:
+			print("Please check {}".format(file_name))
+	else:
+		for file_name in args.file_names:
+			if not os.path.exists(file_name):
+				print("FileError: The defined file doesn't exist, Please check the name of the file")
+				quit()
+		asyncio.run(send_files(args.server_host_name,args.server_port,args.file_names,args.N,args.MSS,args.variant,get_checksum_function(args.checksum),args.mmap,not args.fixed_rto))
@@ -0,0 +1,368 @@
+import ctypes
+import ctypes.util
+import errno
+import mmap
+import os
+import select
+import socket
+import struct
+import sys
+
+# Largest number of datagrams in one sendmmsg or recvmmsg
+MAX_BATCH = 64
+
+# Buffers of a receive ring, a received datagram stays valid until as many more are received
+RING_SLOTS = 256
+
+# Largest receive ring in bytes: with large buffers the recvmmsg batches of the pipelined receiver are made smaller to stay under it
+RING_MAX_SIZE = 32*1024*1024
+
+# recvmmsg flag: return the datagrams already queued instead of blocking
+MSG_DONTWAIT = getattr(socket,'MSG_DONTWAIT',0x40)
+
+# I/O vector (struct iovec): address and length of a buffer
+IOVEC = struct.Struct('PN')
+
+# Bytes of the buffer holding the copied packet headers of a batch, before it grows to the headers of the largest batch
+SEND_BUFFER_SIZE = MAX_BATCH*16
+
+# Buffer request of PyObject_GetBuffer: a contiguous buffer, read-only is accepted
+PyBUF_SIMPLE = 0
+
+# IPv4 socket address (struct sockaddr_in): family in host byte order, port and address in network byte order, zero padding
+SOCKADDR_IN = struct.Struct('=H2s4s8x')
+
+class iovec(ctypes.Structure):
+	_fields_ = [('iov_base',ctypes.c_void_p),('iov_len',ctypes.c_size_t)]
+
+class msghdr(ctypes.Structure):
+	_fields_ = [('msg_name',ctypes.c_void_p),('msg_namelen',ctypes.c_uint32),('msg_iov',ctypes.POINTER(iovec)),('msg_iovlen',ctypes.c_size_t),
+				('msg_control',ctypes.c_void_p),('msg_controllen',ctypes.c_size_t),('msg_flags',ctypes.c_int)]
+
+class mmsghdr(ctypes.Structure):
+	_fields_ = [('msg_hdr',msghdr),('msg_len',ctypes.c_uint)]
+
+class Py_buffer(ctypes.Structure):
+	_fields_ = [('buf',ctypes.c_void_p),('obj',ctypes.c_void_p),('len',ctypes.c_ssize_t),('itemsize',ctypes.c_ssize_t),
+				('readonly',ctypes.c_int),('ndim',ctypes.c_int),('format',ctypes.c_void_p),('shape',ctypes.c_void_p),
+				('strides',ctypes.c_void_p),('suboffsets',ctypes.c_void_p),('internal',ctypes.c_void_p)]
+
+# Length of the I/O vector of a message header (msg_iovlen), written in place for each message of a batch
+MSG_IOVLEN = struct.Struct('N')
+
+def load_libc():
+	"""
+	The C library with sendmmsg and recvmmsg (Linux 3.0, FreeBSD 11), None elsewhere
+	"""
+	if not sys.platform.startswith(('linux','freebsd')):
+		return None
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c'),use_errno=True)
+	except OSError:
+		return None
+	if not hasattr(libc,'sendmmsg') or not hasattr(libc,'recvmmsg'):
+		return None
+	libc.sendmmsg.argtypes = [ctypes.c_int,ctypes.POINTER(mmsghdr),ctypes.c_uint,ctypes.c_int]
+	libc.sendmmsg.restype = ctypes.c_int
+	libc.recvmmsg.argtypes = [ctypes.c_int,ctypes.POINTER(mmsghdr),ctypes.c_uint,ctypes.c_int,ctypes.c_void_p]
+	libc.recvmmsg.restype = ctypes.c_int
+	return libc
+
+libc = load_libc()
+
+def load_python_api():
+	"""
+	The buffer protocol functions of the CPython API, to get the address of a buffer held for a system call (None elsewhere)
+	"""
+	python_api = getattr(ctypes,'pythonapi',None)
+	if python_api is None or not hasattr(python_api,'PyObject_GetBuffer'):
+		return None
+	python_api.PyObject_GetBuffer.argtypes = [ctypes.py_object,ctypes.POINTER(Py_buffer),ctypes.c_int]
+	python_api.PyObject_GetBuffer.restype = ctypes.c_int
+	python_api.PyBuffer_Release.argtypes = [ctypes.POINTER(Py_buffer)]
+	python_api.PyBuffer_Release.restype = None
+	return python_api
+
+python_api = load_python_api()
+
+def mmsg_supported():
+	"""
+	Check if sendmmsg and recvmmsg can be called
+	"""
+	return libc is not None and python_api is not None
+
+def make_sockaddr(address):
+	"""
+	Pack an IPv4 socket address
+	Arguments:
+		address : (Host Name, Port #)
+	"""
+	return SOCKADDR_IN.pack(socket.AF_INET,struct.pack('!H',address[1]),socket.inet_aton(socket.gethostbyname(address[0])))
+
+def raise_errno():
+	"""
+	Raise the error of the last C library call
+	"""
+	error = ctypes.get_errno()
+	raise OSError(error,os.strerror(error))
+
+class SendBatch:
+	"""
+	Datagrams to one address sent with a single sendmmsg, without copying their data. The I/O vectors of each message point
+	at the buffer of the packet, or at the header and the data of a (header, data) packet, so the data of a memory-mapped file
+	is sent from the mapping. Each buffer is exported with PyObject_GetBuffer until the system call returns, so the kernel only
+	reads memory that can not be released or moved during the call. The headers (a few bytes) are copied into a buffer of the batch
+	"""
+
+	def __init__(self,address,max_batch=MAX_BATCH):
+		"""
+		Arguments:
+			address 	: (Host Name, Port #) of the receiver
+			max_batch 	: Largest number of datagrams in one system call
+		"""
+		self.max_batch = max_batch
+		self.sockaddr = ctypes.create_string_buffer(make_sockaddr(address),SOCKADDR_IN.size)
+
+		# Two I/O vectors for each message, for the header and the data of a packet
+		self.iovecs = (iovec*(2*max_batch))()
+		self.messages = (mmsghdr*max_batch)()
+		for index in range(max_batch):
+			header = self.messages[index].msg_hdr
+			header.msg_name = ctypes.addressof(self.sockaddr)
+			header.msg_namelen = SOCKADDR_IN.size
+			header.msg_iov = ctypes.pointer(self.iovecs[2*index])
+			header.msg_iovlen = 1
+		self.iovecs_view = memoryview(self.iovecs).cast('B')
+		self.messages_view = memoryview(self.messages).cast('B')
+
+		# Exports of the packet buffers of a batch, held during the system call
+		self.exports = (Py_buffer*max_batch)()
+
+		self.buffer = None
+		self.reserve(SEND_BUFFER_SIZE)
+
+	def reserve(self,size):
+		"""
+		Make the header buffer at least size bytes, between two system calls
+		Arguments:
+			size : Bytes of the headers of a batch
+		"""
+		if self.buffer is not None and len(self.buffer) >= size:
+			return
+		self.buffer = ctypes.create_string_buffer(size)
+		self.buffer_view = memoryview(self.buffer).cast('B')
+		self.buffer_address = ctypes.addressof(self.buffer)
+
+	def send(self,sock,packets):
+		"""
+		Send the packets, MAX_BATCH at a time
+		Arguments:
+			sock 	: UDP Socket
+			packets : List of packet bytes or (header, data) tuples
+		Returns:
+			Number of system calls made
+		"""
+		calls = 0
+		pack_iovec = IOVEC.pack_into
+		pack_iovlen = MSG_IOVLEN.pack_into
+		iovecs_view = self.iovecs_view
+		messages_view = self.messages_view
+		iovlen_offset = mmsghdr.msg_hdr.offset + msghdr.msg_iovlen.offset
+		get_buffer = python_api.PyObject_GetBuffer
+		exports = self.exports
+		for start in range(0,len(packets),self.max_batch):
+			batch = packets[start:start + self.max_batch]
+			self.reserve(sum(len(packet[0]) for packet in batch if isinstance(packet,tuple)))
+			buffer_view = self.buffer_view
+			buffer_address = self.buffer_address
+
+			exported = 0
+			try:
+				header_offset = 0
+				for index, packet in enumerate(batch):
+					iovec_offset = 2*index*IOVEC.size
+
+					# The header is copied, and the data follows it in a second I/O vector
+					if isinstance(packet,tuple):
+						header, data = packet
+						header_end = header_offset + len(header)
+						buffer_view[header_offset:header_end] = header
+						pack_iovec(iovecs_view,iovec_offset,buffer_address + header_offset,len(header))
+						header_offset = header_end
+						iovec_offset += IOVEC.size
+						pack_iovlen(messages_view,index*ctypes.sizeof(mmsghdr) + iovlen_offset,2)
+					else:
+						data = packet
+						pack_iovlen(messages_view,index*ctypes.sizeof(mmsghdr) + iovlen_offset,1)
+
+					export = exports[exported]
+					get_buffer(data,export,PyBUF_SIMPLE)
+					exported += 1
+					pack_iovec(iovecs_view,iovec_offset,export.buf or 0,export.len)
+
+				# A blocking socket sends the whole batch, but sendmmsg may stop early (when the socket buffer is full)
+				sent = 0
+				while sent < len(batch):
+					result = libc.sendmmsg(sock.fileno(),ctypes.byref(self.messages[sent]),len(batch) - sent,0)
+					calls += 1
+					if result < 0:
+						if ctypes.get_errno() == errno.EINTR:
+							continue
+						raise_errno()
+					sent += result
+			finally:
+				for index in range(exported):
+					python_api.PyBuffer_Release(exports[index])
+		return calls
+
+class ReceiveRing:
+	"""
+	Preallocated receive buffers used in turn, so receiving a datagram allocates no buffer: the socket fills the next
+	slot in place and the datagram is a memoryview of it. A datagram stays valid until the ring comes back to its slot,
+	so whatever is kept longer than RING_SLOTS more receives must be copied (the Reassembler copies the packets it holds).
+	The ring is an anonymous memory map, whose pages are only allocated when a datagram is first written to them
+	"""
+
+	def __init__(self,slot_size,slots=RING_SLOTS):
+		"""
+		Arguments:
+			slot_size 	: Bytes of each buffer
+			slots 		: Number of buffers
+		"""
+		self.slot_size = slot_size
+		self.slots = slots
+		self.buffer = mmap.mmap(-1,slot_size*slots)
+		self.view = memoryview(self.buffer)
+
+		# The ctypes object is kept, its buffer export keeps the map from being closed or resized while its address is used
+		self.buffer_export = ctypes.c_char.from_buffer(self.buffer)
+		self.address = ctypes.addressof(self.buffer_export)
+		self.next_slot = 0
+
+		# Memoryview of each buffer, made once
+		self.slot_views = [self.view[index*slot_size:(index + 1)*slot_size] for index in range(slots)]
+
+	def slot(self):
+		"""
+		Index of the next buffer of the ring
+		"""
+		index = self.next_slot
+		self.next_slot = index + 1 if index + 1 < self.slots else 0
+		return index
+
+	def buffer_view(self,index,length=None):
+		"""
+		Memoryview of a buffer, or of its first length bytes
+		Arguments:
+			index 	: Index of the buffer
+			length 	: Bytes received in the buffer (the whole buffer if None)
+		"""
+		if length is None:
+			return self.slot_views[index]
+		return self.slot_views[index][:length]
+
+	def receive_from(self,sock):
+		"""
+		Receive one datagram into the next buffer
+		Arguments:
+			sock : UDP Socket
+		Returns:
+			(datagram memoryview, address)
+		"""
+		index = self.next_slot
+		self.next_slot = index + 1 if index + 1 < self.slots else 0
+		size, address = sock.recvfrom_into(self.slot_views[index])
+		return self.slot_views[index][:size], address
+
+class ReceiveBatch:
+	"""
+	Datagrams drained from the socket with a single recvmmsg into the next MAX_BATCH buffers of a receive ring, after waiting
+	for the first one with poll and the timeout of the socket (the socket module keeps a socket with a timeout non-blocking).
+	A set of message headers is prepared once for each MAX_BATCH buffers of the ring
+	"""
+
+	def __init__(self,receive_size,max_batch=MAX_BATCH,slots=RING_SLOTS):
+		"""
+		Arguments:
+			receive_size 	: Buffer size of each datagram (a larger datagram is truncated to it)
+			max_batch 		: Largest number of datagrams in one system call
+			slots 			: Buffers in the receive ring, rounded up to whole batches
+		"""
+		self.receive_size = receive_size
+		self.max_batch = max_batch
+		self.ring = ReceiveRing(receive_size,max_batch*max(1,-(-slots//max_batch)))
+		self.sockaddrs = ctypes.create_string_buffer(SOCKADDR_IN.size*max_batch)
+		self.sockaddrs_view = memoryview(self.sockaddrs).cast('B')
+
+		# Message headers and I/O vectors of each batch of buffers, all sharing the sender addresses
+		self.batches = []
+		for batch_index in range(self.ring.slots//max_batch):
+			iovecs = (iovec*max_batch)()
+			messages = (mmsghdr*max_batch)()
+			for index in range(max_batch):
+				iovecs[index].iov_base = self.ring.address + (batch_index*max_batch + index)*receive_size
+				iovecs[index].iov_len = receive_size
+				header = messages[index].msg_hdr
+				header.msg_name = ctypes.addressof(self.sockaddrs) + index*SOCKADDR_IN.size
+				header.msg_namelen = SOCKADDR_IN.size
+				header.msg_iov = ctypes.pointer(iovecs[index])
+				header.msg_iovlen = 1
+			self.batches.append((iovecs,messages,memoryview(messages).cast('B')))
+		self.next_batch = 0
+
+		# Received length of each message, read for a whole batch at once (the kernel leaves the IPv4 address length as it is)
+		self.msg_len = struct.Struct('{}xI{}x'.format(mmsghdr.msg_len.offset,ctypes.sizeof(mmsghdr) - mmsghdr.msg_len.offset - 4))
+
+		# Packed port and IPv4 address of each sender
+		self.sockaddr_address = struct.Struct('2x6s8x')
+
+		# Addresses already seen, by their packed port and IPv4 address
+		self.addresses = {}
+
+		self.poller = None
+		self.poller_fd = None
+
+	def wait(self,sock):
+		"""
+		Wait until a datagram can be read, for at most the timeout of the socket
+		Arguments:
+			sock : UDP Socket
+		"""
+		if self.poller_fd != sock.fileno():
+			self.poller = select.poll()
+			self.poller.register(sock.fileno(),select.POLLIN)
+			self.poller_fd = sock.fileno()
+		timeout = sock.gettimeout()
+		if not self.poller.poll(None if timeout is None else timeout*1000):
+			raise socket.timeout("timed out")
+
+	def receive(self,sock):
+		"""
+		Receive the datagrams waiting on the socket
+		Arguments:
+			sock : UDP Socket
+		Returns:
+			List of (datagram memoryview, (Host, Port #)), at least one
+		"""
+		_, messages, messages_view = self.batches[self.next_batch]
+		while True:
+			self.wait(sock)
+			received = libc.recvmmsg(sock.fileno(),messages,self.max_batch,MSG_DONTWAIT,None)
+			if received > 0:
+				break
+			if received < 0 and ctypes.get_errno() not in (errno.EAGAIN,errno.EWOULDBLOCK,errno.EINTR):
+				raise_errno()
+
+		datagrams = []
+		start = self.next_batch*self.max_batch*self.receive_size
+		self.next_batch = (self.next_batch + 1) % len(self.batches)
+		lengths = self.msg_len.iter_unpack(messages_view[:received*self.msg_len.size])
+		packed_addresses = self.sockaddr_address.iter_unpack(self.sockaddrs_view[:received*SOCKADDR_IN.size])
+		for (length,),(packed_address,) in zip(lengths,packed_addresses):
+			address = self.addresses.get(packed_address)
+			if address is None:
+				address = (socket.inet_ntoa(packed_address[2:]),struct.unpack('!H',packed_address[:2])[0])
+				self.addresses[packed_address] = address
+			datagrams.append((self.ring.view[start:start + length],address))
+			start += self.receive_size
+		return datagrams
@@ -0,0 +1,37 @@
+import os
+import sys
+import timeit
+
+from checksum import CHECKSUM_FUNCTIONS
+
+# Segment sizes to benchmark the checksum implementations with
+MSS_SIZES = [64, 256, 500, 1000, 1460, 4096, 8192, 65000]
+
+def benchmark_checksum(mss_sizes,number):
+	"""
+	Time every checksum implementation for each segment size and print a table in microseconds per packet
+	Arguments:
+		mss_sizes 	: List of Maximum Segment Sizes to test
+		number 		: Number of checksums to compute for each measurement
+	"""
+	names = list(CHECKSUM_FUNCTIONS)
+	print("{:>8}".format("MSS") + "".join("{:>22}".format(name) for name in names))
+
+	for MSS in mss_sizes:
+		data = os.urandom(MSS)
+		row = "{:>8}".format(MSS)
+		for name in names:
+			function = CHECKSUM_FUNCTIONS[name]
+			# The reference loop is slow, run it fewer times
+			runs = max(1,number//100) if name == 'internet-reference' else number
+			seconds = min(timeit.repeat(lambda: function(data),number=runs,repeat=3))
+			row += "{:>22.3f}".format(seconds/runs*1e6)
+		print(row)
+
+if __name__ == '__main__':
+
+	# Reading Arguments
+	number = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+	print("Checksum time per packet (microseconds)")
+	benchmark_checksum(MSS_SIZES,number)
@@ -0,0 +1,85 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+# Loss probabilities to benchmark the transfer with
+LOSS_PROBABILITIES = [0.01, 0.02, 0.05, 0.1, 0.2]
+
+def run_transfer(variant,file_name,N,MSS,p,port,server_options,client_options):
+	"""
+	Run one transfer with a local Server and Client and return the delay reported by the Client
+	Arguments:
+		variant 		: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+		file_name 		: Input File Path
+		N 				: Window Size
+		MSS 			: Maximum Segment Size
+		p 				: Probability of packet loss
+		port 			: Port # of the Server
+		server_options 	: Extra arguments of the Server
+		client_options 	: Extra arguments of the Client
+	"""
+	prefix = 'Selective_Repeat_' if variant == 'sr' else ''
+	directory = os.path.dirname(os.path.abspath(__file__))
+
+	with tempfile.NamedTemporaryFile(delete=False) as output_file:
+		output_name = output_file.name
+
+	try:
+		server = subprocess.Popen([sys.executable,os.path.join(directory,prefix + 'Simple_ftp_server.py'),str(port),output_name,str(p)] + server_options,stdout=subprocess.DEVNULL,stderr=subprocess.DEVNULL)
+		client = subprocess.run([sys.executable,os.path.join(directory,prefix + 'Simple_ftp_client.py'),'127.0.0.1',str(port),file_name,str(N),str(MSS)] + client_options,capture_output=True,text=True)
+		server.wait(timeout=10)
+
+		# The Client prints the time taken by the transfer
+		delay = re.search(r"Total Time Taken\(Delay\) : ([0-9.e-]+)",client.stdout)
+		if delay is None:
+			raise RuntimeError("Transfer failed: " + client.stdout[-500:] + client.stderr[-500:])
+		return float(delay.group(1))
+	finally:
+		os.remove(output_name)
+
+def benchmark_goodput(variant,file_name,N,MSS,probabilities,runs,port):
+	"""
+	Compare the goodput with and without fast retransmit for each loss probability and print a table
+	Arguments:
+		variant 		: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+		file_name 		: Input File Path
+		N 				: Window Size
+		MSS 			: Maximum Segment Size
+		probabilities 	: List of loss probabilities
+		runs 			: Number of transfers averaged for each value
+		port 			: Port # of the Server
+	"""
+	file_size = os.path.getsize(file_name)
+	modes = [('timeout only',['--dup-acks','0']),('fast retransmit',[])]
+
+	print("Goodput (KB/s), {} N = {} MSS = {}, average of {} runs".format(variant,N,MSS,runs))
+	print("{:>8}".format("p") + "".join("{:>18}".format(name) for name,options in modes))
+
+	for p in probabilities:
+		row = "{:>8}".format(p)
+		for name,client_options in modes:
+			delays = []
+			for run in range(runs):
+				delays.append(run_transfer(variant,file_name,N,MSS,p,port,[],client_options))
+				port += 1
+				time.sleep(0.1)
+			row += "{:>18.1f}".format(file_size/1024/(sum(delays)/len(delays)))
+		print(row)
+
+if __name__ == '__main__':
+
+	# Reading Arguments
+	parser = argparse.ArgumentParser(description="Goodput of the Simple-FTP transfer against the loss probability")
+	parser.add_argument('file_name',help="Input File Path")
+	parser.add_argument('--variant',default='gbn',choices=['gbn','sr'],help="ARQ scheme to benchmark")
+	parser.add_argument('-N',type=int,default=16,help="Window Size")
+	parser.add_argument('--MSS',type=int,default=1000,help="Maximum Segment Size")
+	parser.add_argument('--runs',type=int,default=3,help="Transfers averaged for each value")
+	parser.add_argument('--port',type=int,default=7735,help="First Port # used by the Server")
+	args = parser.parse_args()
+
+	benchmark_goodput(args.variant,args.file_name,args.N,args.MSS,LOSS_PROBABILITIES,args.runs,args.port)
@@ -0,0 +1,108 @@
+import sys
+import zlib
+from array import array
+
+# NumPy is optional, the numpy checksum is only available when it is installed
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+def internet_checksum_reference(data):
+	"""
+	Calculate the Checksum of the data one 2 byte word at a time (reference implementation)
+	Arguments:
+		data : Data Value in bytes for which the checksum is to be calculated
+	"""
+	sm = 0
+	size = len(data) - len(data) % 2 # Storing the length if data, if data is odd, then data length else data length -1
+
+	# Running loop fo each 2 byte data in the data
+	for i in range(0, size, 2):
+		shift = data[i] + (data[i+1] << 8) #Adding data and its 8bit left shifted part
+		chk = sm + shift #Concating the shift to the total data
+		sm = (chk & 0xffff) + (chk >> 16) #Carry Around add
+	return ~sm & 0xffff #Returning the checksum
+
+def fold_checksum(total):
+	"""
+	Fold a plain sum of 16-bit words into the one's complement checksum
+	Arguments:
+		total : Sum of all the little endian 16-bit words of the data
+	"""
+	# Carry Around add until the sum fits in 16 bits
+	while total >> 16:
+		total = (total & 0xffff) + (total >> 16)
+	return ~total & 0xffff
+
+def internet_checksum_int(data):
+	"""
+	Calculate the Checksum of the data using a single big integer
+	As 2^16 = 1 (mod 0xffff), the one's complement sum of the 16-bit words is the
+	little endian value of the data modulo 0xffff, which is computed in C
+	Arguments:
+		data : Data Value in bytes for which the checksum is to be calculated
+	"""
+	size = len(data) - len(data) % 2 # Trailing odd byte is not part of the checksum
+	value = int.from_bytes(memoryview(data)[:size],'little')
+
+	# Only all zero data gives a zero sum, any other multiple of 0xffff is 0xffff in one's complement
+	if value == 0:
+		return 0xffff
+	return ~(value % 0xffff or 0xffff) & 0xffff
+
+def internet_checksum_array(data):
+	"""
+	Calculate the Checksum of the data by bulk summing an array of 16-bit words
+	Arguments:
+		data : Data Value in bytes for which the checksum is to be calculated
+	"""
+	size = len(data) - len(data) % 2 # Trailing odd byte is not part of the checksum
+	words = array('H')
+	words.frombytes(memoryview(data)[:size])
+	# Words are little endian in the checksum
+	if sys.byteorder == 'big':
+		words.byteswap()
+	return fold_checksum(sum(words))
+
+def internet_checksum_numpy(data):
+	"""
+	Calculate the Checksum of the data with a vectorized NumPy sum
+	Arguments:
+		data : Data Value in bytes for which the checksum is to be calculated
+	"""
+	words = numpy.frombuffer(data,dtype='<u2',count=len(data)//2)
+	return fold_checksum(int(words.sum(dtype=numpy.uint64)))
+
+def crc32_checksum(data):
+	"""
+	Calculate a CRC-32 of the data folded to fit the 16-bit checksum field (high half XOR low half).
+	Folding keeps only 16 bits, so it does not keep the guarantees of CRC-32: every single-bit error is
+	detected in data up to 21503 bytes, but some bursts as short as two adjacent bits are not, and a
+	random corruption passes with probability 2^-16, as with the Internet checksum. Unlike the Internet
+	checksum it detects swapped 16-bit words and words changed from 0x0000 to 0xffff
+	Arguments:
+		data : Data Value in bytes for which the checksum is to be calculated
+	"""
+	crc = zlib.crc32(data)
+	return (crc >> 16) ^ (crc & 0xffff)
+
+# Checksum implementations by name, all the internet ones give identical values
+CHECKSUM_FUNCTIONS = {
+	'internet': internet_checksum_int,
+	'internet-reference': internet_checksum_reference,
+	'internet-array': internet_checksum_array,
+	'crc32': crc32_checksum,
+}
+if numpy is not None:
+	CHECKSUM_FUNCTIONS['internet-numpy'] = internet_checksum_numpy
+
+def get_checksum_function(mode):
+	"""
+	Get the checksum function for the given mode
+	Arguments:
+		mode : Name of the checksum implementation (see CHECKSUM_FUNCTIONS)
+	"""
+	if mode not in CHECKSUM_FUNCTIONS:
+		raise ValueError("Checksum Error: Unknown checksum mode " + str(mode))
+	return CHECKSUM_FUNCTIONS[mode]
@@ -0,0 +1,138 @@
+import collections
+import time
+
+# Congestion window in packets at the start and after a timeout
+INITIAL_WINDOW = 1
+
+# Lowest slow start threshold in packets after a loss
+MIN_SSTHRESH = 2
+
+# Number of recent congestion window changes kept for analysis
+TRAJECTORY_KEPT = 100000
+
+class CongestionControl:
+	"""
+	Congestion window on top of the sliding window (slow start and AIMD as in TCP Reno, RFC 5681):
+	the window grows by one packet for each acknowledged packet below the slow start threshold and by
+	one packet per window above it, is halved on a loss (duplicate ACKs or a NAK) and falls back to
+	INITIAL_WINDOW on a timeout. The window N of the Client is the maximum window.
+	Only the first loss of a window reduces it: later losses of packets sent before the reduction are the same congestion event.
+	The Clients call it with their lock held.
+	"""
+
+	def __init__(self,max_window,enabled=True):
+		"""
+		Arguments:
+			max_window 	: Largest window in packets (the window N of the Client)
+			enabled 	: Limit the window with the congestion window, else the window is always max_window
+		"""
+		self.max_window = max_window
+		self.enabled = enabled
+
+		self.cwnd = INITIAL_WINDOW if enabled else max_window
+		self.ssthresh = max_window
+
+		# Packets sent before this sequence number belong to the window of the last reduction
+		self.recovery_point = 0
+
+		# Recent (time, cwnd, ssthresh, event) changes of the window, and the number of reductions
+		self.trajectory = collections.deque(maxlen=TRAJECTORY_KEPT)
+		self.losses = 0
+		self.timeouts = 0
+		self.record('start')
+
+	def record(self,event):
+		"""
+		Add the current window to the trajectory
+		Arguments:
+			event : 'start', 'ack', 'loss' or 'timeout'
+		"""
+		self.trajectory.append((time.time(),self.cwnd,self.ssthresh,event))
+
+	def window(self):
+		"""
+		Number of packets that can be outstanding
+		"""
+		return max(1,min(self.max_window,int(self.cwnd)))
+
+	def on_ack(self,acknowledged):
+		"""
+		Grow the window for newly acknowledged packets
+		Arguments:
+			acknowledged : Number of packets acknowledged for the first time
+		"""
+		if not self.enabled or acknowledged <= 0 or self.cwnd >= self.max_window:
+			return
+
+		# Slow start up to the threshold, then one packet per window of acknowledged packets
+		if self.cwnd < self.ssthresh:
+			self.cwnd = min(self.ssthresh,self.cwnd + acknowledged)
+		else:
+			self.cwnd += acknowledged/self.cwnd
+		self.cwnd = min(self.cwnd,self.max_window)
+		self.record('ack')
+
+	def reduce(self,sequence_number,next_sequence_number):
+		"""
+		Halve the slow start threshold for a loss of the given packet, once per window
+		Arguments:
+			sequence_number 		: Sequence Number of the lost packet
+			next_sequence_number 	: Next Sequence Number to send
+		Returns:
+			True if the loss is a new congestion event
+		"""
+		if not self.enabled or sequence_number < self.recovery_point:
+			return False
+		self.ssthresh = max(MIN_SSTHRESH,self.cwnd/2)
+		self.recovery_point = next_sequence_number
+		return True
+
+	def on_loss(self,sequence_number,next_sequence_number):
+		"""
+		Multiplicative decrease after a loss detected by duplicate acknowledgements or a negative acknowledgement
+		Arguments:
+			sequence_number 		: Sequence Number of the lost packet
+			next_sequence_number 	: Next Sequence Number to send
+		"""
+		if self.reduce(sequence_number,next_sequence_number):
+			self.cwnd = self.ssthresh
+			self.losses += 1
+			self.record('loss')
+
+	def on_timeout(self,sequence_number,next_sequence_number):
+		"""
+		Back to slow start after a retransmission timeout
+		Arguments:
+			sequence_number 		: Sequence Number of the packet that timed out
+			next_sequence_number 	: Next Sequence Number to send
+		"""
+		if not self.enabled:
+			return
+		self.reduce(sequence_number,next_sequence_number)
+		self.cwnd = INITIAL_WINDOW
+		self.timeouts += 1
+		self.record('timeout')
+
+	def stats(self):
+		"""
+		Current state of the congestion window
+		"""
+		return {
+			'cwnd': self.cwnd,
+			'ssthresh': self.ssthresh,
+			'max_cwnd': max(cwnd for _,cwnd,_,_ in self.trajectory),
+			'losses': self.losses,
+			'timeouts': self.timeouts,
+		}
+
+	def write_trajectory(self,file_name):
+		"""
+		Write the trajectory of the window as CSV (time from the start in seconds, cwnd, ssthresh, event)
+		Arguments:
+			file_name : Output File Path
+		"""
+		start_time = self.trajectory[0][0] if self.trajectory else 0
+		with open(file_name,'w') as trajectory_file:
+			trajectory_file.write("time,cwnd,ssthresh,event\n")
+			for change_time,cwnd,ssthresh,event in self.trajectory:
+				trajectory_file.write("{:.6f},{:.3f},{:.3f},{}\n".format(change_time - start_time,cwnd,ssthresh,event))
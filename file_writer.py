@@ -0,0 +1,175 @@
+import os
+import time
+
+# Default size of the write buffer (1 MiB)
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# When the data is forced to disk: never, once when the file is closed, or every fsync_interval seconds
+FSYNC_POLICIES = ('none','end','periodic')
+
+class FileWriter:
+	"""
+	Output file that stays open for the whole transfer and coalesces the received segments into
+	large writes aligned to buffer_size. Data is written when the buffer fills or the file is closed.
+	With use_pwrite the data is written at explicit offsets with os.pwrite, so segments can be placed
+	at sequence_number*MSS instead of being appended.
+	With a write stage the full buffers are handed to its thread, which does the file operations in order.
+	"""
+
+	def __init__(self,file_name,buffer_size=DEFAULT_BUFFER_SIZE,fsync_policy='none',fsync_interval=1.0,use_pwrite=False,base_offset=None,write_stage=None):
+		"""
+		Arguments:
+			file_name 		: Output File Path (the data is added after its current content)
+			buffer_size 	: Number of bytes to coalesce before writing (0 writes every segment)
+			fsync_policy 	: One of FSYNC_POLICIES
+			fsync_interval 	: Seconds between fsyncs for the periodic policy
+			use_pwrite 		: Write at explicit offsets with os.pwrite instead of appending
+			base_offset 	: File offset where the data starts (None for after the current content),
+							  given for a byte range of a file written by several writers (e.g. a stripe)
+			write_stage 	: WriteStage doing the file operations on its thread (None to do them in the caller)
+		"""
+		if fsync_policy not in FSYNC_POLICIES:
+			raise ValueError("Fsync Error: Unknown fsync policy " + str(fsync_policy))
+
+		self.buffer_size = buffer_size
+		self.fsync_policy = fsync_policy
+		self.fsync_interval = fsync_interval
+		# Data can be written at any offset, with os.pwrite or with seek and write where it is not available
+		self.random_access = use_pwrite or base_offset is not None
+		self.use_pwrite = self.random_access and hasattr(os,'pwrite')
+		self.write_stage = write_stage
+
+		# Unbuffered file, the buffering is done here
+		if self.random_access:
+			self.file = open(file_name,'r+b',buffering=0)
+			self.file.seek(0,os.SEEK_END)
+		else:
+			self.file = open(file_name,'ab',buffering=0)
+
+		# The data is placed after the existing content of the file, or at the given offset
+		self.base_offset = self.file.tell() if base_offset is None else base_offset
+
+		# Buffered data and the file offset where it starts
+		self.buffer = bytearray()
+		self.buffer_offset = self.base_offset
+
+		# Counters to see how well the segments are coalesced
+		self.bytes_written = 0
+		self.write_calls = 0
+		self.fsync_calls = 0
+		self.last_fsync = time.time()
+
+	def write_to_disk(self,data,offset):
+		"""
+		Write all of the data at the given file offset
+		Arguments:
+			data 	: Data to write
+			offset 	: File offset of the data
+		"""
+		data = memoryview(data)
+		while data:
+			if self.use_pwrite:
+				written = os.pwrite(self.file.fileno(),data,offset)
+			else:
+				if self.random_access and self.file.tell() != offset:
+					self.file.seek(offset)
+				written = self.file.write(data)
+			data = data[written:]
+			offset += written
+			self.bytes_written += written
+			self.write_calls += 1
+
+	def flush(self,aligned=False):
+		"""
+		Write the buffered data to the file
+		Arguments:
+			aligned : Only write up to the last buffer_size boundary, keeping the rest buffered
+		"""
+		end = self.buffer_offset + len(self.buffer)
+		if aligned and self.buffer_size:
+			end -= (end - self.base_offset) % self.buffer_size
+		size = end - self.buffer_offset
+
+		if size > 0:
+			if self.write_stage is None:
+				self.write_to_disk(memoryview(self.buffer)[:size],self.buffer_offset)
+				del self.buffer[:size]
+			else:
+				# The write stage takes the written part of the buffer, the rest starts a new buffer
+				data = self.buffer
+				self.buffer = data[size:]
+				del data[size:]
+				self.run(self.write_to_disk,data,self.buffer_offset)
+			self.buffer_offset = end
+
+		# Periodic fsync policy
+		if self.fsync_policy == 'periodic' and time.time() - self.last_fsync >= self.fsync_interval:
+			self.last_fsync = time.time()
+			self.run(self.fsync)
+
+	def write(self,data):
+		"""
+		Add the data after the previously written data
+		Arguments:
+			data : Data of the segment (bytes or memoryview)
+		"""
+		self.write_at(self.buffer_offset + len(self.buffer) - self.base_offset,data)
+
+	def write_at(self,offset,data):
+		"""
+		Write the data at the given offset from the start of the transfer
+		Arguments:
+			offset 	: Offset of the data in the transferred file (sequence_number*MSS)
+			data 	: Data of the segment (bytes or memoryview)
+		"""
+		offset += self.base_offset
+
+		# Data that does not continue the buffer starts a new buffer
+		if offset != self.buffer_offset + len(self.buffer):
+			if not self.random_access:
+				raise ValueError("Write Error: Appending writer can only write at offset " + str(self.buffer_offset + len(self.buffer) - self.base_offset))
+			self.flush()
+			self.buffer_offset = offset
+
+		self.buffer += data
+
+		# Writing when the buffer is full
+		if len(self.buffer) >= self.buffer_size:
+			self.flush(aligned=True)
+
+	def run(self,function,*args):
+		"""
+		Do a file operation after the writes already done or queued, on the thread of the write stage if there is one
+		Arguments:
+			function 	: Function doing the operation
+			args 		: Its arguments
+		"""
+		if self.write_stage is None:
+			function(*args)
+		else:
+			self.write_stage.submit(function,*args)
+
+	def fsync(self):
+		"""
+		Force the written data to disk
+		"""
+		os.fsync(self.file.fileno())
+		self.fsync_calls += 1
+		self.last_fsync = time.time()
+
+	def close(self):
+		"""
+		Write the remaining data and close the file, after the queued operations with a write stage
+		"""
+		self.flush()
+		self.run(self.close_file)
+		if self.write_stage is not None:
+			self.write_stage.wait()
+
+	def close_file(self):
+		"""
+		Force the data to disk if the fsync policy asks for it and close the file
+		"""
+		if self.fsync_policy != 'none':
+			self.fsync()
+		self.file.close()
@@ -0,0 +1,14 @@
+import random
+
+def discard_packet(p):
+	"""
+	probabilistic loss service to discard packet
+	p 	: probability of packet failure
+	"""
+	r = round(random.random(),2) #Getting a random value r
+	# If random value is 0, re calculate the random value
+	while r == 0.0:
+		r = round(random.random(),2)
+
+	# Returns True if the random value is less or equal to p
+	return r<=p
@@ -0,0 +1,135 @@
+import time
+
+# Waits shorter than this are spun instead of slept, as a sleep can overshoot by about this much
+SPIN_THRESHOLD = 0.0002
+
+# Rate above the window per round trip when pacing from the window, so the window can still grow (as in Linux)
+PACING_GAIN = 1.25
+
+# Rate suffixes of --rate, in bits per second
+RATE_UNITS = {'': 1, 'K': 1e3, 'M': 1e6, 'G': 1e9}
+
+def parse_rate(rate):
+	"""
+	Convert a rate such as 200M (bits per second, with an optional K, M or G suffix) to bytes per second
+	Arguments:
+		rate : Rate string from the command line
+	"""
+	rate = rate.strip().upper()
+	if rate.endswith('BPS'):
+		rate = rate[:-3]
+	unit = rate[-1:] if rate[-1:] in RATE_UNITS else ''
+	value = float(rate[:len(rate) - len(unit)])
+	if value <= 0:
+		raise ValueError("Rate Error: Invalid rate " + rate)
+	return value*RATE_UNITS[unit]/8
+
+class Pacer:
+	"""
+	Token bucket spacing the packets evenly instead of sending each window as a burst.
+	Tokens (bytes) accumulate at the pacing rate up to a bucket of SPIN_THRESHOLD worth of data (at least one packet),
+	and a packet is sent when its size in tokens is available. The rate is the bandwidth cap, or with
+	pacing from the window PACING_GAIN * window / SRTT, limited by the cap.
+	Retransmissions are sent at once but take their tokens, so the cap holds on average.
+	"""
+
+	def __init__(self,packet_size,rate=None,window_pacing=False):
+		"""
+		Arguments:
+			packet_size 	: Bytes of a full packet (MSS and header)
+			rate 			: Bandwidth cap in bytes per second (None for no cap)
+			window_pacing 	: Also pace at the window per smoothed round trip time
+		"""
+		self.packet_size = packet_size
+		self.max_rate = rate
+		self.window_pacing = window_pacing
+		self.enabled = rate is not None or window_pacing
+
+		# Current rate in bytes per second, None while it is unknown (no RTT sample yet and no cap)
+		self.rate = rate
+
+		# Tokens in bytes (negative after retransmissions), and the time they were last added
+		self.tokens = packet_size
+		self.last_time = time.time()
+
+		# Counters of the waits, to see how much the sending is paced
+		self.sleeps = 0
+		self.spins = 0
+		self.bytes_sent = 0
+
+	def set_window(self,window,srtt):
+		"""
+		Update the pacing rate from the window and the round trip time
+		Arguments:
+			window 	: Window in packets
+			srtt 	: Smoothed round trip time in seconds (None before the first sample)
+		"""
+		if not self.window_pacing or not srtt:
+			return
+		rate = PACING_GAIN*window*self.packet_size/srtt
+		self.rate = rate if self.max_rate is None else min(rate,self.max_rate)
+
+	def refill(self,now):
+		"""
+		Add the tokens accumulated since the last refill
+		Arguments:
+			now : Current time.time() value
+		"""
+		bucket = max(self.packet_size,self.rate*SPIN_THRESHOLD)
+		self.tokens = min(bucket,self.tokens + (now - self.last_time)*self.rate)
+		self.last_time = now
+
+	def delay(self):
+		"""
+		Seconds to wait before the next packet can be sent (0 if it can be sent now)
+		"""
+		if self.rate is None:
+			return 0
+		self.refill(time.time())
+		if self.tokens >= self.packet_size:
+			return 0
+		return (self.packet_size - self.tokens)/self.rate
+
+	def spin(self,delay):
+		"""
+		Busy wait for a delay too short to sleep precisely
+		Arguments:
+			delay : Seconds to wait
+		"""
+		if delay <= 0:
+			return
+		self.spins += 1
+		end = time.perf_counter() + delay
+		while time.perf_counter() < end:
+			pass
+
+	def on_sleep(self):
+		"""
+		Count a wait that was slept, on the sending thread's condition so acknowledgements are still processed
+		"""
+		self.sleeps += 1
+
+	def consume(self,size=None):
+		"""
+		Take the tokens of a sent packet
+		Arguments:
+			size : Bytes of the packet (a full packet if None)
+		"""
+		if not self.enabled:
+			return
+		size = self.packet_size if size is None else size
+		self.bytes_sent += size
+		if self.rate is not None:
+			self.refill(time.time())
+			self.tokens -= size
+
+	def stats(self):
+		"""
+		Current state of the pacer
+		"""
+		return {
+			'rate': self.rate,
+			'sleeps': self.sleeps,
+			'spins': self.spins,
+			'bytes_sent': self.bytes_sent,
+		}
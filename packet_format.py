@@ -0,0 +1,162 @@
+import struct
+
+# Field Value for the Data Packet and the Acknowledged Packet
+DATA_PACKET_FIELD = int('0101010101010101',2)
+ACK_PACKET_FIELD = int('1010101010101010',2)
+
+# Field Value for the Selective Acknowledgement Packet: cumulative ACK in the sequence number field,
+# followed by up to MAX_SACK_RANGES ranges of packets received above it
+SACK_PACKET_FIELD = int('1100110011001100',2)
+MAX_SACK_RANGES = 32
+
+# Field Value for the Negative Acknowledgement Packet: cumulative ACK in the sequence number field,
+# followed by up to MAX_SACK_RANGES ranges of packets missing above it (in the same format as the SACK ranges)
+NAK_PACKET_FIELD = int('0011001100110011',2)
+
+# Field Value for the Stripe Packet: announces one byte range of a striped transfer before its data, the Server echoes it back
+STRIPE_PACKET_FIELD = int('1111000011110000',2)
+
+# Stripe count of the echo of a stripe packet the Server does not accept (a Server running several worker processes)
+STRIPE_REJECTED = 0
+
+# field that is all zeroes
+ZERO = 0
+
+# Binary header: 32-bit Sequence Number, 16-bit Checksum, 16-bit Packet Field (network byte order, 8 bytes)
+HEADER = struct.Struct('!IHH')
+HEADER_SIZE = HEADER.size
+
+# Largest UDP payload over IPv4 (65535 bytes less the IP and UDP headers), and the largest MSS that fits in it
+MAX_DATAGRAM_SIZE = 65507
+MAX_MSS = MAX_DATAGRAM_SIZE - HEADER_SIZE
+
+# SACK range: first and one past the last Sequence Number of a run of received packets
+SACK_RANGE = struct.Struct('!II')
+
+# Stripe: 32-bit token of the striped transfer, 32-bit index and count of the stripes, 64-bit byte offset of the stripe in the file
+STRIPE = struct.Struct('!IIIQ')
+
+# Payload of the last packet, to identify all the data has been sent
+END_OF_FILE = b'END_OF_FILE'
+
+def make_header(sequence_number,checksum,packet_field):
+	"""
+	Pack the header of a packet
+	Arguments:
+		sequence_number	: Sequence Number of the packet
+		checksum 		: Checksum of the data
+		packet_field 	: Data or Acknowledgement Packet Field Value
+	"""
+	return HEADER.pack(sequence_number,checksum,packet_field)
+
+def make_packet(sequence_number,checksum,data):
+	"""
+	Create a complete data packet by adding the header to the data
+	Arguments:
+		sequence_number	: Sequence Number of the packet
+		checksum 		: Checksum of the data
+		data 			: Data in bytes (or memoryview) to be sent
+	"""
+	return make_header(sequence_number,checksum,DATA_PACKET_FIELD) + data
+
+def make_ack(sequence_number):
+	"""
+	Create an acknowledgement packet for the given sequence number
+	Arguments:
+		sequence_number	: Sequence Number being acknowledged
+	"""
+	return make_header(sequence_number,ZERO,ACK_PACKET_FIELD)
+
+def make_sack(cumulative_ack,ranges):
+	"""
+	Create a selective acknowledgement packet
+	Arguments:
+		cumulative_ack	: Lowest Sequence Number not received, all lower ones are acknowledged
+		ranges 			: List of (start, end) ranges of Sequence Numbers received above cumulative_ack, end excluded
+	"""
+	sack = bytearray(make_header(cumulative_ack,ZERO,SACK_PACKET_FIELD))
+	for start,end in ranges[:MAX_SACK_RANGES]:
+		sack += SACK_RANGE.pack(start,end)
+	return bytes(sack)
+
+def parse_sack(packet):
+	"""
+	Split a selective acknowledgement packet into its cumulative ACK and ranges
+	Arguments:
+		packet 	: Selective acknowledgement packet received from the socket
+	Returns:
+		(cumulative_ack, ranges) where ranges is a list of (start, end) tuples, end excluded
+	"""
+	cumulative_ack = HEADER.unpack_from(packet,0)[0]
+	ranges = [SACK_RANGE.unpack_from(packet,offset) for offset in range(HEADER_SIZE,len(packet) - SACK_RANGE.size + 1,SACK_RANGE.size)]
+	return cumulative_ack, ranges
+
+def make_nak(cumulative_ack,missing_ranges):
+	"""
+	Create a negative acknowledgement packet
+	Arguments:
+		cumulative_ack	: Lowest Sequence Number not received, all lower ones are acknowledged
+		missing_ranges 	: List of (start, end) ranges of Sequence Numbers to retransmit, end excluded
+	"""
+	nak = bytearray(make_header(cumulative_ack,ZERO,NAK_PACKET_FIELD))
+	for start,end in missing_ranges[:MAX_SACK_RANGES]:
+		nak += SACK_RANGE.pack(start,end)
+	return bytes(nak)
+
+def parse_nak(packet):
+	"""
+	Split a negative acknowledgement packet into its cumulative ACK and missing ranges
+	Arguments:
+		packet 	: Negative acknowledgement packet received from the socket
+	Returns:
+		(cumulative_ack, missing_ranges) where missing_ranges is a list of (start, end) tuples, end excluded
+	"""
+	return parse_sack(packet)
+
+def make_stripe(token,stripe_index,stripes,offset):
+	"""
+	Create a stripe packet announcing a byte range of a striped transfer
+	Arguments:
+		token 			: Random number identifying the striped transfer
+		stripe_index 	: Index of the stripe (0 for the first one)
+		stripes 		: Number of stripes of the transfer
+		offset 			: Byte offset of the stripe in the file
+	"""
+	return make_header(ZERO,ZERO,STRIPE_PACKET_FIELD) + STRIPE.pack(token,stripe_index,stripes,offset)
+
+def parse_stripe(packet):
+	"""
+	Get the fields of a stripe packet
+	Arguments:
+		packet 	: Stripe packet received from the socket
+	Returns:
+		(token, stripe_index, stripes, offset)
+	"""
+	return STRIPE.unpack_from(packet,HEADER_SIZE)
+
+def parse_packet(packet):
+	"""
+	Split a received packet into its header fields and data without copying the data
+	Arguments:
+		packet 	: Packet received from the socket
+	Returns:
+		(sequence_number, checksum, packet_field, data) where data is a memoryview of the packet
+	"""
+	sequence_number, checksum, packet_field = HEADER.unpack_from(packet,0)
+	return sequence_number, checksum, packet_field, memoryview(packet)[HEADER_SIZE:]
+
+def sendto_packet(sock,packet,address):
+	"""
+	Send a packet given either as bytes or as a (header, data) pair of buffers.
+	A pair is sent with a single scatter-gather sendmsg so the data is never copied
+	Arguments:
+		sock 	: UDP Socket
+		packet 	: Packet bytes or (header, data) tuple
+		address : (Host Name, Port #) of the receiver
+	"""
+	if isinstance(packet,tuple):
+		# sendmsg is not available on every platform, join the buffers instead
+		if not hasattr(sock,'sendmsg'):
+			return sock.sendto(b''.join(packet),address)
+		return sock.sendmsg(packet,(),0,address)
+	return sock.sendto(packet,address)
@@ -0,0 +1,154 @@
+import math
+import mmap
+import os
+import threading
+
+from packet_format import DATA_PACKET_FIELD, END_OF_FILE, make_header, make_packet
+
+class PacketStream:
+	"""
+	Packets of a file, packetized by a producer thread that stays at most buffer_size packets
+	ahead of the oldest unacknowledged packet. Packets are released once cumulatively acknowledged,
+	so memory is bounded by buffer_size * MSS instead of the file size.
+	With buffer_size None the whole file is packetized up front (the original behaviour).
+	"""
+
+	def __init__(self,file_name,MSS,get_checksum,buffer_size=None,offset=0,length=None):
+		"""
+		Arguments:
+			file_name 		: Input File Path
+			MSS 			: Maximum Segment Size
+			get_checksum 	: Checksum function for the data
+			buffer_size 	: Maximum number of packets held ahead of the expected ACK (None for the whole file)
+			offset 			: Byte offset of the data to send in the file
+			length 			: Number of bytes to send (None for up to the end of the file)
+		"""
+		self.file_name = file_name
+		self.MSS = MSS
+		self.get_checksum = get_checksum
+		self.buffer_size = buffer_size
+
+		# Byte range of the file that is sent (the whole file, or one stripe of a striped transfer)
+		self.offset = offset
+		self.length = os.path.getsize(file_name) - offset if length is None else length
+
+		# Total number of packets: the data packets and the END_OF_FILE packet
+		self.number_of_packets = math.ceil(self.length/MSS) + 1
+
+		# Packets by sequence number, the oldest unacknowledged sequence number and the next one to packetize
+		self.packets = {}
+		self.base = 0
+		self.next_sequence_number = 0
+
+		self.condition = threading.Condition()
+		self.producer = None
+
+	def __len__(self):
+		return self.number_of_packets
+
+	def __getitem__(self,sequence_number):
+		"""
+		Get the packet with the given sequence number, waiting for the producer if it is not packetized yet
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		with self.condition:
+			while sequence_number not in self.packets:
+				if sequence_number < self.base:
+					raise IndexError("Packet " + str(sequence_number) + " is already released")
+				self.condition.wait()
+			return self.packets[sequence_number]
+
+	def read_packet(self,data_file,sequence_number):
+		"""
+		Read the next MSS bytes of the file and create the data packet
+		Arguments:
+			data_file 		: Input File opened in binary mode
+			sequence_number	: Sequence Number of the packet
+		"""
+		data = data_file.read(min(self.MSS,self.length - sequence_number*self.MSS))
+		return make_packet(sequence_number,self.get_checksum(data),data)
+
+	def packetize(self,data_file):
+		"""
+		Create the packets of the file, blocking while the buffer is full
+		Arguments:
+			data_file : Input File opened in binary mode
+		"""
+		for sequence_number in range(self.number_of_packets):
+
+			# Waiting for the window to move if buffer_size packets are already waiting
+			with self.condition:
+				while self.buffer_size is not None and sequence_number - self.base >= self.buffer_size:
+					self.condition.wait()
+
+			# The last packet is the END_OF_FILE packet
+			if sequence_number == self.number_of_packets - 1:
+				packet = make_packet(sequence_number,self.get_checksum(END_OF_FILE),END_OF_FILE)
+			else:
+				packet = self.read_packet(data_file,sequence_number)
+
+			with self.condition:
+				if sequence_number >= self.base:
+					self.packets[sequence_number] = packet
+				self.next_sequence_number = sequence_number + 1
+				self.condition.notify_all()
+
+	def produce(self):
+		"""
+		Producer thread: packetize the complete file
+		"""
+		with open(self.file_name,'rb') as data_file:
+			data_file.seek(self.offset)
+			self.packetize(data_file)
+
+	def start(self):
+		"""
+		Start packetizing the file, in the background if the buffer is bounded else before returning
+		"""
+		if self.buffer_size is None:
+			self.produce()
+		else:
+			self.producer = threading.Thread(target=self.produce,name="Thread: Packetizer",daemon=True)
+			self.producer.start()
+
+	def release(self,ack_expected):
+		"""
+		Drop all the packets that are cumulatively acknowledged
+		Arguments:
+			ack_expected : Expected Value of the Acknowledgement (all lower sequence numbers are acknowledged)
+		"""
+		with self.condition:
+			for sequence_number in range(self.base,min(ack_expected,self.next_sequence_number)):
+				self.packets.pop(sequence_number,None)
+			self.base = max(self.base,ack_expected)
+			self.condition.notify_all()
+
+class MappedPacketStream(PacketStream):
+	"""
+	Packets of a memory-mapped file as (header, data) pairs where data is a memoryview of the mapping.
+	The data is never copied: it is sent with sendto_packet straight from the page cache, and
+	retransmissions send the same pages again
+	"""
+
+	def packetize(self,data_file):
+		"""
+		Map the file and create the packets, blocking while the buffer is full
+		Arguments:
+			data_file : Input File opened in binary mode
+		"""
+		# An empty file can not be mapped, it only has the END_OF_FILE packet
+		if self.number_of_packets > 1:
+			self.mapped_file = memoryview(mmap.mmap(data_file.fileno(),0,access=mmap.ACCESS_READ))
+		PacketStream.packetize(self,data_file)
+
+	def read_packet(self,data_file,sequence_number):
+		"""
+		Create the header and the data view of the packet
+		Arguments:
+			data_file 		: Input File opened in binary mode (unused, the data comes from the mapping)
+			sequence_number	: Sequence Number of the packet
+		"""
+		start = self.offset + sequence_number*self.MSS
+		data = self.mapped_file[start:min(start + self.MSS,self.offset + self.length)]
+		return (make_header(sequence_number,self.get_checksum(data),DATA_PACKET_FIELD),data)
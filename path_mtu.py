@@ -0,0 +1,75 @@
+import errno
+import socket
+import sys
+import time
+
+from packet_format import HEADER_SIZE, MAX_MSS
+
+# Linux socket options of the path MTU discovery, not exposed by the socket module on every version
+IP_MTU_DISCOVER = getattr(socket,'IP_MTU_DISCOVER',10)
+IP_PMTUDISC_DO = getattr(socket,'IP_PMTUDISC_DO',2)
+IP_MTU = getattr(socket,'IP_MTU',14)
+
+# Bytes of the IPv4 and UDP headers in front of each packet
+IP_UDP_HEADER_SIZE = 20 + 8
+
+# Number of probes, and seconds to wait after each one for an ICMP "fragmentation needed" from the path
+PROBES = 8
+PROBE_WAIT = 0.2
+
+def path_mtu_supported():
+	"""
+	Check if the path MTU can be read from the socket (Linux)
+	"""
+	return sys.platform.startswith('linux')
+
+def mss_for_mtu(mtu):
+	"""
+	Largest MSS whose packets fit in the given MTU without IP fragmentation
+	Arguments:
+		mtu : Path MTU in bytes
+	"""
+	return min(MAX_MSS,mtu - IP_UDP_HEADER_SIZE - HEADER_SIZE)
+
+def discover_mss(server_host_name,server_port):
+	"""
+	Find the largest MSS that is not fragmented on the path to the Server: datagrams of the path MTU
+	are sent with the Don't Fragment bit, and the kernel lowers the path MTU when a router on the path
+	answers with an ICMP "fragmentation needed" (or refuses to send a datagram above the known path MTU)
+	until a probe goes through. The probes are all zeroes, which the Server ignores
+	Arguments:
+		server_host_name	: Host Name of the Server
+		server_port			: Post # of the Server
+	Returns:
+		(path MTU, MSS), or None if the platform does not support it
+	"""
+	if not path_mtu_supported():
+		return None
+
+	probe_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+	try:
+		# Don't Fragment bit on every datagram, the path MTU is then tracked by the kernel
+		probe_socket.setsockopt(socket.IPPROTO_IP,IP_MTU_DISCOVER,IP_PMTUDISC_DO)
+		probe_socket.connect((server_host_name,server_port))
+		mtu = probe_socket.getsockopt(socket.IPPROTO_IP,IP_MTU)
+
+		for probe in range(PROBES):
+			try:
+				probe_socket.send(bytes(min(mtu - IP_UDP_HEADER_SIZE,HEADER_SIZE + MAX_MSS)))
+			except OSError as error:
+				# The datagram is larger than the path MTU known to the kernel, which has lowered it
+				if error.errno != errno.EMSGSIZE:
+					raise
+				mtu = probe_socket.getsockopt(socket.IPPROTO_IP,IP_MTU)
+				continue
+
+			# Waiting for an ICMP "fragmentation needed" to lower the path MTU, the probe went through if it does not change
+			time.sleep(PROBE_WAIT)
+			path_mtu = probe_socket.getsockopt(socket.IPPROTO_IP,IP_MTU)
+			if path_mtu == mtu:
+				break
+			mtu = path_mtu
+	finally:
+		probe_socket.close()
+
+	return mtu, mss_for_mtu(mtu)
@@ -0,0 +1,215 @@
+import os
+
+# Bytes preallocated at a time ahead of the highest written offset (8 MiB)
+PREALLOCATE_SIZE = 8 << 20
+
+def allocate(fd,offset,size):
+	"""
+	Reserve space in a file with os.posix_fallocate, the file grows as it is written if the file system can not
+	Arguments:
+		fd 		: File descriptor
+		offset 	: Start of the space
+		size 	: Bytes of the space
+	"""
+	try:
+		os.posix_fallocate(fd,offset,size)
+	except OSError:
+		pass
+
+class Reassembler:
+	"""
+	Selective Repeat reassembly that writes each accepted segment straight to its final offset
+	(sequence_number*MSS) in the output file. Only a bitmap of the packets received after the
+	first missing one is kept, so memory is bounded by the window instead of the file size.
+	"""
+
+	def __init__(self,writer,preallocation=True):
+		"""
+		Arguments:
+			writer 			: FileWriter opened with use_pwrite, the output file
+			preallocation 	: Reserve the space ahead of the written data, and cut it when closing
+							  (off when other transfers write further in the same file, e.g. the other stripes)
+		"""
+		self.writer = writer
+		self.preallocation = preallocation
+
+		# Lowest sequence number not received yet, and bitmap of the received packets from there (bit i = base + i)
+		self.base = 0
+		self.bitmap = 0
+
+		# Sequence number of the END_OF_FILE packet, once it is received
+		self.last_seq_no = None
+
+		# Size of the data packets: all but the last data packet are MSS bytes.
+		# Until two different data packets are received it is unknown, and a packet other
+		# than the first one waits in pending_segment
+		self.segment_size = None
+		self.first_segment_size = None
+		self.pending_segment = None
+
+		# Bytes of a pending segment discarded by close, as its offset was still unknown
+		self.discarded_bytes = 0
+
+		# End of the data in the file and end of the preallocated space
+		self.file_size = 0
+		self.allocated_size = 0
+
+	def is_received(self,sequence_number):
+		"""
+		Check if the packet with the given sequence number is already received
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		if sequence_number < self.base:
+			return True
+		return (self.bitmap >> (sequence_number - self.base)) & 1 == 1
+
+	def mark_received(self,sequence_number):
+		"""
+		Set the bit of the packet and move the base past all the received packets
+		Arguments:
+			sequence_number : Sequence Number of the packet
+		"""
+		self.bitmap |= 1 << (sequence_number - self.base)
+
+		# Number of trailing ones is the number of packets received in order from the base
+		received_in_order = (~self.bitmap & (self.bitmap + 1)).bit_length() - 1
+		self.bitmap >>= received_in_order
+		self.base += received_in_order
+
+	def sack_ranges(self,max_ranges):
+		"""
+		Ranges of the packets received above the base, for a selective acknowledgement
+		Arguments:
+			max_ranges : Maximum number of ranges to return, the lowest ones are returned
+		Returns:
+			List of (start, end) ranges of Sequence Numbers, end excluded
+		"""
+		ranges = []
+		bitmap = self.bitmap
+		position = self.base
+		while bitmap and len(ranges) < max_ranges:
+			# Skipping the missing packets to the next received one
+			missing = (bitmap & -bitmap).bit_length() - 1
+			bitmap >>= missing
+			position += missing
+			# Counting the received packets in the run
+			received = (~bitmap & (bitmap + 1)).bit_length() - 1
+			ranges.append((position,position + received))
+			bitmap >>= received
+			position += received
+		return ranges
+
+	def missing_ranges(self,max_ranges):
+		"""
+		Ranges of the packets missing between the base and the highest received packet, for a negative acknowledgement
+		Arguments:
+			max_ranges : Maximum number of ranges to return, the lowest ones are returned
+		Returns:
+			List of (start, end) ranges of Sequence Numbers, end excluded
+		"""
+		ranges = []
+		bitmap = self.bitmap
+		position = self.base
+		while bitmap and len(ranges) < max_ranges:
+			# Run of missing packets up to the next received one
+			missing = (bitmap & -bitmap).bit_length() - 1
+			ranges.append((position,position + missing))
+			bitmap >>= missing
+			position += missing
+			# Skipping the received packets in the run
+			received = (~bitmap & (bitmap + 1)).bit_length() - 1
+			bitmap >>= received
+			position += received
+		return ranges
+
+	def highest_received(self):
+		"""
+		Sequence Number of the highest received packet (base - 1 if there is no gap)
+		"""
+		return self.base + self.bitmap.bit_length() - 1
+
+	def preallocate(self,end):
+		"""
+		Reserve space in the file up to at least the given offset, PREALLOCATE_SIZE bytes at a time
+		Arguments:
+			end : Offset from the start of the transfer that will be written
+		"""
+		if not self.preallocation or end <= self.allocated_size:
+			return
+		self.allocated_size = end + PREALLOCATE_SIZE
+		# os.posix_fallocate is not available on every platform, the file then grows as it is written
+		if hasattr(os,'posix_fallocate'):
+			self.writer.run(allocate,self.writer.file.fileno(),self.writer.base_offset,self.allocated_size)
+
+	def write_segment(self,sequence_number,data):
+		"""
+		Write the data of the packet at sequence_number*MSS
+		Arguments:
+			sequence_number	: Sequence Number of the packet
+			data 			: Data of the packet
+		"""
+		offset = sequence_number*self.segment_size if sequence_number else 0
+		self.preallocate(offset + len(data))
+		self.writer.write_at(offset,data)
+		self.file_size = max(self.file_size,offset + len(data))
+
+	def add(self,sequence_number,data):
+		"""
+		Accept a data packet
+		Arguments:
+			sequence_number	: Sequence Number of the packet
+			data 			: Data of the packet
+		"""
+		self.mark_received(sequence_number)
+
+		if self.segment_size is None:
+			if self.first_segment_size is not None:
+				# Of two different data packets at most one is the last one, so the larger is the MSS
+				self.segment_size = max(self.first_segment_size,len(data))
+			else:
+				self.first_segment_size = len(data)
+				# The first packet is always at offset 0, any other waits for the MSS
+				# (copied, as the received packet buffer may be reused)
+				if sequence_number != 0:
+					self.pending_segment = (sequence_number,bytes(data))
+					return
+
+		if self.pending_segment is not None:
+			self.write_segment(*self.pending_segment)
+			self.pending_segment = None
+		self.write_segment(sequence_number,data)
+
+	def end_of_file(self,sequence_number):
+		"""
+		Accept the END_OF_FILE packet
+		Arguments:
+			sequence_number	: Sequence Number of the END_OF_FILE packet
+		"""
+		self.mark_received(sequence_number)
+		self.last_seq_no = sequence_number
+
+	def complete(self):
+		"""
+		Check if all the packets up to END_OF_FILE are received
+		"""
+		return self.last_seq_no is not None and self.base > self.last_seq_no
+
+	def close(self):
+		"""
+		Write the remaining data, cut the preallocated space and close the output file.
+		A segment still pending is written if it is not the last data packet (so it has MSS bytes),
+		otherwise its offset is unknown and it is discarded, counted in discarded_bytes
+		"""
+		if self.pending_segment is not None:
+			sequence_number, data = self.pending_segment
+			self.pending_segment = None
+			if self.last_seq_no is not None and sequence_number < self.last_seq_no - 1:
+				self.segment_size = len(data)
+				self.write_segment(sequence_number,data)
+			else:
+				self.discarded_bytes += len(data)
+		self.writer.flush()
+		if self.allocated_size > self.file_size:
+			self.writer.run(os.ftruncate,self.writer.file.fileno(),self.writer.base_offset + self.file_size)
+		self.writer.close()
@@ -0,0 +1,275 @@
+import queue
+import socket
+import threading
+
+from udp_offload import DatagramReceiver
+
+# Batches of datagrams held by each queue between the receive stages, and buffers held by the queue of the write stage
+PIPELINE_DEPTH = 8
+WRITE_DEPTH = 8
+
+# Seconds the drain thread waits on the socket or on a full queue before checking if the pipeline is stopped
+DRAIN_TIMEOUT = 0.1
+
+# Seconds a thread may hold the GIL while another one waits for it (5 ms by default). The Servers lower it to this
+# with --pipeline (sys.setswitchinterval in their main, it is process wide) so the drain thread reads the socket
+# soon after a datagram arrives instead of waiting for the protocol or verify thread to yield
+SWITCH_INTERVAL = 0.0005
+
+class StageQueue:
+	"""
+	Bounded queue between two stages of the pipeline. A full queue blocks the stage putting into it (backpressure),
+	and the counters show where the pipeline waits: a queue that is often full feeds a stage that is too slow,
+	a queue that is always empty is fed by one
+	"""
+
+	def __init__(self,name,depth):
+		"""
+		Arguments:
+			name 	: Name of the queue in the statistics
+			depth 	: Largest number of items in the queue
+		"""
+		self.name = name
+		self.depth = depth
+		self.queue = queue.Queue(depth)
+
+		# Items put in the queue, the most items seen in it, and the puts that found it full and waited
+		self.items = 0
+		self.max_depth = 0
+		self.full = 0
+
+	def put(self,item,running=None):
+		"""
+		Put an item, waiting while the queue is full
+		Arguments:
+			item 	: Item to put
+			running : Function checked every DRAIN_TIMEOUT seconds while waiting, the item is dropped when it returns False
+		Returns:
+			True if the item was put
+		"""
+		try:
+			self.queue.put_nowait(item)
+		except queue.Full:
+			self.full += 1
+			while True:
+				try:
+					self.queue.put(item,timeout=DRAIN_TIMEOUT)
+					break
+				except queue.Full:
+					if running is not None and not running():
+						return False
+		self.items += 1
+		self.max_depth = max(self.max_depth,self.queue.qsize())
+		return True
+
+	def get(self,timeout=None):
+		"""
+		Next item, raises queue.Empty if there is none after the timeout
+		Arguments:
+			timeout : Seconds to wait (None to wait until there is one)
+		"""
+		return self.queue.get(timeout=timeout)
+
+	def stats(self):
+		"""
+		Current state of the queue
+		"""
+		return {
+			'name': self.name,
+			'depth': self.queue.qsize(),
+			'capacity': self.depth,
+			'max_depth': self.max_depth,
+			'full': self.full,
+			'items': self.items,
+		}
+
+class WriteStage:
+	"""
+	Thread doing the file operations of the FileWriters (writes, fsyncs, truncation, close) in the order they are submitted,
+	so the disk work of a transfer does not stop the Server from receiving. A FileWriter hands over each full buffer
+	instead of writing it, and waits for the queued operations when it is closed
+	"""
+
+	def __init__(self,depth=WRITE_DEPTH):
+		"""
+		Arguments:
+			depth : Operations (each up to one write buffer of data) waiting for the thread before the FileWriters block
+		"""
+		self.operations = StageQueue('write',depth)
+
+		# First error of a file operation, raised again in the thread submitting the next one
+		self.error = None
+
+		self.thread = threading.Thread(target=self.run,name='write-stage',daemon=True)
+		self.thread.start()
+
+	def submit(self,function,*args):
+		"""
+		Queue a file operation after the ones already submitted
+		Arguments:
+			function 	: Function doing the operation
+			args 		: Its arguments
+		"""
+		if self.error is not None:
+			raise self.error
+		self.operations.put((function,args),self.thread.is_alive)
+
+	def run(self):
+		"""
+		Do the submitted operations until a None is submitted
+		"""
+		while True:
+			operation = self.operations.get()
+			try:
+				if operation is None:
+					return
+				function, args = operation
+				if self.error is None:
+					function(*args)
+			except BaseException as error:
+				self.error = error
+			finally:
+				self.operations.queue.task_done()
+
+	def wait(self):
+		"""
+		Wait until the submitted operations are done
+		"""
+		self.operations.queue.join()
+		if self.error is not None:
+			raise self.error
+
+	def stop(self):
+		"""
+		Finish the submitted operations and end the thread
+		"""
+		self.operations.put(None,self.thread.is_alive)
+		self.thread.join()
+
+class ReceivePipeline:
+	"""
+	Receiver split into stages on separate threads connected by bounded queues: a drain thread reads the datagrams
+	from the socket as they arrive (a recvmmsg batch, the segments of a GRO buffer or a single datagram at a time),
+	a verify thread computes the checksum of each one, and the Server's loop takes the verified datagrams in the order
+	they were received, runs the protocol (loss service, acknowledgements) and hands the data to the FileWriters,
+	whose writes are done by the write stage. The socket is read while the other stages work, so the kernel receive buffer
+	does not overflow during a checksum or a write, and a slow stage fills the queue in front of it up to the drain thread.
+	The receive ring holds every batch that can be in the queues or in the stages
+	"""
+
+	def __init__(self,sock,receive_size,verify,gro=False,batch=False,depth=PIPELINE_DEPTH,write_depth=WRITE_DEPTH):
+		"""
+		Arguments:
+			sock 			: UDP Socket of the Server
+			receive_size 	: Receive buffer size without GRO (a larger datagram is truncated to it)
+			verify 			: Function of a datagram giving the result of its verification, passed with it to the Server's loop
+			gro 			: Enable UDP_GRO on the socket if the kernel supports it
+			batch 			: Receive the waiting datagrams with recvmmsg if the platform supports it
+			depth 			: Batches of datagrams held by each queue between the receive stages
+			write_depth 	: Operations held by the queue of the write stage
+		"""
+		# Reads in the two queues, in the drain and verify threads, with the Server's loop and the one being received
+		self.receiver = DatagramReceiver(sock,receive_size,gro,batch,2*depth + 4)
+		self.verify = verify
+		self.received = StageQueue('received',depth)
+		self.verified = StageQueue('verified',depth)
+		self.write_stage = WriteStage(write_depth)
+
+		# Verified datagrams of the last batch not yet taken by the Server's loop
+		self.ready = []
+		self.ready_index = 0
+
+		# Error of the drain or verify thread, raised again in the Server's loop
+		self.error = None
+
+		# The drain thread checks regularly if the pipeline is stopped
+		sock.settimeout(DRAIN_TIMEOUT)
+		self.stopped = threading.Event()
+		self.threads = [
+			threading.Thread(target=self.drain,name='drain-stage',daemon=True),
+			threading.Thread(target=self.verify_batches,name='verify-stage',daemon=True),
+		]
+		for thread in self.threads:
+			thread.start()
+
+	def running(self):
+		"""
+		Check if the pipeline is not stopped
+		"""
+		return not self.stopped.is_set()
+
+	def drain(self):
+		"""
+		Drain thread: read the datagrams from the socket until the pipeline is stopped
+		"""
+		try:
+			while self.running():
+				try:
+					datagrams = self.receiver.receive_batch()
+				except socket.timeout:
+					continue
+				self.received.put(datagrams,self.running)
+		except BaseException as error:
+			self.error = error
+		finally:
+			self.received.put(None,self.running)
+
+	def verify_batches(self):
+		"""
+		Verify thread: verify each received datagram and pass it on with the result
+		"""
+		verify = self.verify
+		try:
+			while True:
+				try:
+					datagrams = self.received.get(DRAIN_TIMEOUT)
+				except queue.Empty:
+					if self.running():
+						continue
+					break
+				if datagrams is None:
+					break
+				self.verified.put([(packet,address,verify(packet)) for packet, address in datagrams],self.running)
+		except BaseException as error:
+			self.error = error
+		finally:
+			self.verified.put(None,self.running)
+
+	def receive(self,timeout=None):
+		"""
+		Next verified datagram, in the order the datagrams were received
+		Arguments:
+			timeout : Seconds to wait for one (None to wait until there is one), socket.timeout is raised after it
+		Returns:
+			(datagram, address, result of verify)
+		"""
+		if self.ready_index >= len(self.ready):
+			try:
+				datagrams = self.verified.get(timeout)
+			except queue.Empty:
+				raise socket.timeout("timed out")
+			if datagrams is None:
+				raise self.error if self.error is not None else OSError("Pipeline Error: The receive stages stopped")
+			self.ready = datagrams
+			self.ready_index = 0
+		datagram = self.ready[self.ready_index]
+		self.ready_index += 1
+		return datagram
+
+	def stop(self):
+		"""
+		Stop the receive stages and finish the file operations, before the socket is closed
+		"""
+		self.stopped.set()
+		for thread in self.threads:
+			thread.join()
+		self.write_stage.stop()
+
+	def stats(self):
+		"""
+		State of the queues in front of the verify stage, the Server's loop and the write stage, and of the socket reads
+		"""
+		return {
+			'queues': [self.received.stats(),self.verified.stats(),self.write_stage.operations.stats()],
+			'receiver': self.receiver.stats(),
+		}
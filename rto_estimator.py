@@ -0,0 +1,144 @@
+import collections
+import threading
+
+# Gains of the smoothed RTT and RTT variation (RFC 6298)
+ALPHA = 1/8
+BETA = 1/4
+K = 4
+
+# Clock granularity, and the bounds of the retransmission timeout in seconds
+CLOCK_GRANULARITY = 0.001
+MIN_RTO = 0.01
+MAX_RTO = 60
+
+# Number of recent RTT samples kept for tuning
+SAMPLES_KEPT = 1000
+
+class RTOEstimator:
+	"""
+	Retransmission timeout computed from the measured round trip times (RFC 6298):
+	smoothed RTT and RTT variation, exponential backoff on timeout, and Karn's rule
+	(no samples from retransmitted packets, so an ACK is never matched with the wrong send).
+	As in Linux, the backoff is also cleared when new packets are acknowledged, otherwise a sender
+	that only retransmits (Go-back-N after a timeout) never gets a sample to end it.
+	"""
+
+	def __init__(self,initial_rto,adaptive=True,min_rto=MIN_RTO,max_rto=MAX_RTO):
+		"""
+		Arguments:
+			initial_rto : Timeout before the first RTT sample (and the fixed timeout if not adaptive)
+			adaptive 	: Update the timeout from the RTT samples
+			min_rto 	: Lowest timeout in seconds
+			max_rto 	: Highest timeout in seconds, also the limit of the backoff
+		"""
+		self.adaptive = adaptive
+		self.min_rto = min_rto
+		self.max_rto = max_rto
+
+		self.rto = initial_rto
+		self.srtt = None
+		self.rttvar = None
+
+		# Timeout computed from the RTT estimate, without the backoff
+		self.estimated_rto = initial_rto
+
+		# Recent RTT samples and the number of timeouts, for tuning
+		self.samples = collections.deque(maxlen=SAMPLES_KEPT)
+		self.timeouts = 0
+
+		# Sequence numbers that were retransmitted and can not give an RTT sample (Karn's rule)
+		self.retransmitted = set()
+
+		self.lock = threading.Lock()
+
+	def sample(self,rtt):
+		"""
+		Update the timeout with a new RTT measurement
+		Arguments:
+			rtt : Seconds between sending a packet and receiving its acknowledgement
+		"""
+		with self.lock:
+			self.samples.append(rtt)
+			if not self.adaptive:
+				return
+
+			if self.srtt is None:
+				self.srtt = rtt
+				self.rttvar = rtt/2
+			else:
+				self.rttvar = (1 - BETA)*self.rttvar + BETA*abs(self.srtt - rtt)
+				self.srtt = (1 - ALPHA)*self.srtt + ALPHA*rtt
+
+			# A new sample also ends any backoff
+			self.estimated_rto = min(self.max_rto,max(self.min_rto,self.srtt + max(CLOCK_GRANULARITY,K*self.rttvar)))
+			self.rto = self.estimated_rto
+
+	def backoff(self):
+		"""
+		Double the timeout after a timeout event
+		"""
+		with self.lock:
+			self.timeouts += 1
+			if self.adaptive:
+				self.rto = min(self.max_rto,self.rto*2)
+
+	def on_retransmit(self,sequence_number):
+		"""
+		Mark a packet as retransmitted, its acknowledgement is ambiguous
+		Arguments:
+			sequence_number : Sequence Number of the retransmitted packet
+		"""
+		self.retransmitted.add(sequence_number)
+
+	def on_ack(self,sequence_number,send_time,ack_time):
+		"""
+		Take an RTT sample from an acknowledged packet unless it was retransmitted
+		Arguments:
+			sequence_number : Sequence Number of the acknowledged packet
+			send_time 		: time.time() value when the packet was sent (None if unknown)
+			ack_time 		: time.time() value when the acknowledgement was received
+		Returns:
+			The RTT sample taken, None if there is none
+		"""
+		return self.on_acks([(sequence_number,send_time)],ack_time)
+
+	def on_acks(self,acknowledged,ack_time):
+		"""
+		Take one RTT sample for packets acknowledged together by a cumulative or selective acknowledgement,
+		from the most recently sent packet that was not retransmitted
+		Arguments:
+			acknowledged 	: List of (Sequence Number, send time or None) of the newly acknowledged packets
+			ack_time 		: time.time() value when the acknowledgement was received
+		Returns:
+			The RTT sample taken, None if there is none
+		"""
+		send_times = []
+		for sequence_number,send_time in acknowledged:
+			if sequence_number in self.retransmitted:
+				self.retransmitted.discard(sequence_number)
+			elif send_time is not None:
+				send_times.append(send_time)
+		if send_times:
+			rtt = ack_time - max(send_times)
+			self.sample(rtt)
+			return rtt
+
+		# Only retransmitted packets acknowledged: no sample, but the path works again so the backoff ends
+		# (back to the initial timeout if there is no sample yet)
+		elif acknowledged and self.adaptive:
+			with self.lock:
+				self.rto = self.estimated_rto
+		return None
+
+	def stats(self):
+		"""
+		Current state of the estimator
+		"""
+		with self.lock:
+			return {
+				'rto': self.rto,
+				'srtt': self.srtt,
+				'rttvar': self.rttvar,
+				'samples': len(self.samples),
+				'timeouts': self.timeouts,
+			}
@@ -0,0 +1,167 @@
+import importlib
+import math
+import multiprocessing
+import os
+import random
+import socket
+import time
+
+from checksum import get_checksum_function
+from packet_format import HEADER, STRIPE_PACKET_FIELD, STRIPE_REJECTED, make_stripe, parse_stripe
+
+# Seconds to wait for the Server to echo a stripe packet, and the number of times it is sent
+STRIPE_TIMEOUT = 0.5
+STRIPE_ATTEMPTS = 10
+
+def split_ranges(file_size,stripes,MSS):
+	"""
+	Split a file into byte ranges of whole segments, one for each stripe
+	Arguments:
+		file_size 	: Size of the file in bytes
+		stripes 	: Number of stripes wanted, fewer are used if the file has fewer segments
+		MSS 		: Maximum Segment Size
+	Returns:
+		List of (offset, length) byte ranges
+	"""
+	segments = math.ceil(file_size/MSS)
+	stripes = max(1,min(stripes,segments))
+
+	ranges = []
+	offset = 0
+	for stripe_index in range(stripes):
+		# The first segments % stripes stripes have one more segment
+		stripe_segments = segments//stripes + (1 if stripe_index < segments % stripes else 0)
+		length = min(stripe_segments*MSS,file_size - offset)
+		ranges.append((offset,length))
+		offset += length
+	return ranges
+
+def announce_stripe(client_socket,server_address,stripe,offset):
+	"""
+	Send the stripe packet until the Server echoes it, the data of the stripe is then sent from the same socket.
+	RuntimeError is raised if the Server rejects the stripe or does not answer
+	Arguments:
+		client_socket 	: Client Socket of the stripe
+		server_address 	: (Host Name, Port #) of the Server
+		stripe 			: (token, stripe index, number of stripes) of the stripe
+		offset 			: Byte offset of the stripe in the file
+	"""
+	token, stripe_index, stripes = stripe
+	stripe_packet = make_stripe(token,stripe_index,stripes,offset)
+
+	client_socket.settimeout(STRIPE_TIMEOUT)
+	try:
+		for attempt in range(STRIPE_ATTEMPTS):
+			client_socket.sendto(stripe_packet,server_address)
+			deadline = time.time() + STRIPE_TIMEOUT
+			while time.time() < deadline:
+				try:
+					reply, serverAddress = client_socket.recvfrom(2048)
+				except socket.timeout:
+					break
+				if len(reply) >= HEADER.size and HEADER.unpack_from(reply,0)[2] == STRIPE_PACKET_FIELD and parse_stripe(reply)[:2] == (token,stripe_index):
+					# The Server echoes the stripe packet with no stripes when it does not accept striped transfers
+					if parse_stripe(reply)[2] == STRIPE_REJECTED:
+						raise RuntimeError("Stripe Error: The Server rejected stripe {} of {}, it runs several worker processes (--workers), striped transfers need a single one".format(stripe_index,stripes))
+					return
+	finally:
+		client_socket.settimeout(None)
+
+	raise RuntimeError("Stripe Error: The Server did not accept stripe {} of {}".format(stripe_index,stripes))
+
+class StripeGroup:
+	"""
+	Stripes of one striped transfer on the Server: the output file they share and how many are received.
+	Each stripe has its own session, which writes at the offset of the stripe in the output file
+	"""
+
+	def __init__(self,key,transfer_id,file_name,stripes,base_offset):
+		"""
+		Arguments:
+			key 		: (Client Host, token) of the striped transfer
+			transfer_id : Number of the transfer on the Server
+			file_name 	: Output File Path of the transfer
+			stripes 	: Number of stripes of the transfer
+			base_offset : File offset of the transfer (the size of the output file when the first stripe arrived)
+		"""
+		self.key = key
+		self.transfer_id = transfer_id
+		self.file_name = file_name
+		self.stripes = stripes
+		self.base_offset = base_offset
+		self.stripes_received = 0
+
+	def on_stripe_received(self):
+		"""
+		Count a received stripe
+		Returns:
+			True if all the stripes of the transfer are received
+		"""
+		self.stripes_received += 1
+		return self.stripes_received == self.stripes
+
+def run_stripe(client_module,checksum,server_host_name,server_port,file_name,N,MSS,options,offset,length,stripe,cwnd_log=None):
+	"""
+	Send one stripe with the Client of the ARQ scheme, in its own process (the Clients keep the transfer in module globals)
+	Arguments:
+		client_module 	: Name of the Client module, Simple_ftp_client or Selective_Repeat_Simple_ftp_client
+		checksum 		: Name of the checksum function
+		server_host_name: Host Name of the Server
+		server_port 	: Port # of the Server
+		file_name 		: Input File Path
+		N 				: Window Size of the stripe
+		MSS 			: Maximum Segment Size
+		options 		: Other arguments of rdt_send (stream, use_mmap, ...)
+		offset 			: Byte offset of the stripe
+		length 			: Number of bytes of the stripe
+		stripe 			: (token, stripe index, number of stripes) of the stripe
+		cwnd_log 		: Path to write the congestion window trajectory of the stripe to, with .stripe<index> appended (None for no log)
+	"""
+	client = importlib.import_module(client_module)
+	client.get_checksum = get_checksum_function(checksum)
+	delay = client.rdt_send(server_host_name,server_port,file_name,N,MSS,*options,offset=offset,length=length,stripe=stripe)
+
+	# Each stripe has its own congestion window, saved in its own file
+	if cwnd_log:
+		client.congestion_control.write_trajectory(stripe_log_name(cwnd_log,stripe[1]))
+	return delay
+
+def stripe_log_name(file_name,stripe_index):
+	"""
+	Path of the congestion window trajectory of one stripe
+	Arguments:
+		file_name 	: Path given with --cwnd-log
+		stripe_index: Index of the stripe
+	"""
+	return "{}.stripe{}".format(file_name,stripe_index)
+
+def send_striped(client_module,checksum,server_host_name,server_port,file_name,N,MSS,stripes,options=(),cwnd_log=None):
+	"""
+	Split the file into byte ranges and send each one over its own socket from a pool of processes,
+	so the packetizing, checksums and sends of the stripes run on several cores and each has its own window
+	Arguments:
+		client_module 	: Name of the Client module, Simple_ftp_client or Selective_Repeat_Simple_ftp_client
+		checksum 		: Name of the checksum function
+		server_host_name: Host Name of the Server
+		server_port 	: Port # of the Server
+		file_name 		: Input File Path
+		N 				: Window Size of each stripe
+		MSS 			: Maximum Segment Size
+		stripes 		: Number of stripes
+		options 		: Other arguments of rdt_send (stream, use_mmap, ...)
+		cwnd_log 		: Path to write the congestion window trajectories to, one file for each stripe with .stripe<index> appended (None for no log)
+	Returns:
+		Seconds taken by the transfer of all the stripes
+	"""
+	begin_time = time.time()
+
+	ranges = split_ranges(os.path.getsize(file_name),stripes,MSS)
+
+	# Random token so the Server can tell this transfer's stripes from others sent from the same host
+	token = random.getrandbits(32)
+
+	# One fresh process for each stripe
+	with multiprocessing.Pool(len(ranges),maxtasksperchild=1) as pool:
+		pool.starmap(run_stripe,[(client_module,checksum,server_host_name,server_port,file_name,N,MSS,options,offset,length,(token,stripe_index,len(ranges)),cwnd_log) for stripe_index,(offset,length) in enumerate(ranges)],chunksize=1)
+
+	return time.time() - begin_time
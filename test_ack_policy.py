@@ -0,0 +1,44 @@
+import unittest
+
+from ack_policy import AckPolicy
+
+class AckPolicyTest(unittest.TestCase):
+
+	def test_every_packet(self):
+		policy = AckPolicy()
+		self.assertTrue(policy.on_packet(10.0))
+
+	def test_ack_every(self):
+		policy = AckPolicy(ack_every=3,ack_delay=1)
+		self.assertFalse(policy.on_packet(10.0))
+		self.assertFalse(policy.on_packet(10.1))
+		self.assertTrue(policy.on_packet(10.2))
+		policy.on_ack_sent()
+		self.assertIsNone(policy.time_to_ack(10.3))
+		self.assertFalse(policy.on_packet(10.4))
+
+	def test_delay_from_first_unacknowledged_packet(self):
+		policy = AckPolicy(ack_every=8,ack_delay=0.5)
+		policy.on_packet(10.0)
+		policy.on_packet(10.25)
+		self.assertEqual(policy.time_to_ack(10.25),0.25)
+		self.assertFalse(policy.due(10.25))
+		self.assertTrue(policy.due(10.5))
+		self.assertEqual(policy.time_to_ack(11.0),0)
+		policy.on_ack_sent()
+		self.assertFalse(policy.due(11.0))
+
+	def test_ratio(self):
+		policy = AckPolicy(ack_every=2)
+		self.assertEqual(policy.ratio(),0)
+		for packet in range(4):
+			if policy.on_packet(10.0):
+				policy.on_ack_sent()
+		self.assertEqual(policy.ratio(),0.5)
+
+	def test_invalid_ack_every(self):
+		with self.assertRaises(ValueError):
+			AckPolicy(ack_every=0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import socket
+import tempfile
+import unittest
+
+from async_ftp import ServerProtocol, send_file, serve
+from checksum import get_checksum_function
+from packet_format import make_packet
+
+class AsyncServerTest(unittest.TestCase):
+	"""
+	asyncio Server and senders over loopback
+	"""
+
+	def setUp(self):
+		self.directory = tempfile.TemporaryDirectory()
+		self.addCleanup(self.directory.cleanup)
+		self.get_checksum = get_checksum_function('internet')
+
+	def run_server(self,variant,test,session_timeout=60):
+		"""
+		Run test(port, protocol) on an event loop with a Server on a free port
+		"""
+		async def main():
+			loop = asyncio.get_running_loop()
+			output = os.path.join(self.directory.name,'out_{transfer}')
+			transport, protocol = await loop.create_datagram_endpoint(lambda: ServerProtocol(output,0,variant,False,1024,self.get_checksum,None,session_timeout),local_addr=('127.0.0.1',0))
+			try:
+				return await test(transport.get_extra_info('sockname')[1],protocol)
+			finally:
+				transport.close()
+		return asyncio.run(main())
+
+	def test_transfer(self):
+		input_file = os.path.join(self.directory.name,'input')
+		with open(input_file,'wb') as data_file:
+			data_file.write(os.urandom(50000))
+		for variant in ('gbn','sr'):
+			async def test(port,protocol):
+				await send_file('127.0.0.1',port,input_file,8,1000,variant,self.get_checksum,False,True)
+				return protocol.finished
+			finished = self.run_server(variant,test)
+			with open(finished[0],'rb') as output, open(input_file,'rb') as data_file:
+				self.assertEqual(output.read(),data_file.read())
+			os.unlink(finished[0])
+
+	def test_no_transfer_limit(self):
+		input_file = os.path.join(self.directory.name,'input')
+		with open(input_file,'wb') as data_file:
+			data_file.write(os.urandom(5000))
+		with socket.socket(socket.AF_INET,socket.SOCK_DGRAM) as sock:
+			sock.bind(('127.0.0.1',0))
+			port = sock.getsockname()[1]
+		async def main():
+			# 0 transfers, as on the command line, keeps the Server running after each transfer
+			server = asyncio.ensure_future(serve(port,os.path.join(self.directory.name,'out_{transfer}'),0,transfers=0,get_checksum=self.get_checksum))
+			await asyncio.sleep(0.1)
+			try:
+				for transfer in range(2):
+					await send_file('127.0.0.1',port,input_file,8,1000,'gbn',self.get_checksum,False,True)
+					await asyncio.sleep(0.1)
+					self.assertFalse(server.done())
+			finally:
+				server.cancel()
+		asyncio.run(main())
+		for transfer in range(2):
+			with open(os.path.join(self.directory.name,'out_{}'.format(transfer)),'rb') as output, open(input_file,'rb') as data_file:
+				self.assertEqual(output.read(),data_file.read())
+
+	def test_idle_session_expires(self):
+		async def test(port,protocol):
+			client_socket = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+			client_socket.sendto(make_packet(0,self.get_checksum(b'data'),b'data'),('127.0.0.1',port))
+			client_socket.close()
+			await asyncio.sleep(0.1)
+			self.assertEqual(len(protocol.sessions),1)
+			await asyncio.sleep(0.4)
+			return protocol.sessions
+		self.assertEqual(self.run_server('gbn',test,session_timeout=0.2),{})
+		with open(os.path.join(self.directory.name,'out_0'),'rb') as output:
+			self.assertEqual(output.read(),b'data')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,72 @@
+import mmap
+import os
+import socket
+import tempfile
+import unittest
+
+from batch_io import SEND_BUFFER_SIZE, ReceiveBatch, SendBatch, mmsg_supported
+from packet_format import DATA_PACKET_FIELD, make_header, make_packet
+
+def packet_bytes(packet):
+	"""
+	Bytes of a packet given as bytes or as a (header, data) pair
+	"""
+	if isinstance(packet,tuple):
+		return bytes(packet[0]) + bytes(packet[1])
+	return packet
+
+@unittest.skipUnless(mmsg_supported(),"sendmmsg and recvmmsg are not available")
+class BatchTest(unittest.TestCase):
+	"""
+	sendmmsg and recvmmsg over loopback
+	"""
+
+	def setUp(self):
+		self.receiver = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+		self.receiver.setsockopt(socket.SOL_SOCKET,socket.SO_RCVBUF,1 << 22)
+		self.receiver.bind(('127.0.0.1',0))
+		self.receiver.settimeout(5)
+		self.sender = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+
+	def tearDown(self):
+		self.receiver.close()
+		self.sender.close()
+
+	def test_send_batch(self):
+		# Packets of different sizes, (header, data) pairs with memoryview data, and more than one batch
+		data = memoryview(bytes(range(256))*8)
+		packets = [make_packet(index,index,bytes([index])*(index + 1)) for index in range(100)]
+		packets += [(make_header(index,0,DATA_PACKET_FIELD),data[index:index + 1000]) for index in range(3)]
+		calls = SendBatch(self.receiver.getsockname()).send(self.sender,packets)
+		self.assertEqual(calls,2)
+		self.assertEqual([self.receiver.recv(2048) for packet in packets],[packet_bytes(packet) for packet in packets])
+
+	def test_send_mapped_data_without_copy(self):
+		# Large packets from a read-only mapping: only the headers are copied, and the mapping is released after the call
+		with tempfile.TemporaryFile() as data_file:
+			data_file.write(os.urandom(8*30000))
+			data_file.flush()
+			mapping = mmap.mmap(data_file.fileno(),0,access=mmap.ACCESS_READ)
+			mapped_file = memoryview(mapping)
+			packets = [(make_header(index,0,DATA_PACKET_FIELD),mapped_file[index*30000:(index + 1)*30000]) for index in range(8)]
+			batch = SendBatch(self.receiver.getsockname())
+			batch.send(self.sender,packets)
+			self.assertEqual(len(batch.buffer),SEND_BUFFER_SIZE)
+			self.assertEqual([self.receiver.recv(65535) for packet in packets],[packet_bytes(packet) for packet in packets])
+			del packets
+			mapped_file.release()
+			mapping.close()
+
+	def test_receive_batch(self):
+		packets = [make_packet(index,0,bytes([index])*10) for index in range(10)]
+		for packet in packets:
+			self.sender.sendto(packet,self.receiver.getsockname())
+		batch = ReceiveBatch(2048)
+		received = []
+		while len(received) < len(packets):
+			received.extend(batch.receive(self.receiver))
+		self.assertEqual([bytes(datagram) for datagram, address in received],packets)
+		self.assertEqual(received[0][1],('127.0.0.1',self.sender.getsockname()[1]))
+
+if __name__ == '__main__':
+	unittest.main()
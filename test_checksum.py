@@ -0,0 +1,57 @@
+import random
+import unittest
+import zlib
+
+from checksum import CHECKSUM_FUNCTIONS, crc32_checksum, get_checksum_function, internet_checksum_reference
+
+class ChecksumTest(unittest.TestCase):
+
+	def internet_functions(self):
+		return [(name,function) for name, function in sorted(CHECKSUM_FUNCTIONS.items()) if name.startswith('internet')]
+
+	def check_equivalence(self,data):
+		expected = internet_checksum_reference(data)
+		for name, function in self.internet_functions():
+			with self.subTest(name=name,size=len(data)):
+				self.assertEqual(function(data),expected)
+				self.assertEqual(function(memoryview(data)),expected)
+
+	def test_random_data(self):
+		generator = random.Random(6298)
+		for size in (0,1,2,3,64,1000,1001,65499):
+			self.check_equivalence(bytes(generator.getrandbits(8) for index in range(size)))
+
+	def test_edge_sums(self):
+		# All zero words, a sum of exactly 0xffff, all one words, and sums with many carries
+		self.check_equivalence(bytes(100))
+		self.check_equivalence(b'\xff\xff')
+		self.check_equivalence(b'\xff'*1000)
+		self.check_equivalence(b'\xfe\xff\x01\x00' + b'\xff'*7)
+
+	def test_known_value(self):
+		# Words 0x0201 and 0x0403 sum to 0x0604
+		self.assertEqual(internet_checksum_reference(b'\x01\x02\x03\x04'),~0x0604 & 0xffff)
+
+	def test_crc32(self):
+		crc = zlib.crc32(b'data')
+		self.assertEqual(crc32_checksum(b'data'),(crc >> 16) ^ (crc & 0xffff))
+		self.assertLess(crc32_checksum(bytes(1000)),1 << 16)
+
+	def test_crc32_detection(self):
+		# Swapped words and a 0x0000 word changed to 0xffff leave the Internet checksum unchanged, not the folded CRC
+		for data, corrupted in ((b'\x12\x34\x56\x78',b'\x56\x78\x12\x34'),(b'\x00\x00\x11\x11',b'\xff\xff\x11\x11')):
+			self.assertEqual(internet_checksum_reference(corrupted),internet_checksum_reference(data))
+			self.assertNotEqual(crc32_checksum(corrupted),crc32_checksum(data))
+		# Every single-bit error of a 1500 byte packet is detected
+		data = bytes(1500)
+		for bit in range(len(data)*8):
+			corrupted = bytearray(data)
+			corrupted[bit // 8] ^= 1 << (bit % 8)
+			self.assertNotEqual(crc32_checksum(corrupted),crc32_checksum(data))
+
+	def test_unknown_mode(self):
+		with self.assertRaises(ValueError):
+			get_checksum_function('md5')
+
+if __name__ == '__main__':
+	unittest.main()
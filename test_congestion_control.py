@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from congestion_control import INITIAL_WINDOW, MIN_SSTHRESH, CongestionControl
+
+class CongestionControlTest(unittest.TestCase):
+
+	def test_disabled(self):
+		control = CongestionControl(16,False)
+		control.on_loss(0,10)
+		control.on_timeout(0,10)
+		self.assertEqual(control.window(),16)
+
+	def test_slow_start(self):
+		control = CongestionControl(16)
+		self.assertEqual(control.window(),INITIAL_WINDOW)
+		control.on_ack(1)
+		control.on_ack(2)
+		self.assertEqual(control.window(),4)
+		control.on_ack(100)
+		self.assertEqual(control.window(),16)
+
+	def test_congestion_avoidance(self):
+		# Above the threshold the window grows by one packet per window of acknowledged packets
+		control = CongestionControl(64)
+		control.ssthresh = 8
+		control.on_ack(7)
+		self.assertEqual(control.cwnd,8)
+		control.on_ack(8)
+		self.assertEqual(control.window(),9)
+
+	def test_loss_halves_once_per_window(self):
+		control = CongestionControl(64)
+		control.on_ack(15)
+		control.on_loss(10,16)
+		self.assertEqual(control.cwnd,8)
+		self.assertEqual(control.ssthresh,8)
+
+		# A later loss of a packet sent before the reduction is the same congestion event
+		control.on_loss(12,20)
+		self.assertEqual(control.cwnd,8)
+		control.on_loss(16,24)
+		self.assertEqual(control.cwnd,4)
+		self.assertEqual(control.stats()['losses'],2)
+
+	def test_timeout(self):
+		control = CongestionControl(64)
+		control.on_ack(1)
+		control.on_timeout(0,2)
+		self.assertEqual(control.window(),INITIAL_WINDOW)
+		self.assertEqual(control.ssthresh,MIN_SSTHRESH)
+		self.assertEqual(control.stats()['timeouts'],1)
+
+	def test_trajectory(self):
+		control = CongestionControl(8)
+		control.on_ack(1)
+		control.on_loss(0,2)
+		trajectory_file = tempfile.NamedTemporaryFile(delete=False)
+		trajectory_file.close()
+		self.addCleanup(os.unlink,trajectory_file.name)
+		control.write_trajectory(trajectory_file.name)
+		with open(trajectory_file.name) as trajectory:
+			lines = trajectory.read().splitlines()
+		self.assertEqual(lines[0],"time,cwnd,ssthresh,event")
+		self.assertEqual([line.split(',')[1:] for line in lines[1:]],[['1.000','8.000','start'],['2.000','8.000','ack'],['2.000','2.000','loss']])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,94 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Directory of the Client and Server programs, loss probability of the test Servers and seconds a transfer may take
+PACKAGE = os.path.dirname(os.path.abspath(__file__))
+TEST_LOSS = 0.02
+TRANSFER_TIMEOUT = 60
+
+def free_port():
+	"""
+	Port # of a UDP port free on loopback
+	"""
+	with socket.socket(socket.AF_INET,socket.SOCK_DGRAM) as sock:
+		sock.bind(('127.0.0.1',0))
+		return sock.getsockname()[1]
+
+class LoopbackTest(unittest.TestCase):
+	"""
+	Transfers between the Client and Server programs over loopback, with the loss service of the Server dropping packets
+	"""
+
+	@classmethod
+	def setUpClass(cls):
+		cls.directory = tempfile.TemporaryDirectory()
+		cls.input_file = os.path.join(cls.directory.name,'input')
+		with open(cls.input_file,'wb') as data_file:
+			data_file.write(os.urandom(150000))
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.directory.cleanup()
+
+	def transfer(self,variant,server_args=(),client_args=()):
+		"""
+		Send the input file with the programs of the variant and check the output file
+		Arguments:
+			variant 	: 'gbn' for Go-back-N or 'sr' for Selective Repeat
+			server_args : Options of the Server
+			client_args : Options of the Client
+		"""
+		prefix = 'Selective_Repeat_' if variant == 'sr' else ''
+		port = str(free_port())
+		output_file = os.path.join(self.directory.name,'output')
+		open(output_file,'wb').close()
+		environment = dict(os.environ,TERM='dumb')
+
+		# The Client retransmits until the Server is started
+		server = subprocess.Popen([sys.executable,prefix + 'Simple_ftp_server.py',port,output_file,str(TEST_LOSS)] + list(server_args),cwd=PACKAGE,stdout=subprocess.PIPE,stderr=subprocess.STDOUT,env=environment)
+		try:
+			client = subprocess.run([sys.executable,prefix + 'Simple_ftp_client.py','127.0.0.1',port,self.input_file,'16','1000'] + list(client_args),cwd=PACKAGE,capture_output=True,timeout=TRANSFER_TIMEOUT,env=environment)
+			server_output = server.communicate(timeout=TRANSFER_TIMEOUT)[0]
+		finally:
+			server.kill()
+			server.wait()
+		self.assertEqual(client.returncode,0,client.stderr.decode(errors='replace'))
+		self.assertIn(b'Server Closed',server_output)
+		with open(output_file,'rb') as output, open(self.input_file,'rb') as data_file:
+			self.assertEqual(output.read(),data_file.read())
+
+	def test_go_back_n(self):
+		self.transfer('gbn')
+
+	def test_go_back_n_options(self):
+		self.transfer('gbn',['--sack','--ack-every','4','--pipeline'],['--congestion-control','--stream','--auto-window'])
+		self.transfer('gbn',['--nak','--gro','--write-buffer','4096'],['--pacing','--rate','50M','--mmap','--gso'])
+
+	def test_selective_repeat(self):
+		self.transfer('sr')
+
+	def test_selective_repeat_options(self):
+		self.transfer('sr',['--sack','--ack-every','4','--pipeline'],['--congestion-control','--stream','--auto-window'])
+		self.transfer('sr',['--nak','--gro','--write-buffer','4096'],['--pacing','--rate','50M','--mmap','--gso'])
+
+	def test_striped(self):
+		for variant in ('gbn','sr'):
+			self.transfer(variant,client_args=['--stripes','3'])
+
+	def test_striped_cwnd_log(self):
+		for variant in ('gbn','sr'):
+			cwnd_log = os.path.join(self.directory.name,variant + '.csv')
+			self.transfer(variant,client_args=['--stripes','2','--congestion-control','--cwnd-log',cwnd_log])
+			# One trajectory for each stripe
+			for stripe_index in range(2):
+				with open('{}.stripe{}'.format(cwnd_log,stripe_index)) as trajectory_file:
+					self.assertEqual(trajectory_file.readline(),"time,cwnd,ssthresh,event\n")
+					self.assertTrue(trajectory_file.readline())
+			self.assertFalse(os.path.exists(cwnd_log))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+import pacing
+from pacing import PACING_GAIN, SPIN_THRESHOLD, Pacer, parse_rate
+
+class Clock:
+	"""
+	time.time() replacement moved by the test
+	"""
+
+	def __init__(self):
+		self.now = 1024.0
+
+	def time(self):
+		return self.now
+
+class ParseRateTest(unittest.TestCase):
+
+	def test_units(self):
+		self.assertEqual(parse_rate('800'),100)
+		self.assertEqual(parse_rate('200M'),25e6)
+		self.assertEqual(parse_rate('1gbps'),125e6)
+
+	def test_invalid(self):
+		with self.assertRaises(ValueError):
+			parse_rate('0K')
+
+class PacerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.clock = Clock()
+		patcher = mock.patch.object(pacing,'time',self.clock)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_no_rate(self):
+		pacer = Pacer(1000)
+		pacer.consume()
+		self.assertFalse(pacer.enabled)
+		self.assertEqual(pacer.delay(),0)
+
+	def test_spacing(self):
+		# 1000 byte packets at 1 MB/s: one every millisecond once the first packet's tokens are taken
+		pacer = Pacer(1000,1e6)
+		self.assertEqual(pacer.delay(),0)
+		pacer.consume()
+		self.assertAlmostEqual(pacer.delay(),0.001)
+		self.clock.now += 0.0005
+		self.assertAlmostEqual(pacer.delay(),0.0005)
+		self.clock.now += 0.0005
+		self.assertEqual(pacer.delay(),0)
+
+	def test_bucket(self):
+		# After a long idle time the bucket holds SPIN_THRESHOLD worth of data, and at least one packet
+		pacer = Pacer(1000,1e9)
+		self.clock.now += 10
+		pacer.refill(self.clock.now)
+		self.assertEqual(pacer.tokens,1e9*SPIN_THRESHOLD)
+		pacer = Pacer(1000,1e6)
+		self.clock.now += 10
+		pacer.refill(self.clock.now)
+		self.assertEqual(pacer.tokens,1000)
+
+	def test_retransmissions_take_tokens(self):
+		pacer = Pacer(1000,1e6)
+		pacer.consume()
+		pacer.consume()
+		self.assertAlmostEqual(pacer.delay(),0.002)
+		self.assertEqual(pacer.stats()['bytes_sent'],2000)
+
+	def test_window_pacing(self):
+		pacer = Pacer(1000,window_pacing=True)
+		self.assertIsNone(pacer.rate)
+		pacer.set_window(10,0.01)
+		self.assertAlmostEqual(pacer.rate,PACING_GAIN*10*1000/0.01)
+
+		# The rate from the window is limited by the cap
+		pacer = Pacer(1000,1e5,window_pacing=True)
+		pacer.set_window(10,0.01)
+		self.assertEqual(pacer.rate,1e5)
+
+if __name__ == '__main__':
+	unittest.main()
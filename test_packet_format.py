@@ -0,0 +1,42 @@
+import unittest
+
+from packet_format import ACK_PACKET_FIELD, DATA_PACKET_FIELD, HEADER_SIZE, MAX_SACK_RANGES, NAK_PACKET_FIELD, SACK_PACKET_FIELD, STRIPE, STRIPE_PACKET_FIELD, make_ack, make_nak, make_packet, make_sack, make_stripe, parse_nak, parse_packet, parse_sack, parse_stripe
+
+class PacketFormatTest(unittest.TestCase):
+
+	def test_data_packet(self):
+		packet = make_packet(70000,0xbeef,memoryview(b'data'))
+		self.assertEqual(len(packet),HEADER_SIZE + 4)
+		sequence_number, checksum, packet_field, data = parse_packet(packet)
+		self.assertEqual((sequence_number,checksum,packet_field,bytes(data)),(70000,0xbeef,DATA_PACKET_FIELD,b'data'))
+
+	def test_ack(self):
+		self.assertEqual(parse_packet(make_ack(12))[:3],(12,0,ACK_PACKET_FIELD))
+
+	def test_sack_round_trip(self):
+		ranges = [(12,15),(20,21),(4294967290,4294967295)]
+		sack = make_sack(10,ranges)
+		self.assertEqual(parse_packet(sack)[2],SACK_PACKET_FIELD)
+		self.assertEqual(parse_sack(sack),(10,ranges))
+		self.assertEqual(parse_sack(make_sack(10,[])),(10,[]))
+
+	def test_sack_ranges_limited(self):
+		ranges = [(2*index,2*index + 1) for index in range(MAX_SACK_RANGES + 5)]
+		self.assertEqual(parse_sack(make_sack(0,ranges))[1],ranges[:MAX_SACK_RANGES])
+
+	def test_nak_round_trip(self):
+		missing_ranges = [(3,5),(9,10)]
+		nak = make_nak(3,missing_ranges)
+		self.assertEqual(parse_packet(nak)[2],NAK_PACKET_FIELD)
+		self.assertEqual(parse_nak(nak),(3,missing_ranges))
+		ranges = [(2*index,2*index + 1) for index in range(MAX_SACK_RANGES + 1)]
+		self.assertEqual(parse_nak(make_nak(0,ranges))[1],ranges[:MAX_SACK_RANGES])
+
+	def test_stripe_round_trip(self):
+		stripe = make_stripe(0xdeadbeef,3,4,(1 << 40) + 5)
+		self.assertEqual(len(stripe),HEADER_SIZE + STRIPE.size)
+		self.assertEqual(parse_packet(stripe)[:3],(0,0,STRIPE_PACKET_FIELD))
+		self.assertEqual(parse_stripe(stripe),(0xdeadbeef,3,4,(1 << 40) + 5))
+
+if __name__ == '__main__':
+	unittest.main()
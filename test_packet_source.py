@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+
+from checksum import get_checksum_function
+from packet_format import END_OF_FILE, parse_packet
+from packet_source import MappedPacketStream, PacketStream
+
+# Data bytes of the test packets, and seconds given to the producer thread to run
+TEST_MSS = 10
+PRODUCER_WAIT = 0.1
+
+class PacketStreamTest(unittest.TestCase):
+
+	def setUp(self):
+		data_file = tempfile.NamedTemporaryFile(delete=False)
+		self.data = bytes(range(256))[:95]
+		data_file.write(self.data)
+		data_file.close()
+		self.file_name = data_file.name
+		self.addCleanup(os.unlink,self.file_name)
+		self.get_checksum = get_checksum_function('internet')
+
+	def make_stream(self,*args,**kwargs):
+		return PacketStream(*args,**kwargs)
+
+	def data_of(self,packet):
+		sequence_number, checksum, packet_field, data = parse_packet(packet)
+		self.assertEqual(checksum,self.get_checksum(data))
+		return bytes(data)
+
+	def test_whole_file(self):
+		packets = self.make_stream(self.file_name,TEST_MSS,self.get_checksum)
+		packets.start()
+		self.assertEqual(len(packets),11)
+		self.assertEqual(b''.join(self.data_of(packets[index]) for index in range(10)),self.data)
+		self.assertEqual(self.data_of(packets[10]),END_OF_FILE)
+
+	def test_byte_range(self):
+		packets = self.make_stream(self.file_name,TEST_MSS,self.get_checksum,offset=20,length=25)
+		packets.start()
+		self.assertEqual(len(packets),4)
+		self.assertEqual(b''.join(self.data_of(packets[index]) for index in range(3)),self.data[20:45])
+
+	def test_lookahead(self):
+		# The producer stays buffer_size packets ahead of the oldest unacknowledged one
+		packets = self.make_stream(self.file_name,TEST_MSS,self.get_checksum,buffer_size=4)
+		packets.start()
+		time.sleep(PRODUCER_WAIT)
+		self.assertEqual(sorted(packets.packets),[0,1,2,3])
+
+		packets.release(3)
+		self.assertEqual(self.data_of(packets[6]),self.data[60:70])
+		self.assertEqual(sorted(packets.packets),[3,4,5,6])
+		with self.assertRaises(IndexError):
+			packets[2]
+
+		packets.release(11)
+		packets.producer.join(PRODUCER_WAIT*10)
+		self.assertFalse(packets.producer.is_alive())
+		self.assertEqual(packets.packets,{})
+
+	def test_release_is_cumulative(self):
+		packets = self.make_stream(self.file_name,TEST_MSS,self.get_checksum)
+		packets.start()
+		packets.release(5)
+		packets.release(2)
+		self.assertEqual(packets.base,5)
+		self.assertEqual(sorted(packets.packets),list(range(5,11)))
+
+class MappedPacketStreamTest(PacketStreamTest):
+	"""
+	The same tests on a memory-mapped file, whose packets are (header, data view) pairs
+	"""
+
+	def data_of(self,packet):
+		return PacketStreamTest.data_of(self,b''.join(packet) if isinstance(packet,tuple) else packet)
+
+	def make_stream(self,*args,**kwargs):
+		return MappedPacketStream(*args,**kwargs)
+
+	def test_empty_file(self):
+		# An empty file is not mapped, it only has the END_OF_FILE packet
+		open(self.file_name,'wb').close()
+		packets = self.make_stream(self.file_name,TEST_MSS,self.get_checksum)
+		packets.start()
+		self.assertEqual(len(packets),1)
+		self.assertEqual(self.data_of(packets[0]),END_OF_FILE)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from file_writer import FileWriter
+from reassembly import Reassembler
+
+# Data bytes of the test packets
+TEST_MSS = 10
+
+class ReassemblerTest(unittest.TestCase):
+
+	def setUp(self):
+		output = tempfile.NamedTemporaryFile(delete=False)
+		output.close()
+		self.file_name = output.name
+		self.addCleanup(os.unlink,self.file_name)
+		self.data = bytes(range(256))[:95]
+		self.reassembler = Reassembler(FileWriter(self.file_name,32,use_pwrite=True))
+
+	def segment(self,sequence_number):
+		return self.data[sequence_number*TEST_MSS:(sequence_number + 1)*TEST_MSS]
+
+	def receive(self,sequence_numbers):
+		for sequence_number in sequence_numbers:
+			self.reassembler.add(sequence_number,memoryview(self.segment(sequence_number)))
+
+	def test_bitmap(self):
+		self.receive([0,1,3,4,7])
+		self.assertEqual(self.reassembler.base,2)
+		self.assertTrue(self.reassembler.is_received(1))
+		self.assertFalse(self.reassembler.is_received(2))
+		self.assertTrue(self.reassembler.is_received(4))
+		self.assertEqual(self.reassembler.sack_ranges(32),[(3,5),(7,8)])
+		self.assertEqual(self.reassembler.sack_ranges(1),[(3,5)])
+		self.assertEqual(self.reassembler.missing_ranges(32),[(2,3),(5,7)])
+		self.assertEqual(self.reassembler.highest_received(),7)
+
+		# Filling the first gap moves the base up to the next one
+		self.receive([2])
+		self.assertEqual(self.reassembler.base,5)
+		self.assertEqual(self.reassembler.bitmap,0b100)
+
+	def test_out_of_order_file(self):
+		# The first packet received is not packet 0, it waits until the MSS is known from a second one
+		self.receive([3,9,0,5,1,8,2,4,7,6])
+		self.reassembler.end_of_file(10)
+		self.assertTrue(self.reassembler.complete())
+		self.assertEqual(self.reassembler.segment_size,TEST_MSS)
+		self.reassembler.close()
+		with open(self.file_name,'rb') as output:
+			self.assertEqual(output.read(),self.data)
+
+	def test_not_complete_with_gap(self):
+		self.receive([0,2])
+		self.reassembler.end_of_file(3)
+		self.assertFalse(self.reassembler.complete())
+		self.receive([1])
+		self.assertTrue(self.reassembler.complete())
+
+	def test_close_cuts_preallocated_space(self):
+		self.receive([0,1])
+		self.assertGreater(self.reassembler.allocated_size,self.reassembler.file_size)
+		self.reassembler.close()
+		self.assertEqual(os.path.getsize(self.file_name),2*TEST_MSS)
+
+	def test_close_writes_pending_segment(self):
+		# Only packet 3 is received, END_OF_FILE (10) shows it is not the last data packet, so it has MSS bytes
+		self.receive([3])
+		self.reassembler.end_of_file(10)
+		self.reassembler.close()
+		self.assertEqual(self.reassembler.discarded_bytes,0)
+		with open(self.file_name,'rb') as output:
+			self.assertEqual(output.read(),bytes(3*TEST_MSS) + self.segment(3))
+
+	def test_close_discards_pending_segment(self):
+		# Without END_OF_FILE the packet may be the short last one, its offset is unknown
+		self.receive([3])
+		self.reassembler.close()
+		self.assertIsNone(self.reassembler.pending_segment)
+		self.assertEqual(self.reassembler.discarded_bytes,TEST_MSS)
+		self.assertEqual(os.path.getsize(self.file_name),0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,46 @@
+import socket
+import sys
+import unittest
+
+from packet_format import make_packet
+from receive_pipeline import ReceivePipeline, StageQueue
+
+class StageQueueTest(unittest.TestCase):
+
+	def test_full_queue_drops_item_when_stopped(self):
+		stage_queue = StageQueue('test',1)
+		self.assertTrue(stage_queue.put(1))
+		self.assertFalse(stage_queue.put(2,lambda: False))
+		self.assertEqual(stage_queue.stats()['full'],1)
+		self.assertEqual(stage_queue.get(),1)
+
+class ReceivePipelineTest(unittest.TestCase):
+	"""
+	Pipelined receiver over loopback
+	"""
+
+	def setUp(self):
+		self.receiver = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+		self.receiver.bind(('127.0.0.1',0))
+		self.sender = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+
+	def tearDown(self):
+		self.receiver.close()
+		self.sender.close()
+
+	def test_datagrams_verified_in_order(self):
+		switch_interval = sys.getswitchinterval()
+		pipeline = ReceivePipeline(self.receiver,2048,len)
+		try:
+			packets = [make_packet(index,0,bytes(index)) for index in range(20)]
+			for packet in packets:
+				self.sender.sendto(packet,self.receiver.getsockname())
+			received = [pipeline.receive(5) for packet in packets]
+		finally:
+			pipeline.stop()
+		self.assertEqual([(bytes(datagram),result) for datagram, address, result in received],[(packet,len(packet)) for packet in packets])
+		# The switch interval of the process is left to the program running the pipeline
+		self.assertEqual(sys.getswitchinterval(),switch_interval)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from rto_estimator import MAX_RTO, MIN_RTO, RTOEstimator
+
+class RTOEstimatorTest(unittest.TestCase):
+
+	def test_first_sample(self):
+		# SRTT = R, RTTVAR = R/2, RTO = SRTT + 4*RTTVAR (RFC 6298 2.2)
+		estimator = RTOEstimator(1)
+		estimator.sample(0.25)
+		self.assertEqual(estimator.srtt,0.25)
+		self.assertEqual(estimator.rttvar,0.125)
+		self.assertEqual(estimator.rto,0.75)
+
+	def test_next_samples(self):
+		# RTTVAR = 3/4 RTTVAR + 1/4 |SRTT - R|, SRTT = 7/8 SRTT + 1/8 R (RFC 6298 2.3)
+		estimator = RTOEstimator(1)
+		estimator.sample(0.25)
+		estimator.sample(0.75)
+		self.assertEqual(estimator.rttvar,0.21875)
+		self.assertEqual(estimator.srtt,0.3125)
+		self.assertEqual(estimator.rto,0.3125 + 4*0.21875)
+
+	def test_bounds(self):
+		estimator = RTOEstimator(1)
+		estimator.sample(0.0001)
+		self.assertEqual(estimator.rto,MIN_RTO)
+		estimator = RTOEstimator(1)
+		estimator.sample(100)
+		self.assertEqual(estimator.rto,MAX_RTO)
+
+	def test_backoff(self):
+		estimator = RTOEstimator(1)
+		estimator.backoff()
+		estimator.backoff()
+		self.assertEqual(estimator.rto,4)
+		self.assertEqual(estimator.stats()['timeouts'],2)
+
+		# A new sample ends the backoff
+		estimator.sample(0.25)
+		self.assertEqual(estimator.rto,0.75)
+
+	def test_fixed_rto(self):
+		estimator = RTOEstimator(1,adaptive=False)
+		estimator.sample(0.25)
+		estimator.backoff()
+		self.assertEqual(estimator.rto,1)
+		self.assertEqual(estimator.stats()['samples'],1)
+
+	def test_karn_rule(self):
+		# The acknowledgement of a retransmitted packet gives no sample, but ends the backoff
+		estimator = RTOEstimator(1)
+		estimator.on_ack(0,10.0,10.25)
+		estimator.backoff()
+		estimator.on_retransmit(1)
+		self.assertIsNone(estimator.on_ack(1,10.5,12.0))
+		self.assertEqual(estimator.srtt,0.25)
+		self.assertEqual(estimator.rto,0.75)
+
+		# The packet can give samples again when it is sent once more
+		self.assertEqual(estimator.on_ack(1,12.0,12.5),0.5)
+
+	def test_cumulative_acknowledgement(self):
+		# One sample from the most recently sent packet that was not retransmitted
+		estimator = RTOEstimator(1)
+		estimator.on_retransmit(2)
+		self.assertEqual(estimator.on_acks([(0,10.0),(1,10.25),(2,10.5),(3,None)],11.0),0.75)
+
+if __name__ == '__main__':
+	unittest.main()
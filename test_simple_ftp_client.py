@@ -0,0 +1,135 @@
+import os
+import tempfile
+import time
+import unittest
+
+import Simple_ftp_client as client
+from checksum import get_checksum_function
+from congestion_control import CongestionControl
+from packet_format import HEADER
+from pacing import Pacer
+from packet_source import PacketStream
+from rto_estimator import RTOEstimator
+from window_tuner import WindowTuner
+
+# Data bytes in each test packet, and seconds before a packet times out
+TEST_MSS = 10
+TEST_RTO = 0.005
+
+class FakeNetwork:
+	"""
+	Go-back-N Server on a perfect link whose acknowledgements can be held back: it receives every packet sent
+	and, whenever the sending thread waits, acknowledges everything received in order. From the hold_from packet on
+	the acknowledgements are held until the Client retransmits, and then all arrive late at once.
+	It replaces both the segment sender and the condition of the Client, so the test runs in a single thread
+	"""
+
+	def __init__(self,hold_from=None):
+		"""
+		Arguments:
+			hold_from : Sequence Number of the first packet whose acknowledgement is held (None to hold none)
+		"""
+		self.hold_from = hold_from
+		self.holding = False
+		self.received = set()
+		self.sent = []
+		self.retransmitted = False
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self,*exc_info):
+		return False
+
+	def batches(self):
+		return False
+
+	def send_run(self,packets):
+		for packet in packets:
+			sequence_number = HEADER.unpack_from(packet)[0]
+			if sequence_number in self.received:
+				self.retransmitted = True
+			self.sent.append(sequence_number)
+			self.received.add(sequence_number)
+			if sequence_number == self.hold_from:
+				self.holding = True
+
+	def wait(self,timeout=None):
+		# Nothing arrives while the acknowledgements are held (the Client times out) or when nothing new was received
+		cumulative_ack = 0
+		while cumulative_ack in self.received:
+			cumulative_ack += 1
+		if (self.holding and not self.retransmitted) or cumulative_ack <= client.ack_expected:
+			time.sleep(min(TEST_RTO,timeout if timeout is not None else TEST_RTO))
+			return
+		self.holding = False
+		client.ACKNOWLEDGE_UPTO(cumulative_ack,time.time())
+
+class SendPacketTest(unittest.TestCase):
+	"""
+	Go-back-N sending thread driven by a FakeNetwork
+	"""
+
+	def setUp(self):
+		data_file = tempfile.NamedTemporaryFile(delete=False)
+		data_file.write(bytes(range(256))*2)
+		data_file.close()
+		self.file_name = data_file.name
+		self.window_moved = client.window_moved
+		self.segment_sender = client.segment_sender
+
+	def tearDown(self):
+		os.unlink(self.file_name)
+		client.window_moved = self.window_moved
+		client.segment_sender = self.segment_sender
+
+	def start_client(self,network,N,congestion=False,rate=None):
+		"""
+		Set the state of the Client as rdt_send does, with the network in place of the socket
+		"""
+		client.packets = PacketStream(self.file_name,TEST_MSS,get_checksum_function('internet'))
+		client.packets.start()
+		client.number_of_packets = len(client.packets)
+		client.packets_acknowledged = 0
+		client.ack_expected = 0
+		client.packets_time = {}
+		client.duplicate_acks = 0
+		client.fast_retransmitted = -1
+		client.fast_retransmit_pending = False
+		client.nak_retransmit_pending = False
+		client.rto_estimator = RTOEstimator(TEST_RTO,False)
+		client.window_tuner = WindowTuner(N,False)
+		client.congestion_control = CongestionControl(N,congestion)
+		client.pacer = Pacer(TEST_MSS + HEADER.size,rate)
+		client.segment_sender = network
+		client.window_moved = network
+
+	def test_transfer(self):
+		network = FakeNetwork()
+		self.start_client(network,8)
+		client.send_packet(None,None,None,8)
+		self.assertEqual(client.packets_acknowledged,client.number_of_packets)
+		self.assertEqual(network.sent,list(range(client.number_of_packets)))
+
+	def test_late_acknowledgements_after_retransmit(self):
+		# The timeout shrinks the congestion window to one packet, so the Client goes back to the lost packet,
+		# then the held acknowledgements cover the packets above it, which are released
+		network = FakeNetwork(hold_from=20)
+		self.start_client(network,16,congestion=True)
+		client.send_packet(None,None,None,16)
+		self.assertTrue(network.retransmitted)
+		self.assertEqual(client.packets_acknowledged,client.number_of_packets)
+		self.assertEqual(client.ack_expected,client.number_of_packets)
+
+	def test_paced_retransmit_does_not_resend_acknowledged_packets(self):
+		# With pacing only the lost packet is sent again at once, the held acknowledgements then cover the rest of the window.
+		# One packet per millisecond, so the sending thread waits on its condition between the packets
+		network = FakeNetwork(hold_from=20)
+		self.start_client(network,16,rate=(TEST_MSS + HEADER.size)*1000)
+		client.send_packet(None,None,None,16)
+		self.assertEqual(client.packets_acknowledged,client.number_of_packets)
+		retransmissions = len(network.sent) - client.number_of_packets
+		self.assertEqual(retransmissions,1)
+
+if __name__ == '__main__':
+	unittest.main()
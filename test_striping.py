@@ -0,0 +1,54 @@
+import socket
+import threading
+import unittest
+
+from packet_format import STRIPE_REJECTED, make_stripe, parse_stripe
+from striping import announce_stripe, split_ranges
+
+class SplitRangesTest(unittest.TestCase):
+
+	def test_whole_segments(self):
+		# 10 segments of 100 bytes (the last one 50) in 3 stripes of 4, 3 and 3 segments
+		self.assertEqual(split_ranges(950,3,100),[(0,400),(400,300),(700,250)])
+
+	def test_fewer_segments_than_stripes(self):
+		self.assertEqual(split_ranges(150,4,100),[(0,100),(100,50)])
+
+class AnnounceStripeTest(unittest.TestCase):
+	"""
+	announce_stripe against a Server answering the first stripe packet from a thread
+	"""
+
+	def setUp(self):
+		self.server = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+		self.server.bind(('127.0.0.1',0))
+		self.server.settimeout(5)
+		self.client = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+
+	def tearDown(self):
+		self.server.close()
+		self.client.close()
+
+	def answer(self,reject):
+		"""
+		Echo the next stripe packet, with no stripes if reject
+		"""
+		def run():
+			packet, address = self.server.recvfrom(2048)
+			token, stripe_index, stripes, offset = parse_stripe(packet)
+			self.server.sendto(make_stripe(token,stripe_index,STRIPE_REJECTED,offset) if reject else packet,address)
+		thread = threading.Thread(target=run)
+		thread.start()
+		self.addCleanup(thread.join)
+
+	def test_accepted(self):
+		self.answer(False)
+		announce_stripe(self.client,self.server.getsockname(),(7,1,2),1000)
+
+	def test_rejected(self):
+		self.answer(True)
+		with self.assertRaisesRegex(RuntimeError,"rejected stripe 1 of 2"):
+			announce_stripe(self.client,self.server.getsockname(),(7,1,2),1000)
+
+if __name__ == '__main__':
+	unittest.main()
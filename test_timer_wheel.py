@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+
+import timer_wheel
+from timer_wheel import TimerWheel
+
+# time.time() value when the test wheels are made, a whole number of ticks
+START = 1024.0
+
+class TimerWheelTest(unittest.TestCase):
+
+	def setUp(self):
+		patcher = mock.patch.object(timer_wheel.time,'time',return_value=START)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		self.wheel = TimerWheel(tick=0.125,number_of_slots=8)
+
+	def test_expire_in_deadline_order(self):
+		self.wheel.arm(1,START + 0.5)
+		self.wheel.arm(2,START + 0.25)
+		self.wheel.arm(3,START + 0.3)
+		self.assertEqual(self.wheel.expire(START + 0.125),[])
+		self.assertEqual(self.wheel.expire(START + 0.375),[2,3])
+		self.assertEqual(len(self.wheel),1)
+		self.assertEqual(self.wheel.expire(START + 1),[1])
+		self.assertEqual(len(self.wheel),0)
+
+	def test_rearm_and_cancel(self):
+		self.wheel.arm(1,START + 0.25)
+		self.wheel.arm(1,START + 0.75)
+		self.wheel.arm(2,START + 0.25)
+		self.wheel.cancel(2)
+		self.wheel.cancel(3)
+		self.assertNotIn(2,self.wheel)
+		self.assertEqual(self.wheel.expire(START + 0.5),[])
+		self.assertEqual(self.wheel.expire(START + 0.75),[1])
+
+	def test_deadline_in_the_past(self):
+		self.wheel.expire(START + 0.5)
+		self.wheel.arm(1,START)
+		self.assertEqual(self.wheel.expire(START + 0.5),[1])
+
+	def test_wrap_around(self):
+		# 2.5 s is 20 ticks, more than one round of the 8 slots: the timer stays in its slot until due
+		self.wheel.arm(1,START + 2.5)
+		self.wheel.arm(2,START + 0.5)
+		self.assertEqual(self.wheel.next_deadline(),START + 0.5)
+		self.assertEqual(self.wheel.expire(START + 1.5),[2])
+		self.assertEqual(self.wheel.next_deadline(),START + 2.5)
+		self.assertEqual(self.wheel.expire(START + 2.25),[])
+		self.assertEqual(self.wheel.expire(START + 2.5),[1])
+		self.assertIsNone(self.wheel.next_deadline())
+
+if __name__ == '__main__':
+	unittest.main()
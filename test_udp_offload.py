@@ -0,0 +1,48 @@
+import socket
+import unittest
+
+from batch_io import MAX_BATCH, RING_MAX_SIZE, RING_SLOTS, mmsg_supported
+from udp_offload import DatagramReceiver
+
+class DatagramReceiverTest(unittest.TestCase):
+	"""
+	Receive ring of a Server over loopback
+	"""
+
+	def setUp(self):
+		self.receiver = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+		self.receiver.setsockopt(socket.SOL_SOCKET,socket.SO_RCVBUF,1 << 22)
+		self.receiver.bind(('127.0.0.1',0))
+		self.receiver.settimeout(5)
+		self.sender = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+
+	def tearDown(self):
+		self.receiver.close()
+		self.sender.close()
+
+	def check_large_datagrams(self,batch):
+		# Datagrams of every size up to receive_size arrive whole, the first one included
+		receiver = DatagramReceiver(self.receiver,20000,batch=batch)
+		self.assertEqual(receiver.stats()['ring_size'],RING_SLOTS*20000)
+		datagrams = [bytes([index])*size for index, size in enumerate((10000,100,2048,2049,19999))]
+		for datagram in datagrams:
+			self.sender.sendto(datagram,self.receiver.getsockname())
+		self.assertEqual([bytes(receiver.receive()[0]) for datagram in datagrams],datagrams)
+		self.assertEqual(receiver.stats()['datagrams'],len(datagrams))
+
+	def test_large_datagrams(self):
+		self.check_large_datagrams(False)
+
+	@unittest.skipUnless(mmsg_supported(),"recvmmsg is not available")
+	def test_large_datagrams_batch(self):
+		self.check_large_datagrams(True)
+
+	@unittest.skipUnless(mmsg_supported(),"recvmmsg is not available")
+	def test_held_reads_capped(self):
+		# 20 held reads of 64 datagrams of 65508 bytes would take 84 MB, the batches are made smaller
+		receiver = DatagramReceiver(self.receiver,65508,batch=True,held_reads=20)
+		self.assertLess(receiver.batch.max_batch,MAX_BATCH)
+		self.assertLessEqual(receiver.stats()['ring_size'],RING_MAX_SIZE)
+
+if __name__ == '__main__':
+	unittest.main()
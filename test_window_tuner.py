@@ -0,0 +1,68 @@
+import unittest
+from unittest import mock
+
+import window_tuner
+from window_tuner import MAX_WINDOW, WINDOW_GAIN, WindowTuner
+
+class Clock:
+	"""
+	time.time() replacement moved by the test
+	"""
+
+	def __init__(self):
+		self.now = 1024.0
+
+	def time(self):
+		return self.now
+
+class WindowTunerTest(unittest.TestCase):
+
+	def setUp(self):
+		self.clock = Clock()
+		patcher = mock.patch.object(window_tuner,'time',self.clock)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def run_rounds(self,tuner,packets_per_round,rtt,rounds,round_time=None):
+		"""
+		Acknowledge packets_per_round packets every round_time seconds (rtt if None) with RTT samples of rtt
+		"""
+		round_time = rtt if round_time is None else round_time
+		for round_number in range(rounds):
+			self.clock.now += round_time
+			tuner.on_ack(packets_per_round,rtt,round_time)
+
+	def test_disabled(self):
+		tuner = WindowTuner(8,False)
+		self.run_rounds(tuner,1000,0.1,5)
+		self.assertEqual(tuner.window(),8)
+		self.assertEqual(tuner.max_window,8)
+
+	def test_window_follows_bdp(self):
+		# 100 packets per round trip of 1/64 s: a BDP of 100 packets
+		tuner = WindowTuner(4,True)
+		self.run_rounds(tuner,100,1/64,5)
+		self.assertAlmostEqual(tuner.bdp(),100)
+		self.assertEqual(tuner.window(),WINDOW_GAIN*100)
+
+	def test_window_capped(self):
+		tuner = WindowTuner(4,True)
+		self.run_rounds(tuner,100000,1/64,5)
+		self.assertEqual(tuner.window(),MAX_WINDOW)
+
+	def test_window_not_below_initial_window(self):
+		# On loopback the round trip is so short that the BDP is under a packet (the window, not the path, limits
+		# the delivery rate), the window stays at N
+		tuner = WindowTuner(16,True)
+		self.run_rounds(tuner,16,1/8192,20,1/64)
+		self.assertLess(tuner.bdp(),1)
+		self.assertEqual(tuner.window(),16)
+
+	def test_no_estimate_before_first_round(self):
+		tuner = WindowTuner(8,True)
+		tuner.on_ack(10,0.01,None)
+		self.assertIsNone(tuner.bdp())
+		self.assertEqual(tuner.window(),8)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,94 @@
+import time
+
+class TimerWheel:
+	"""
+	Hashed timing wheel of retransmission timers keyed by sequence number.
+	A timer is put in the slot of its deadline tick, so arming and cancelling are O(1) and
+	expiring only looks at the slots of the ticks that passed since the last expiry.
+	Deadlines more than number_of_slots ticks away wrap around and stay in their slot until due.
+	"""
+
+	def __init__(self,tick=0.01,number_of_slots=512):
+		"""
+		Arguments:
+			tick 			: Seconds covered by one slot
+			number_of_slots : Number of slots in the wheel
+		"""
+		self.tick = tick
+		self.number_of_slots = number_of_slots
+
+		# Each slot maps the key of a timer to its deadline, timers maps a key to its slot
+		self.slots = [{} for _ in range(number_of_slots)]
+		self.timers = {}
+
+		# Last tick that was expired
+		self.current_tick = int(time.time()//tick)
+
+	def __len__(self):
+		return len(self.timers)
+
+	def __contains__(self,key):
+		return key in self.timers
+
+	def arm(self,key,deadline):
+		"""
+		Start (or restart) the timer of the key
+		Arguments:
+			key 		: Sequence Number of the packet
+			deadline 	: time.time() value when the timer expires
+		"""
+		self.cancel(key)
+		# A deadline in the past goes to the current slot, which is checked by the next expiry
+		index = max(int(deadline//self.tick),self.current_tick) % self.number_of_slots
+		self.slots[index][key] = deadline
+		self.timers[key] = index
+
+	def cancel(self,key):
+		"""
+		Stop the timer of the key if it is running
+		Arguments:
+			key : Sequence Number of the packet
+		"""
+		index = self.timers.pop(key,None)
+		if index is not None:
+			del self.slots[index][key]
+
+	def expire(self,now):
+		"""
+		Remove and return the keys of all the timers that are due, in order of deadline
+		Arguments:
+			now : Current time.time() value
+		"""
+		now_tick = int(now//self.tick)
+		expired = []
+
+		# Checking the slots of every tick since the last expiry (the current one again as it may have new timers)
+		ticks = min(now_tick - self.current_tick + 1,self.number_of_slots)
+		for tick in range(now_tick - ticks + 1,now_tick + 1):
+			slot = self.slots[tick % self.number_of_slots]
+			due = [(deadline,key) for key,deadline in slot.items() if deadline <= now]
+			for deadline,key in due:
+				del slot[key]
+				del self.timers[key]
+			expired.extend(due)
+
+		self.current_tick = max(self.current_tick,now_tick)
+		expired.sort()
+		return [key for deadline,key in expired]
+
+	def next_deadline(self):
+		"""
+		Deadline of the earliest timer, None if no timer is running
+		"""
+		if not self.timers:
+			return None
+
+		# The first slot with a timer due in this round of the wheel has the earliest deadline
+		for tick in range(self.current_tick,self.current_tick + self.number_of_slots):
+			slot = self.slots[tick % self.number_of_slots]
+			deadlines = [deadline for deadline in slot.values() if int(deadline//self.tick) <= tick]
+			if deadlines:
+				return min(deadlines)
+
+		# All the timers are more than one round away
+		return min(deadline for slot in self.slots for deadline in slot.values())
@@ -0,0 +1,298 @@
+import collections
+import errno
+import socket
+import struct
+import sys
+
+from batch_io import MAX_BATCH, RING_MAX_SIZE, RING_SLOTS, ReceiveBatch, ReceiveRing, SendBatch, mmsg_supported
+from packet_format import MAX_DATAGRAM_SIZE, sendto_packet
+
+# Linux UDP socket options of the segmentation offloads, not exposed by the socket module on every version
+SOL_UDP = getattr(socket,'SOL_UDP',17)
+UDP_SEGMENT = getattr(socket,'UDP_SEGMENT',103)
+UDP_GRO = getattr(socket,'UDP_GRO',104)
+
+# Largest number of segments in one GSO send (UDP_MAX_SEGMENTS of the kernel)
+MAX_SEGMENTS = 64
+
+# Segment size in the UDP_SEGMENT control message (16 bits) and in the UDP_GRO one (an int)
+SEGMENT_SIZE = struct.Struct('=H')
+GRO_SEGMENT_SIZE = struct.Struct('=i')
+
+# Receive buffer of a coalesced GRO datagram, the largest UDP payload fits in it
+GRO_BUFFER_SIZE = 65535
+
+# Errors of a GSO send when the kernel or the network device cannot segment it, the packets are then sent one by one
+GSO_ERRORS = (errno.EIO,errno.EINVAL,errno.ENOPROTOOPT,errno.EOPNOTSUPP)
+
+def gso_supported(sock):
+	"""
+	Check if the socket can send with UDP_SEGMENT (Linux 4.18)
+	Arguments:
+		sock : UDP Socket
+	"""
+	if not sys.platform.startswith('linux') or not hasattr(sock,'sendmsg'):
+		return False
+	try:
+		sock.getsockopt(SOL_UDP,UDP_SEGMENT)
+	except OSError:
+		return False
+	return True
+
+def enable_gro(sock):
+	"""
+	Ask the kernel to coalesce the received datagrams of a flow with UDP_GRO (Linux 5.0)
+	Arguments:
+		sock : UDP Socket
+	Returns:
+		True if GRO is enabled on the socket
+	"""
+	if not sys.platform.startswith('linux') or not hasattr(sock,'recvmsg'):
+		return False
+	try:
+		sock.setsockopt(SOL_UDP,UDP_GRO,1)
+	except OSError:
+		return False
+	return True
+
+def packet_length(packet):
+	"""
+	Size of a packet given either as bytes or as a (header, data) pair of buffers
+	Arguments:
+		packet : Packet bytes or (header, data) tuple
+	"""
+	if isinstance(packet,tuple):
+		return sum(len(buffer) for buffer in packet)
+	return len(packet)
+
+class SegmentSender:
+	"""
+	Sends the packets of a Client to the Server. With GSO a run of packets of the same size (the last one may be shorter)
+	is given to the kernel in a single sendmsg with a UDP_SEGMENT control message, and the kernel (or the network device)
+	splits it into one datagram per packet, so the Server receives the same datagrams as without it.
+	If the kernel or the device refuses a GSO send, GSO is turned off and the packets are sent one by one.
+	Without GSO a list of packets is sent with sendmmsg, MAX_BATCH datagrams per system call, where it is available.
+	The host name of the Server is resolved once, instead of by every sendto
+	"""
+
+	def __init__(self,sock,address,gso=False,batch=False):
+		"""
+		Arguments:
+			sock 	: UDP Socket of the Client
+			address : (Host Name, Port #) of the Server
+			gso 	: Send runs of packets with UDP_SEGMENT if the kernel supports it
+			batch 	: Send lists of packets with sendmmsg if the platform supports it
+		"""
+		self.sock = sock
+		self.address = address if sock is None else (socket.gethostbyname(address[0]),address[1])
+		self.gso = gso and sock is not None and gso_supported(sock)
+		self.batch = SendBatch(self.address) if batch and sock is not None and mmsg_supported() else None
+
+		# Counters of the datagrams and of the system calls sending them
+		self.datagrams_sent = 0
+		self.send_calls = 0
+
+	def send(self,packet):
+		"""
+		Send one packet
+		Arguments:
+			packet : Packet bytes or (header, data) tuple
+		"""
+		sendto_packet(self.sock,packet,self.address)
+		self.datagrams_sent += 1
+		self.send_calls += 1
+
+	def batches(self):
+		"""
+		Check if a list of packets is sent with fewer system calls than packets
+		"""
+		return self.gso or self.batch is not None
+
+	def send_run(self,packets):
+		"""
+		Send a list of packets, with GSO or sendmmsg in as few system calls as possible
+		Arguments:
+			packets : List of packet bytes or (header, data) tuples
+		"""
+		if not self.gso:
+			if self.batch is not None and len(packets) > 1:
+				self.send_calls += self.batch.send(self.sock,packets)
+				self.datagrams_sent += len(packets)
+				return
+			for packet in packets:
+				self.send(packet)
+			return
+
+		start = 0
+		while start < len(packets):
+			# The segments of one send have the size of the first one, except a shorter last one, and fit in one UDP datagram
+			segment_size = packet_length(packets[start])
+			limit = min(MAX_SEGMENTS,MAX_DATAGRAM_SIZE//segment_size)
+			end = start + 1
+			while end < len(packets) and end - start < limit:
+				size = packet_length(packets[end])
+				if size > segment_size:
+					break
+				end += 1
+				if size < segment_size:
+					break
+
+			if end - start == 1:
+				self.send(packets[start])
+			else:
+				self.send_segments(packets[start:end],segment_size)
+			start = end
+
+	def send_segments(self,packets,segment_size):
+		"""
+		Send packets as the segments of one GSO send
+		Arguments:
+			packets 		: List of packet bytes or (header, data) tuples
+			segment_size 	: Size of each packet (the last one may be shorter)
+		"""
+		buffers = []
+		for packet in packets:
+			if isinstance(packet,tuple):
+				buffers.extend(packet)
+			else:
+				buffers.append(packet)
+
+		try:
+			self.sock.sendmsg(buffers,[(SOL_UDP,UDP_SEGMENT,SEGMENT_SIZE.pack(segment_size))],0,self.address)
+		except OSError as error:
+			if error.errno not in GSO_ERRORS:
+				raise
+			# Nothing was sent, sending the packets without GSO from now on
+			print("GSO Warning: UDP segmentation offload failed ({}), sending without it".format(error.strerror))
+			self.gso = False
+			self.send_run(packets)
+			return
+		self.datagrams_sent += len(packets)
+		self.send_calls += 1
+
+	def stats(self):
+		"""
+		Datagrams sent and the system calls that sent them
+		"""
+		return {
+			'gso': self.gso,
+			'batch': self.batch is not None,
+			'datagrams': self.datagrams_sent,
+			'send_calls': self.send_calls,
+			'datagrams_per_call': self.datagrams_sent/self.send_calls if self.send_calls else 0,
+		}
+
+class DatagramReceiver:
+	"""
+	Receives the datagrams of a Server. With GRO the kernel coalesces datagrams of one flow with the same size
+	into one buffer and reports the segment size in a UDP_GRO control message: the buffer is split back into
+	the datagrams, which are returned one by one without more system calls.
+	Without GRO the datagrams waiting on the socket are drained with recvmmsg, MAX_BATCH per system call, where it is available.
+	Every path receives into the preallocated buffers of a receive ring (recvfrom_into, recvmsg_into or recvmmsg) and returns
+	memoryviews of them, so no buffer is allocated per datagram; a datagram stays valid for as many more receives as the ring has buffers.
+	Each buffer holds a datagram of receive_size bytes, so no datagram is truncated. The ring is an anonymous memory map,
+	whose pages are only backed by memory when a datagram is written to them: small datagrams use the first page of each buffer
+	"""
+
+	def __init__(self,sock,receive_size,gro=False,batch=False,held_reads=None):
+		"""
+		Arguments:
+			sock 			: UDP Socket of the Server
+			receive_size 	: Receive buffer size without GRO (a larger datagram is truncated to it)
+			gro 			: Enable UDP_GRO on the socket if the kernel supports it
+			batch 			: Receive the waiting datagrams with recvmmsg if the platform supports it
+			held_reads 		: Reads of the socket whose datagrams may still be in use, the ring is sized to hold them
+							  (None for RING_SLOTS buffers)
+		"""
+		self.sock = sock
+		self.receive_size = receive_size
+		self.gro = gro and enable_gro(sock)
+		self.use_batch = batch and not self.gro and mmsg_supported()
+		self.held_reads = held_reads
+
+		# A coalesced GRO buffer fills a buffer of the largest UDP payload, the other paths a datagram of receive_size bytes
+		self.allocate_ring(max(GRO_BUFFER_SIZE,receive_size) if self.gro else receive_size)
+
+		# Datagrams of the last coalesced buffer or recvmmsg batch not yet returned, as (datagram, address)
+		self.pending = collections.deque()
+
+		# Counters of the datagrams and of the system calls receiving them
+		self.datagrams_received = 0
+		self.receive_calls = 0
+
+	def allocate_ring(self,slot_size):
+		"""
+		Allocate the receive ring with buffers of slot_size bytes
+		Arguments:
+			slot_size : Bytes of each buffer
+		"""
+		self.slot_size = slot_size
+
+		# A recvmmsg read fills up to MAX_BATCH buffers, fewer when the held reads would take more than RING_MAX_SIZE bytes, the other reads one
+		max_batch = MAX_BATCH
+		if self.use_batch and self.held_reads is not None:
+			max_batch = max(1,min(MAX_BATCH,RING_MAX_SIZE//(self.held_reads*slot_size)))
+		slots = RING_SLOTS if self.held_reads is None else max(RING_SLOTS,self.held_reads*(max_batch if self.use_batch else 1))
+		self.batch = ReceiveBatch(slot_size,max_batch,slots) if self.use_batch else None
+
+		# Receive buffers of the recvfrom_into and recvmsg_into paths
+		self.ring = self.batch.ring if self.batch is not None else ReceiveRing(slot_size,slots)
+
+	def receive(self):
+		"""
+		Next datagram, the socket is only read when no datagram of a coalesced buffer or batch is left
+		Returns:
+			(datagram, address) where datagram is a memoryview of a buffer of the receive ring
+		"""
+		self.datagrams_received += 1
+		if self.pending:
+			return self.pending.popleft()
+
+		self.receive_calls += 1
+		if self.batch is not None:
+			self.pending.extend(self.batch.receive(self.sock))
+			return self.pending.popleft()
+		if not self.gro:
+			return self.ring.receive_from(self.sock)
+
+		index = self.ring.slot()
+		size, ancillary, flags, address = self.sock.recvmsg_into([self.ring.buffer_view(index)],socket.CMSG_SPACE(GRO_SEGMENT_SIZE.size))
+		data = self.ring.buffer_view(index,size)
+		segment_size = 0
+		for level, message_type, message in ancillary:
+			if level == SOL_UDP and message_type == UDP_GRO:
+				segment_size = GRO_SEGMENT_SIZE.unpack_from(message)[0]
+
+		# A single datagram, not coalesced
+		if segment_size <= 0 or segment_size >= len(data):
+			return data, address
+
+		for offset in range(segment_size,len(data),segment_size):
+			self.pending.append((data[offset:offset + segment_size],address))
+		return data[:segment_size], address
+
+	def receive_batch(self):
+		"""
+		Every datagram of the next read of the socket: a recvmmsg batch, the segments of a coalesced buffer or a single datagram
+		Returns:
+			List of (datagram, address)
+		"""
+		datagrams = [self.receive()]
+		if self.pending:
+			datagrams.extend(self.pending)
+			self.datagrams_received += len(self.pending)
+			self.pending.clear()
+		return datagrams
+
+	def stats(self):
+		"""
+		Datagrams received and the system calls that received them
+		"""
+		return {
+			'gro': self.gro,
+			'batch': self.batch is not None,
+			'datagrams': self.datagrams_received,
+			'receive_calls': self.receive_calls,
+			'datagrams_per_call': self.datagrams_received/self.receive_calls if self.receive_calls else 0,
+			'ring_size': self.ring.slot_size*self.ring.slots,
+		}
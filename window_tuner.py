@@ -0,0 +1,126 @@
+import collections
+import math
+import time
+
+# Window in packets is kept between these bounds in auto mode, and never below the initial window
+MIN_WINDOW = 2
+MAX_WINDOW = 4096
+
+# Window as a multiple of the bandwidth-delay product, the headroom lets the delivery rate (and the window) keep growing
+WINDOW_GAIN = 2
+
+# Rounds over which the highest delivery rate is kept, and seconds over which the lowest RTT is kept
+BANDWIDTH_ROUNDS = 10
+MIN_RTT_WINDOW = 10
+
+# Number of recent window changes kept for analysis
+TRAJECTORY_KEPT = 10000
+
+class WindowTuner:
+	"""
+	Window sized from the measured bandwidth-delay product instead of a fixed N (as BBR sizes its window):
+	the delivery rate is measured over each round trip, the highest of the last BANDWIDTH_ROUNDS rounds times
+	the lowest RTT of the last MIN_RTT_WINDOW seconds is the BDP in packets, and the window is WINDOW_GAIN times it.
+	Starting from N the window doubles each round while the delivery rate keeps up, then follows the link.
+	The window does not go below N: the delivery rate is limited by the window itself, so on a path whose BDP is
+	under a packet (loopback) or with a slow receiver the estimate would otherwise shrink the window below the one of the user.
+	The Clients call it with their lock held.
+	"""
+
+	def __init__(self,initial_window,enabled=True,max_window=MAX_WINDOW):
+		"""
+		Arguments:
+			initial_window 	: Window in packets before the first estimate (the window N of the Client)
+			enabled 		: Size the window from the BDP, else the window is always initial_window
+			max_window 		: Largest window in packets
+		"""
+		self.enabled = enabled
+		self.max_window = max(max_window,initial_window) if enabled else initial_window
+		self.min_window = max(MIN_WINDOW,initial_window) if enabled else initial_window
+		self.window_size = initial_window
+
+		# Packets delivered (acknowledged for the first time) since the start, and at the start of the round
+		self.delivered = 0
+		self.round_delivered = 0
+		self.round_start_time = None
+
+		# Delivery rates in packets per second of the recent rounds, and the lowest RTT with the time it was measured
+		self.bandwidth_samples = collections.deque(maxlen=BANDWIDTH_ROUNDS)
+		self.min_rtt = None
+		self.min_rtt_time = None
+
+		# Recent (time, window, bandwidth, min RTT) estimates
+		self.trajectory = collections.deque(maxlen=TRAJECTORY_KEPT)
+
+	def window(self):
+		"""
+		Number of packets that can be outstanding
+		"""
+		return self.window_size
+
+	def bandwidth(self):
+		"""
+		Highest recent delivery rate in packets per second (None before the first round)
+		"""
+		return max(self.bandwidth_samples) if self.bandwidth_samples else None
+
+	def bdp(self):
+		"""
+		Bandwidth-delay product in packets (None before the first estimate)
+		"""
+		if self.min_rtt is None or not self.bandwidth_samples:
+			return None
+		return self.bandwidth()*self.min_rtt
+
+	def on_ack(self,acknowledged,rtt,srtt):
+		"""
+		Count the newly acknowledged packets and update the estimate at the end of each round trip
+		Arguments:
+			acknowledged 	: Number of packets acknowledged for the first time
+			rtt 			: RTT sample of the acknowledgement in seconds (None if there is none)
+			srtt 			: Smoothed RTT in seconds, the length of a round (None before the first sample)
+		"""
+		if not self.enabled or acknowledged <= 0:
+			return
+		now = time.time()
+		self.delivered += acknowledged
+
+		# Lowest RTT, forgotten after MIN_RTT_WINDOW seconds so a longer path is followed
+		if rtt is not None and (self.min_rtt is None or rtt <= self.min_rtt or now - self.min_rtt_time >= MIN_RTT_WINDOW):
+			self.min_rtt = rtt
+			self.min_rtt_time = now
+
+		if self.round_start_time is None:
+			self.round_start_time = now
+			self.round_delivered = self.delivered
+			return
+
+		# A round lasts one smoothed RTT, its delivery rate is a bandwidth sample
+		elapsed = now - self.round_start_time
+		if srtt is None or elapsed < srtt:
+			return
+		self.bandwidth_samples.append((self.delivered - self.round_delivered)/elapsed)
+		self.round_start_time = now
+		self.round_delivered = self.delivered
+		self.update()
+
+	def update(self):
+		"""
+		Set the window to WINDOW_GAIN times the bandwidth-delay product, between the initial window and max_window
+		"""
+		bdp = self.bdp()
+		if bdp is None:
+			return
+		self.window_size = max(self.min_window,min(self.max_window,math.ceil(WINDOW_GAIN*bdp)))
+		self.trajectory.append((time.time(),self.window_size,self.bandwidth(),self.min_rtt))
+
+	def stats(self):
+		"""
+		Current estimate
+		"""
+		return {
+			'window': self.window_size,
+			'bandwidth': self.bandwidth(),
+			'min_rtt': self.min_rtt,
+			'bdp': self.bdp(),
+		}
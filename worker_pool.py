@@ -0,0 +1,159 @@
+import multiprocessing
+import queue
+import signal
+import socket
+import time
+
+# Seconds between the checks of the worker processes by the supervisor
+SUPERVISOR_INTERVAL = 0.5
+
+# The workers are forked so they inherit the settings of the server module (e.g. the --checksum function)
+multiprocessing_context = multiprocessing.get_context('fork')
+
+# Worker restarts allowed before the supervisor gives up (a worker that can not bind the port would restart forever)
+MAX_RESTARTS = 10
+
+def reuse_port_supported():
+	"""
+	Check if the platform lets several sockets bind the same UDP port (SO_REUSEPORT)
+	"""
+	return hasattr(socket,'SO_REUSEPORT')
+
+class WorkerContext:
+	"""
+	State shared by the receiver worker processes. Every worker binds the same port with SO_REUSEPORT and the kernel
+	hashes each client flow (address and port) to one of them, so a transfer stays on one worker.
+	The transfer numbers come from one shared counter so {transfer} stays unique over the workers,
+	and every finished transfer is reported to the supervisor.
+	"""
+
+	def __init__(self):
+		self.transfer_counter = multiprocessing_context.Value('i',0)
+		self.reports = multiprocessing_context.Queue()
+
+		# Number of the worker, set in each worker process
+		self.worker_id = None
+
+	def bind(self,server_socket,server_port):
+		"""
+		Bind the socket of a worker to the shared port
+		Arguments:
+			server_socket 	: UDP Socket of the worker
+			server_port 	: Port # of the Server
+		"""
+		server_socket.setsockopt(socket.SOL_SOCKET,socket.SO_REUSEPORT,1)
+		server_socket.bind(('',server_port))
+
+	def next_transfer_id(self):
+		"""
+		Number of a new transfer, unique over the workers
+		"""
+		with self.transfer_counter.get_lock():
+			transfer_id = self.transfer_counter.value
+			self.transfer_counter.value += 1
+		return transfer_id
+
+	def report(self,transfer_id,clientAddress,file_name,bytes_written,data_packets,acks_sent):
+		"""
+		Send the statistics of a finished transfer to the supervisor
+		Arguments:
+			transfer_id 	: Number of the transfer
+			clientAddress 	: (Host, Port #) of the Client
+			file_name 		: Output File Path of the transfer
+			bytes_written 	: Bytes written to the output file
+			data_packets 	: Data packets accepted
+			acks_sent 		: Acknowledgements sent
+		"""
+		self.reports.put({
+			'worker': self.worker_id,
+			'transfer': transfer_id,
+			'client': clientAddress,
+			'file_name': file_name,
+			'bytes': bytes_written,
+			'data_packets': data_packets,
+			'acks_sent': acks_sent,
+		})
+
+def run_worker(worker_id,context,target,args):
+	"""
+	Entry point of a worker process: run the receive loop of the server on the shared port
+	Arguments:
+		worker_id 	: Number of the worker
+		context 	: WorkerContext shared by the workers
+		target 		: rdt_receive function of the server
+		args 		: Arguments of rdt_receive
+	"""
+	# Ctrl-C is handled by the supervisor, which stops the workers
+	signal.signal(signal.SIGINT,signal.SIG_IGN)
+	context.worker_id = worker_id
+	target(*args,worker=context)
+
+def supervise(target,args,workers,transfers=1):
+	"""
+	Start the worker processes, restart the ones that exit, and aggregate their statistics
+	until the number of transfers is received (or Ctrl-C for no limit)
+	Arguments:
+		target 		: rdt_receive function of the server, called with worker=WorkerContext
+		args 		: Arguments of rdt_receive, the workers receive transfers until they are stopped
+		workers 	: Number of worker processes
+		transfers 	: Number of transfers to receive before stopping the workers (0 for no limit)
+	"""
+	context = WorkerContext()
+	processes = {}
+	stats = {worker_id: {'transfers': 0, 'bytes': 0, 'data_packets': 0, 'acks_sent': 0, 'restarts': 0} for worker_id in range(workers)}
+
+	def start(worker_id):
+		process = multiprocessing_context.Process(target=run_worker,args=(worker_id,context,target,args),daemon=True)
+		process.start()
+		processes[worker_id] = process
+
+	for worker_id in range(workers):
+		start(worker_id)
+	print("Workers Started: {} processes on one port (SO_REUSEPORT)".format(workers))
+
+	transfers_received = 0
+	restarts = 0
+	start_time = time.time()
+
+	try:
+		while transfers == 0 or transfers_received < transfers:
+			try:
+				report = context.reports.get(timeout=SUPERVISOR_INTERVAL)
+			except queue.Empty:
+				report = None
+
+			# Adding the statistics of a finished transfer to its worker
+			if report is not None:
+				transfers_received += 1
+				worker_stats = stats[report['worker']]
+				worker_stats['transfers'] += 1
+				for key in ('bytes','data_packets','acks_sent'):
+					worker_stats[key] += report[key]
+				print("Worker {}: Data Recieved from {} (transfer {}), {} bytes in {}".format(report['worker'],report['client'],report['transfer'],report['bytes'],report['file_name']))
+
+			# Restarting the workers that exited
+			for worker_id, process in list(processes.items()):
+				if not process.is_alive():
+					restarts += 1
+					if restarts > MAX_RESTARTS:
+						raise RuntimeError("Worker Error: more than {} worker restarts".format(MAX_RESTARTS))
+					print("Worker {} (pid {}) exited with code {}, restarting".format(worker_id,process.pid,process.exitcode))
+					stats[worker_id]['restarts'] += 1
+					start(worker_id)
+	except KeyboardInterrupt:
+		pass
+	finally:
+		# Stopping the workers, the sessions still open are abandoned
+		for process in processes.values():
+			process.terminate()
+		for process in processes.values():
+			process.join()
+
+	elapsed = time.time() - start_time
+	total_bytes = sum(worker_stats['bytes'] for worker_stats in stats.values())
+	print()
+	for worker_id, worker_stats in stats.items():
+		print("Worker {}: {} transfers, {} bytes, {} data packets, {} ACKs, {} restarts".format(worker_id,worker_stats['transfers'],worker_stats['bytes'],worker_stats['data_packets'],worker_stats['acks_sent'],worker_stats['restarts']))
+	print("Total: {} transfers, {} bytes in {:.3f} s ({:.1f} KB/s)".format(transfers_received,total_bytes,elapsed,total_bytes/1024/elapsed))
+	print("Server Closed")
+	return stats